@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark suite για τα processes του Scenario 2
+
+Για κάθε stage (aggregate, demographic, merge, compliance, export, graphs)
+μετράει χρόνο (καλύτερος από --repeat) και peak μνήμη (tracemalloc) πάνω
+σε συνθετικά δεδομένα, γράφει JSON report και, αν υπάρχει baseline,
+αποτυγχάνει (exit code 1) όταν κάποιο stage είναι πιο αργό από
+baseline × tolerance.
+
+Οι χρόνοι συγκρίνονται κανονικοποιημένοι: κάθε εκτέλεση μετράει και
+ένα σταθερό φορτίο βαθμονόμησης (Python loop + numpy sort), οπότε το
+baseline μεταφέρεται σε μηχανήματα διαφορετικής ταχύτητας.
+
+Μετράει επίσης τον χρόνο εκκίνησης του CLI (import του controller και
+--help σε νέα διεργασία) και ποια βαριά modules φορτώνονται στην εκκίνηση.
+
+Παράδειγμα:
+    python bench_pipeline.py --preset small
+    python bench_pipeline.py --stations 20 --years 10 --freq h --districts 50
+    python bench_pipeline.py --preset small --update-baseline
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+CODE_DIR = BENCH_DIR.parent / "splitting_code"
+sys.path.insert(0, str(CODE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from synthetic_data import generate  # noqa: E402
+from aggregate_and_compute_mean_pollutant_levels import (  # noqa: E402
+    aggregate_and_compute_mean_pollutant_levels,
+)
+from clean_and_normalize_demographic_data import (  # noqa: E402
+    clean_and_normalize_demographic_data,
+)
+from merge_and_compute_per_capita import merge_and_compute_per_capita  # noqa: E402
+from assess_compliance_with_eu_limits import assess_compliance_with_eu_limits  # noqa: E402
+from export_excel import export_excel  # noqa: E402
+from generate_graphs_and_visual_summaries import (  # noqa: E402
+    generate_graphs_and_visual_summaries,
+)
+
+CONTROLLER = CODE_DIR / "controller_scenario2.py"
+# Modules που δεν πρέπει να φορτώνονται απλώς με το import του controller
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "openpyxl")
+
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_REPORT = BENCH_DIR / "bench_report.json"
+DEFAULT_TOLERANCE = 1.5
+# Κάτω από αυτό το απόλυτο περιθώριο (s) δεν θεωρείται regression (θόρυβος)
+MIN_ABS_SLOWDOWN = 0.05
+
+PRESETS = {
+    "small": dict(stations=6, years=4, freq="D", districts=5),
+    "medium": dict(stations=20, years=10, freq="D", districts=20),
+    "large": dict(stations=20, years=5, freq="h", districts=50),
+}
+
+LIMITS = {
+    "SO2": 125, "NO2": 40, "NO": 100, "O3": 120,
+    "PM10": 40, "PM2.5": 25, "CO": 10
+}
+
+
+def _calibration_load() -> float:
+    """Σταθερό φορτίο CPU (interpreter + numpy), ανεξάρτητο από τον κώδικα."""
+    total = 0.0
+    for i in range(2_000_000):
+        total += (i % 7) * 0.5
+    values = np.random.default_rng(0).random(3_000_000)
+    return total + float(np.sort(values)[-1])
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Καλύτερος χρόνος (s) του φορτίου βαθμονόμησης στο τρέχον μηχάνημα."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _calibration_load()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def _measure(func: Callable, repeat: int,
+             memory: bool) -> Tuple[Dict[str, float], object]:
+    times = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    stats = {"seconds": min(times)}
+    if memory:
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats["peak_mb"] = peak / 1e6
+    return stats, result
+
+
+def _run_python(args: list, repeat: int) -> Dict[str, object]:
+    """Καλύτερος χρόνος (s) νέας διεργασίας Python & η έξοδός της."""
+    times = []
+    out = ""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, *args], cwd=CODE_DIR,
+                              capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - t0)
+        out = proc.stdout
+    return {"seconds": min(times), "stdout": out}
+
+
+def measure_startup(repeat: int = 3) -> Dict[str, dict]:
+    """Χρόνος εκκίνησης: import του controller και `--help` του CLI."""
+    probe = ("import sys, controller_scenario2; "
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    baseline = _run_python(["-c", "pass"], repeat)["seconds"]
+    imported = _run_python(["-c", probe], repeat)
+    cli = _run_python([str(CONTROLLER), "--help"], repeat)
+    loaded = [m for m in imported["stdout"].strip().split(",") if m]
+    stats = {
+        "controller_import": {"seconds": imported["seconds"] - baseline,
+                              "heavy_modules": loaded},
+        "cli_help": {"seconds": cli["seconds"] - baseline},
+    }
+    for name, st in stats.items():
+        print(f"  {'startup: ' + name:<44} {st['seconds']:8.3f}s"
+              + (f"  φορτωμένα: {', '.join(loaded)}" if st.get("heavy_modules") else ""))
+    return stats
+
+
+def run_benchmarks(params: dict, workdir: Path, repeat: int = 1,
+                   memory: bool = True) -> dict:
+    t0 = time.perf_counter()
+    pollution, population, sheets, mapping = generate(
+        workdir, params["stations"], params["years"], params["freq"], params["districts"]
+    )
+    gen_seconds = time.perf_counter() - t0
+    outdir = workdir / "outputs"
+    outdir.mkdir(exist_ok=True)
+    mapping_df = pd.DataFrame({"Σταθμός": list(mapping.keys()),
+                               "Δημοτική Κοινότητα": list(mapping.values())})
+
+    stages = {}
+    ctx = {}
+
+    def stage(name, func):
+        stats, ctx[name] = _measure(func, repeat, memory)
+        out = ctx[name]
+        if isinstance(out, pd.DataFrame):
+            stats["rows"], stats["cols"] = out.shape
+        stages[name] = stats
+        print(f"  {name:<44} {stats['seconds']:8.3f}s"
+              + (f"  {stats['peak_mb']:9.1f} MB" if memory else ""))
+
+    stage("aggregate_and_compute_mean_pollutant_levels",
+          lambda: aggregate_and_compute_mean_pollutant_levels(
+              pollution, sheets, measurements_only=True))
+    stage("clean_and_normalize_demographic_data",
+          lambda: clean_and_normalize_demographic_data(population))
+    stage("merge_and_compute_per_capita",
+          lambda: merge_and_compute_per_capita(
+              ctx["aggregate_and_compute_mean_pollutant_levels"],
+              ctx["clean_and_normalize_demographic_data"], mapping))
+    stage("assess_compliance_with_eu_limits",
+          lambda: assess_compliance_with_eu_limits(
+              ctx["merge_and_compute_per_capita"], LIMITS))
+    stage("export_excel",
+          lambda: export_excel(mapping_df, ctx["assess_compliance_with_eu_limits"],
+                               outdir / "bench.xlsx"))
+    stage("generate_graphs_and_visual_summaries",
+          lambda: generate_graphs_and_visual_summaries(
+              ctx["assess_compliance_with_eu_limits"], outdir, LIMITS))
+
+    stages.update(measure_startup(repeat))
+    calibration = calibrate()
+    print(f"  {'calibration':<44} {calibration:8.3f}s")
+
+    return {
+        "params": params,
+        "generation_seconds": gen_seconds,
+        "calibration_seconds": calibration,
+        "stages": stages,
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Λίστα με regressions (stage, τρέχον, αναμενόμενο)· ο χρόνος του baseline
+    κλιμακώνεται με τον λόγο των χρόνων βαθμονόμησης των δύο μηχανημάτων.
+    """
+    scale = report["calibration_seconds"] / baseline["calibration_seconds"]
+    regressions = []
+    base_stages = baseline.get("stages", {})
+    for name, stats in report["stages"].items():
+        base = base_stages.get(name)
+        if base is None:
+            continue
+        expected = base["seconds"] * scale
+        if stats["seconds"] > expected * tolerance and stats["seconds"] - expected > MIN_ABS_SLOWDOWN:
+            regressions.append((name, stats["seconds"], expected))
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    ap.add_argument("--stations", type=int)
+    ap.add_argument("--years", type=int)
+    ap.add_argument("--freq", choices=["D", "h"])
+    ap.add_argument("--districts", type=int)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--no-memory", action="store_true",
+                    help="χωρίς tracemalloc (γρηγορότερο)")
+    ap.add_argument("--workdir", type=Path,
+                    help="φάκελος για τα συνθετικά αρχεία (default: temp)")
+    ap.add_argument("--report", type=Path, default=DEFAULT_REPORT)
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    params = dict(PRESETS[args.preset])
+    for key in ("stations", "years", "freq", "districts"):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+
+    print(f"⏱ Benchmark: {params}")
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or Path(tmp)
+        report = run_benchmarks(params, workdir, args.repeat, not args.no_memory)
+
+    args.report.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"📄 Report: {args.report}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2, ensure_ascii=False),
+                                 encoding="utf-8")
+        print(f"📌 Νέο baseline: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("ℹ Δεν υπάρχει baseline – παράλειψη ελέγχου")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("params") != params:
+        print("ℹ Το baseline αφορά άλλες παραμέτρους – παράλειψη ελέγχου")
+        return 0
+    if "calibration_seconds" not in baseline:
+        print("ℹ Το baseline δεν έχει βαθμονόμηση – ξαναγράψ' το με --update-baseline")
+        return 0
+
+    regressions = compare(report, baseline, args.tolerance)
+    for name, now, base in regressions:
+        print(f"🔴 Regression {name}: {now:.3f}s (αναμενόμενο {base:.3f}s "
+              "από baseline × βαθμονόμηση)")
+    if regressions:
+        return 1
+    print("🟢 Χωρίς regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
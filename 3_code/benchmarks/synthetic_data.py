@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Γεννήτρια συνθετικών δεδομένων για benchmarks
+
+Παράγει workbooks με την ίδια δομή με τα αρχεία του 2_data:
+- μετρήσεις ρύπανσης: ένα φύλλο ανά σταθμό ("Στ. ..."), στήλες
+  "Ημερο -\\nμηνία", "SO2\\nμg/m3", "PM2,5\\nμg/m3", ... όπως στο δημοτικό αρχείο
+- απογραφή: γραμμές "Δημοτική Κοινότητα Νου Διαμερίσματος Θεσσαλονίκης"
+  στις στήλες Unnamed: 3 / Unnamed: 4
+
+Παράμετροι: σταθμοί, έτη, συχνότητα δειγματοληψίας ("D" / "h"), διαμερίσματα.
+Η γέννηση είναι ντετερμινιστική (seed).
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+# (κεφαλίδα όπως στο πρωτότυπο, τυπικός μέσος, ποσοστό κενών)
+POLLUTANT_COLUMNS = [
+    ("SO2\nμg/m3", 7.0, 0.25),
+    ("PM10\nμg/m3", 38.0, 0.05),
+    ("PM2,5\nμg/m3", 25.0, 0.4),
+    ("CO\nmg/m3", 0.8, 0.15),
+    ("NO\nμg/m3", 40.0, 0.2),
+    ("NO2\nμg/m3", 40.0, 0.2),
+    ("O3\nμg/m3", 45.0, 0.05),
+]
+
+
+def station_names(n_stations: int) -> List[str]:
+    return [f"Στ. ΣΥΝΘΕΤΙΚΟΣ {i + 1:03d}" for i in range(n_stations)]
+
+
+def station_mapping(n_stations: int, n_districts: int) -> Dict[str, str]:
+    return {
+        name: f"{(i % n_districts) + 1}ο Διαμέρισμα"
+        for i, name in enumerate(station_names(n_stations))
+    }
+
+
+def write_pollution_workbook(path: Path,
+                             n_stations: int = 6,
+                             years: int = 4,
+                             freq: str = "D",
+                             start_year: int = 2010,
+                             seed: int = 0) -> List[str]:
+    """Γράφει το workbook μετρήσεων· επιστρέφει τα ονόματα φύλλων."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(f"{start_year}-01-01", f"{start_year + years - 1}-12-31 23:00",
+                          freq=freq)
+    names = station_names(n_stations)
+
+    wb = Workbook(write_only=True)
+    wb.create_sheet("Χαρακτηριστικά Σταθμών").append(["Συνθετικά δεδομένα"])
+    for name in names:
+        ws = wb.create_sheet(name)
+        ws.append([f"Στ. Ατμοσφαιρικής\nΡύπανσης\n{name}", "A.A.",
+                   "Ημερο -\nμηνία", "Ημέρα"] + [c for c, _, _ in POLLUTANT_COLUMNS])
+
+        values = []
+        for _, mean, missing in POLLUTANT_COLUMNS:
+            col = np.round(rng.gamma(4.0, mean / 4.0, len(dates)), 1)
+            col[rng.random(len(dates)) < missing] = np.nan
+            values.append(col)
+        block = np.column_stack(values)
+
+        py_dates = dates.to_pydatetime()
+        for i, (day, row) in enumerate(zip(py_dates, block)):
+            label = f"ΕΤΟΣ {day.year}" if (i == 0 or day.year != py_dates[i - 1].year) else None
+            ws.append([label, float(i + 1), day, day]
+                      + [None if np.isnan(v) else float(v) for v in row])
+    wb.save(path)
+    return names
+
+
+def write_population_workbook(path: Path, n_districts: int = 5, seed: int = 0) -> None:
+    """Γράφει workbook απογραφής με n_districts Δημοτικές Κοινότητες."""
+    rng = np.random.default_rng(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(["Απογραφή Πληθυσμού 2011 – Συνθετικά", None, None, None, None])
+    ws.append(["Επίπεδο διοικητικής διαίρεσης", "α/α", "Γεωγραφικός κωδικός Καλλικράτη",
+               "Περιγραφή", "Μόνιμος Πληθυσμός"])
+    populations = rng.integers(10_000, 150_000, n_districts)
+    ws.append([5, 1, "0701", "ΔΗΜΟΣ ΘΕΣΣΑΛΟΝΙΚΗΣ", int(populations.sum())])
+    for i, pop in enumerate(populations):
+        ws.append([21, None, None,
+                   f"Δημοτική Κοινότητα {i + 1}ου Διαμερίσματος Θεσσαλονίκης", int(pop)])
+    wb.save(path)
+
+
+def generate(outdir: Path,
+             n_stations: int = 6,
+             years: int = 4,
+             freq: str = "D",
+             n_districts: int = 5,
+             seed: int = 0) -> Tuple[Path, Path, List[str], Dict[str, str]]:
+    """
+    Returns
+    -------
+    (pollution_xlsx, population_xlsx, φύλλα σταθμών, mapping σταθμός -> διαμέρισμα)
+    """
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    tag = f"s{n_stations}_y{years}_{freq}_d{n_districts}_seed{seed}"
+    pollution = outdir / f"pollution_{tag}.xlsx"
+    population = outdir / f"population_{tag}.xlsx"
+    if not pollution.exists():
+        write_pollution_workbook(pollution, n_stations, years, freq, seed=seed)
+    if not population.exists():
+        write_population_workbook(population, n_districts, seed=seed)
+    return pollution, population, station_names(n_stations), station_mapping(n_stations, n_districts)
@@ -13,7 +13,6 @@ Paths aligned to repo structure:
 
 from pathlib import Path
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # ---------------- ΡΥΘΜΙΣΕΙΣ ---------------- #
 STATION_SHEETS = [
@@ -102,7 +101,10 @@ def check_pollutant_status(row) -> str:
     return "🔴 Υπέρβαση Ορίων" if value > limit else "🟢 Εντός Ορίων"
 
 # ---- ΓΡΑΦΗΜΑΤΑ ---- #
+# matplotlib φορτώνεται μόνο όταν φτιάχνονται γραφήματα
 def plot_pollutant_by_district(df: pd.DataFrame, outdir: Path) -> None:
+    import matplotlib.pyplot as plt
+
     df = df.dropna(subset=["Μέσος Όρος 2010–2013"])
     pollutants = df["Ρύπος"].unique()
     for pollutant in pollutants:
@@ -138,6 +140,8 @@ def plot_pollutant_by_district(df: pd.DataFrame, outdir: Path) -> None:
         print(f"📊 Αποθηκεύτηκε γράφημα: {save_path}")
 
 def plot_total_pollution_per_capita(df: pd.DataFrame, outdir: Path) -> None:
+    import matplotlib.pyplot as plt
+
     df = df.dropna(subset=["Ρύποι ανά κάτοικο"])
     total_per_district = (
         df.groupby("Δημοτική Κοινότητα", as_index=False)["Ρύποι ανά κάτοικο"].sum()
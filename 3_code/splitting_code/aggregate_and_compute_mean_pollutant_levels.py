@@ -6,62 +6,216 @@ Process – aggregate_and_compute_mean_pollutant_levels
 
 Διαβάζει τα φύλλα ρύπανσης για όλους τους σταθμούς
 και υπολογίζει τους μέσους όρους 2010–2013 ανά ρύπο/σταθμό.
+
+Επιπλέον, aggregate_pollutant_levels_by_period δίνει χρονικά στατιστικά
+(ημερήσια / μηνιαία / ετήσια / κινητοί μέσοι 8h-24h) από έναν ενιαίο
+long-format πίνακα (Σταθμός, Ρύπος, Ημερομηνία, Τιμή).
 """
 
+import time
 from pathlib import Path
-from typing import List
+from typing import List, Sequence, Tuple
 import pandas as pd
 
+from dag_executor import process_pool
+from data_model import MeasurementModel
+from schema_registry import (
+    is_measurement_column,
+    normalize_columns,
+    resolve_columns,
+    resolve_header,
+)
+
+# Χρονικές αναλύσεις: (είδος, pandas frequency / rolling window)
+PERIODS = {
+    "daily": ("resample", "D"),
+    "monthly": ("resample", "MS"),
+    "annual": ("resample", "YS"),
+    "rolling_8h": ("rolling", "8h"),
+    "rolling_24h": ("rolling", "24h"),
+}
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    colmap = {}
-    for c in df.columns:
-        c_clean = str(c).replace("\n", " ").strip()
-        c_clean = c_clean.replace("Ημερο -", "Ημερο-").replace("PM2,5", "PM2.5")
-        colmap[c] = c_clean
-    return df.rename(columns=colmap)
+
+def _read_sheet_group(pollution_path: Path,
+                      sheets: List[str],
+                      measurements_only: bool = False) -> List[Tuple[str, pd.DataFrame, float]]:
+    """
+    Ανοίγει το workbook μία φορά (read-only, streaming γραμμών μέσω openpyxl)
+    και διαβάζει διαδοχικά τα φύλλα της ομάδας.
+
+    Επιστρέφει (φύλλο, DataFrame, χρόνος σε s) ανά φύλλο.
+    """
+    usecols = is_measurement_column if measurements_only else None
+    out = []
+    with pd.ExcelFile(pollution_path, engine="openpyxl") as xls:
+        for sheet in sheets:
+            t0 = time.perf_counter()
+            df = pd.read_excel(xls, sheet_name=sheet, usecols=usecols)
+            df = normalize_columns(df)
+            df["_sheet"] = sheet
+            out.append((sheet, df, time.perf_counter() - t0))
+    return out
 
 
 def _read_pollution_sheets(pollution_path: Path,
-                           station_sheets: List[str]) -> List[pd.DataFrame]:
-    dfs = []
-    for sheet in station_sheets:
-        df = pd.read_excel(pollution_path, sheet_name=sheet)
-        df = _normalize_columns(df)
-        df["_sheet"] = sheet
-        dfs.append(df)
-    return dfs
+                           station_sheets: List[str],
+                           measurements_only: bool = False,
+                           cache=None,
+                           workers: int = 1) -> List[pd.DataFrame]:
+    """
+    Διαβάζει όλα τα φύλλα σταθμών.
+
+    Με measurements_only=True διαβάζονται μόνο οι στήλες ημερομηνίας/ρύπων.
+    Με cache (InputCache) το Excel ανοίγει μόνο για φύλλα που δεν υπάρχουν ήδη.
+    Με workers > 1 τα φύλλα μοιράζονται σε ομάδες που διαβάζονται
+    παράλληλα σε process pool (κάθε worker ανοίγει το workbook μία φορά).
+    """
+    variant = "measurements" if measurements_only else "all"
+    found = {}
+    if cache is not None:
+        for sheet in station_sheets:
+            df = cache.get(cache.key(pollution_path, sheet, variant))
+            if df is not None:
+                found[sheet] = df
+                print(f"  ⏱ {sheet}: cache")
+
+    missing = [sheet for sheet in station_sheets if sheet not in found]
+    n_groups = max(1, min(workers, len(missing)))
+    groups = [missing[i::n_groups] for i in range(n_groups)] if missing else []
+
+    if n_groups > 1:
+        with process_pool(n_groups) as pool:
+            results = list(pool.map(
+                _read_sheet_group,
+                [pollution_path] * n_groups,
+                groups,
+                [measurements_only] * n_groups,
+            ))
+    else:
+        results = [_read_sheet_group(pollution_path, g, measurements_only)
+                   for g in groups]
+
+    for sheet, df, elapsed in (item for group in results for item in group):
+        found[sheet] = df
+        print(f"  ⏱ {sheet}: {elapsed:.2f}s ({len(df)} γραμμές)")
+        if cache is not None:
+            cache.put(cache.key(pollution_path, sheet, variant), df)
+
+    return [found[sheet] for sheet in station_sheets]
 
 
 def _compute_overall_means(pollution_dfs: List[pd.DataFrame]) -> pd.DataFrame:
     records = []
     for df in pollution_dfs:
         sheet = df["_sheet"].iloc[0]
-        pollutant_cols = [
-            c for c in df.columns
-            if any(p in c for p in ["SO2", "PM10", "PM2.5", "CO", "NO", "O3"])
-        ]
+        pollutant_cols = list(resolve_columns(df.columns).pollutant_columns)
         if not pollutant_cols:
             continue
 
         use = df[pollutant_cols].apply(pd.to_numeric, errors="coerce")
         means = use.mean().reset_index()
         means.columns = ["Ρύπος_raw", "Μέσος Όρος 2010–2013"]
-        means["Ρύπος"] = (
-            means["Ρύπος_raw"]
-            .str.replace("μg/m3", "", regex=False)
-            .str.replace("mg/m3", "", regex=False)
-            .str.strip()
-        )
+        means["Ρύπος"] = _pollutant_names(means["Ρύπος_raw"])
         means["Σταθμός"] = sheet
         records.append(means)
 
-    return pd.concat(records, ignore_index=True)
+    out = pd.concat(records, ignore_index=True)
+    # Επαναλαμβανόμενες ετικέτες -> categorical (ακέραιοι κωδικοί + lookup)
+    for col in ("Ρύπος_raw", "Ρύπος", "Σταθμός"):
+        out[col] = out[col].astype("category")
+    return out
+
+
+def _pollutant_names(raw: pd.Series) -> pd.Series:
+    """"PM10 μg/m3" -> "PM10" (κανονικό όνομα από το schema registry)."""
+    names = {}
+    for c in pd.unique(raw):
+        spec = resolve_header(c)
+        names[c] = spec.pollutant if spec is not None else str(c).strip()
+    return raw.map(names)
+
+
+def _to_long_format(pollution_dfs: List[pd.DataFrame],
+                    keep_raw: bool = False) -> pd.DataFrame:
+    """
+    Ενιαίος long-format πίνακας (Σταθμός, Ρύπος, Ημερομηνία, Τιμή) για όλα
+    τα φύλλα, με ένα μόνο melt· σταθμός/ρύπος ως categorical, τιμές float32.
+    Κρατούνται μόνο οι παρατηρήσεις με έγκυρη ημερομηνία & τιμή.
+    Με keep_raw=True κρατιέται και η αρχική ετικέτα στήλης (Ρύπος_raw).
+    """
+    frames = []
+    for df in pollution_dfs:
+        schema = resolve_columns(df.columns)
+        date_col, pollutant_cols = schema.date_column, list(schema.pollutant_columns)
+        if date_col is None or not pollutant_cols:
+            continue
+        frames.append(
+            df[[date_col, "_sheet", *pollutant_cols]]
+            .rename(columns={date_col: "Ημερομηνία", "_sheet": "Σταθμός"})
+        )
+
+    wide = pd.concat(frames, ignore_index=True)
+    long = wide.melt(id_vars=["Σταθμός", "Ημερομηνία"],
+                     var_name="Ρύπος_raw", value_name="Τιμή")
+    long["Τιμή"] = pd.to_numeric(long["Τιμή"], errors="coerce")
+    long["Ημερομηνία"] = pd.to_datetime(long["Ημερομηνία"], errors="coerce")
+    long = long.dropna(subset=["Ημερομηνία", "Τιμή"])
+
+    raw = long["Ρύπος_raw"].astype("category")
+    categories = raw.cat.categories.to_series()
+    names = dict(zip(categories, _pollutant_names(categories)))
+    long["Ρύπος"] = raw.map(names).astype("category")
+    long["Σταθμός"] = long["Σταθμός"].astype("category")
+    long["Τιμή"] = long["Τιμή"].astype("float32")
+    columns = ["Σταθμός", "Ρύπος", "Ημερομηνία", "Τιμή"]
+    if keep_raw:
+        long["Ρύπος_raw"] = raw
+        columns.append("Ρύπος_raw")
+    return long[columns].reset_index(drop=True)
+
+
+def _compute_period_stats(long: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    Στατιστικά ανά Σταθμό × Ρύπο × περίοδο με ένα groupby pass.
+
+    Για "daily"/"monthly"/"annual": mean/min/max/count ανά διάστημα.
+    Για "rolling_8h"/"rolling_24h": χρονικός κινητός μέσος ανά παρατήρηση.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Άγνωστη περίοδος: {period!r} (επιλογές: {list(PERIODS)})")
+    kind, freq = PERIODS[period]
+    keys = ["Σταθμός", "Ρύπος"]
+
+    if kind == "resample":
+        stats = (
+            long.groupby(keys + [pd.Grouper(key="Ημερομηνία", freq=freq)],
+                         observed=True)["Τιμή"]
+            .agg(["mean", "min", "max", "count"])
+            .reset_index()
+        )
+        return stats.rename(columns={
+            "mean": "Μέσος Όρος", "min": "Ελάχιστο",
+            "max": "Μέγιστο", "count": "Πλήθος",
+        })
+
+    ordered = long.sort_values(keys + ["Ημερομηνία"], kind="stable")
+    rolled = (
+        ordered.groupby(keys, observed=True)
+        .rolling(freq, on="Ημερομηνία", min_periods=1)["Τιμή"]
+        .mean()
+        .reset_index(level=keys)
+    )
+    out = ordered[keys + ["Ημερομηνία"]].copy()
+    out["Κινητός Μέσος"] = rolled["Τιμή"].to_numpy()
+    return out.reset_index(drop=True)
 
 
 def aggregate_and_compute_mean_pollutant_levels(
     pollution_path: Path,
-    station_sheets: List[str]
+    station_sheets: List[str],
+    measurements_only: bool = False,
+    cache=None,
+    workers: int = 1
 ) -> pd.DataFrame:
     """
     Public function (ίδιο όνομα με το αρχικό script).
@@ -72,12 +226,67 @@ def aggregate_and_compute_mean_pollutant_levels(
         Διαδρομή στο Excel με τις μετρήσεις ρύπανσης.
     station_sheets : list[str]
         Λίστα με τα ονόματα των φύλλων (σταθμούς).
+    measurements_only : bool
+        Αν True, διαβάζονται μόνο οι στήλες ημερομηνίας & ρύπων.
+    cache : InputCache, optional
+        Cache των parsed φύλλων (βλ. input_cache).
+    workers : int
+        Πλήθος διεργασιών για παράλληλη ανάγνωση φύλλων.
 
     Returns
     -------
     pd.DataFrame
         Μέσοι όροι ρύπων ανά σταθμό.
     """
-    pollution_dfs = _read_pollution_sheets(pollution_path, station_sheets)
+    pollution_dfs = _read_pollution_sheets(
+        pollution_path, station_sheets,
+        measurements_only=measurements_only, cache=cache, workers=workers
+    )
     overall_means = _compute_overall_means(pollution_dfs)
     return overall_means
+
+
+def aggregate_pollutant_levels_by_period(
+    pollution_path: Path,
+    station_sheets: List[str],
+    periods: Sequence[str] = ("daily", "monthly", "annual"),
+    cache=None,
+    workers: int = 1
+) -> dict:
+    """
+    Χρονικά στατιστικά ανά σταθμό/ρύπο.
+
+    Parameters
+    ----------
+    periods : sequence[str]
+        Υποσύνολο των PERIODS ("daily", "monthly", "annual",
+        "rolling_8h", "rolling_24h").
+
+    Returns
+    -------
+    dict
+        {περίοδος: DataFrame}
+    """
+    pollution_dfs = _read_pollution_sheets(
+        pollution_path, station_sheets,
+        measurements_only=True, cache=cache, workers=workers
+    )
+    long = _to_long_format(pollution_dfs)
+    return {period: _compute_period_stats(long, period) for period in periods}
+
+
+def build_measurement_model(
+    pollution_path: Path,
+    station_sheets: List[str],
+    cache=None,
+    workers: int = 1
+) -> MeasurementModel:
+    """
+    Συμπαγές μοντέλο μετρήσεων (κωδικοί + διαστάσεις, float32 τιμές)
+    για όλους τους σταθμούς (βλ. data_model).
+    """
+    pollution_dfs = _read_pollution_sheets(
+        pollution_path, station_sheets,
+        measurements_only=True, cache=cache, workers=workers
+    )
+    return MeasurementModel.from_long(_to_long_format(pollution_dfs))
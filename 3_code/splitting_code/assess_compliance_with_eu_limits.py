@@ -5,21 +5,123 @@
 Process – assess_compliance_with_eu_limits
 
 Ελέγχει για κάθε ρύπο αν είναι εντός / εκτός ορίων ΕΕ.
+
+Ο έλεγχος γίνεται vectorized ανά στήλη (χωρίς apply ανά γραμμή), ώστε να
+κλιμακώνεται σε εκατομμύρια εγγραφές σταθμού-ημέρας/ώρας.
 """
 
+from typing import Optional, Union
+import numpy as np
 import pandas as pd
 
+from schema_registry import mean_column
+
+STATUS_WITHIN = "🟢 Εντός Ορίων"
+STATUS_EXCEEDED = "🔴 Υπέρβαση Ορίων"
+STATUS_UNKNOWN = "Άγνωστο"
+STATUS_CATEGORIES = [STATUS_WITHIN, STATUS_EXCEEDED, STATUS_UNKNOWN]
+
+# Στήλες του πίνακα ορίων
+LIMIT_COLUMNS = ["Ρύπος", "Περίοδος", "Όριο", "Μονάδα"]
+DEFAULT_PERIOD = "mean"
+
+
+def _unit_for(pollutant: str) -> str:
+    return "mg/m³" if pollutant == "CO" else "μg/m³"
+
+
+def limits_table(limits: Union[dict, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Μετατρέπει λεξικό {ρύπος: όριο} σε πίνακα ορίων
+    (Ρύπος, Περίοδος, Όριο, Μονάδα)· πίνακας περνά αυτούσιος.
+    """
+    if isinstance(limits, pd.DataFrame):
+        missing = [c for c in LIMIT_COLUMNS if c not in limits.columns]
+        if missing:
+            raise ValueError(f"Λείπουν στήλες από τον πίνακα ορίων: {missing}")
+        return limits[LIMIT_COLUMNS]
+    return pd.DataFrame({
+        "Ρύπος": list(limits.keys()),
+        "Περίοδος": DEFAULT_PERIOD,
+        "Όριο": [float(v) for v in limits.values()],
+        "Μονάδα": [_unit_for(p) for p in limits.keys()],
+    })
+
+
+def limits_by_pollutant(table: pd.DataFrame, period: Optional[str]) -> pd.Series:
+    """Όριο ανά ρύπο (Series) από τον πίνακα ορίων, για μία περίοδο."""
+    if period is not None:
+        table = table[table["Περίοδος"] == period]
+    dup = table["Ρύπος"].duplicated(keep=False)
+    if dup.any():
+        raise ValueError(
+            "Πολλαπλά όρια ανά ρύπο· δώσε period για επιλογή: "
+            f"{sorted(table.loc[dup, 'Ρύπος'].unique())}"
+        )
+    return table.set_index("Ρύπος")["Όριο"].astype("float64")
+
+
+def classify_compliance(pollutants: pd.Series,
+                        values: pd.Series,
+                        limits: Union[dict, pd.DataFrame],
+                        period: Optional[str] = None) -> pd.DataFrame:
+    """
+    Vectorized ταξινόμηση ολόκληρων στηλών.
+
+    Ο ρύπος κωδικοποιείται ως categorical, οπότε η αντιστοίχιση ορίου
+    γίνεται μία φορά ανά κατηγορία και μετά με indexing στους κωδικούς.
+
+    Returns
+    -------
+    DataFrame
+        Στήλες "Όριο ΕΕ", "Περιθώριο" (τιμή - όριο) και "Κατάσταση"
+        (categorical), με το index των εισόδων.
+    """
+    limit_by_pollutant = limits_by_pollutant(limits_table(limits), period)
 
-def _check_pollutant_status(row, limits: dict) -> str:
-    pollutant = row["Ρύπος"]
-    value = row["Μέσος Όρος 2010–2013"]
-    if pollutant not in limits:
-        return "Άγνωστο"
-    limit = limits[pollutant]
-    return "🔴 Υπέρβαση Ορίων" if value > limit else "🟢 Εντός Ορίων"
+    cat = pd.Categorical(pollutants)
+    cat_limits = limit_by_pollutant.reindex(cat.categories).to_numpy()
+    codes = cat.codes
+    # Οι κωδικοί -1 (NaN ρύπος) μένουν NaN· δεν χρησιμοποιούνται ως index
+    # (με όλους τους ρύπους NaN οι κατηγορίες είναι κενές)
+    row_limit = np.full(len(codes), np.nan)
+    row_limit[codes >= 0] = cat_limits[codes[codes >= 0]]
+
+    vals = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64",
+                                                           na_value=np.nan)
+    known = ~np.isnan(row_limit)
+    # NaN > όριο είναι False -> "Εντός", όπως στην αρχική υλοποίηση
+    status_codes = np.where(~known, 2, np.where(vals > row_limit, 1, 0))
+
+    return pd.DataFrame({
+        "Όριο ΕΕ": row_limit,
+        "Περιθώριο": vals - row_limit,
+        "Κατάσταση": pd.Categorical.from_codes(status_codes, STATUS_CATEGORIES),
+    }, index=pollutants.index)
+
+
+def exceedance_counts(assessed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Σύνοψη ανά ρύπο: πλήθος εγγραφών, υπερβάσεων και μέγιστο περιθώριο.
+    """
+    exceeded = (assessed["Κατάσταση"] == STATUS_EXCEEDED).astype("int64")
+    return (
+        assessed.assign(_exceeded=exceeded)
+        .groupby("Ρύπος", observed=True, sort=False)
+        .agg(**{
+            "Εγγραφές": ("_exceeded", "size"),
+            "Υπερβάσεις": ("_exceeded", "sum"),
+            "Μέγιστο Περιθώριο": ("Περιθώριο", "max"),
+        })
+        .reset_index()
+    )
 
 
-def assess_compliance_with_eu_limits(df: pd.DataFrame, limits: dict) -> pd.DataFrame:
+def assess_compliance_with_eu_limits(df: pd.DataFrame,
+                                     limits: Union[dict, pd.DataFrame],
+                                     period: Optional[str] = None,
+                                     value_col: Optional[str] = None
+                                     ) -> pd.DataFrame:
     """
     Public function (ίδιο όνομα με το αρχικό script).
 
@@ -27,14 +129,22 @@ def assess_compliance_with_eu_limits(df: pd.DataFrame, limits: dict) -> pd.DataF
     ----------
     df : DataFrame
         Πίνακας με μέσους ρύπους & πληθυσμό.
-    limits : dict
-        Λεξικό {ρύπος: όριο}.
+    limits : dict | DataFrame
+        Λεξικό {ρύπος: όριο} ή πίνακας (Ρύπος, Περίοδος, Όριο, Μονάδα).
+    period : str, optional
+        Περίοδος αναφοράς όταν ο πίνακας έχει πολλά όρια ανά ρύπο.
+    value_col : str, optional
+        Στήλη τιμών προς έλεγχο (None -> η στήλη "Μέσος Όρος <περίοδος>").
 
     Returns
     -------
     DataFrame
-        Όπως df + στήλη "Κατάσταση".
+        Όπως df + στήλες "Όριο ΕΕ", "Περιθώριο", "Κατάσταση".
     """
     out = df.copy()
-    out["Κατάσταση"] = out.apply(_check_pollutant_status, axis=1, limits=limits)
+    if value_col is None:
+        value_col = mean_column(out.columns)
+    result = classify_compliance(out["Ρύπος"], out[value_col], limits, period)
+    for col in result.columns:
+        out[col] = result[col]
     return out
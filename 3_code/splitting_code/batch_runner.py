@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch εκτέλεση πολλών σεναρίων (όρια × αντιστοίχιση × περίοδος × πόλη)
+
+- Κάθε είσοδος (μετρήσεις, απογραφή, πίνακας βαρών) διαβάζεται μία φορά
+  ανά πόλη/αντιστοίχιση, όσα σενάρια κι αν τη χρησιμοποιούν
+- Τα parsed δεδομένα περνούν μία φορά σε κάθε worker (initializer του
+  process pool): το pool ξεκινά με spawn (dag_executor.process_pool,
+  ασφαλές και από threads), οπότε τα initargs γίνονται pickle μία φορά
+  ανά worker και όχι ανά σενάριο
+- Κάθε σενάριο: έκθεση ανά Δημοτική Κοινότητα × ρύπο × περίοδο
+  (βλ. exposure), έλεγχος ορίων και API_pc
+- Έξοδος: ενιαίος πίνακας σύγκρισης με στήλη "Σενάριο" αντί για N
+  ξεχωριστά πλήρη runs
+"""
+
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+import pandas as pd
+
+from aggregate_and_compute_mean_pollutant_levels import (
+    aggregate_and_compute_mean_pollutant_levels,
+    build_measurement_model,
+)
+from assess_compliance_with_eu_limits import (
+    STATUS_CATEGORIES,
+    classify_compliance,
+    exceedance_counts,
+)
+from clean_and_normalize_demographic_data import clean_and_normalize_demographic_data
+from dag_executor import process_pool
+from exposure import EXPOSURE_PERIODS, compute_exposure
+from spatial_assignment import spatial_weights, weights_from_mapping
+
+# Κοινά δεδομένα των workers (ορίζονται από τον initializer)
+_SHARED: Optional[dict] = None
+
+
+class Scenario(NamedTuple):
+    """
+    Ένα σενάριο σύγκρισης· τα πεδία είναι κλειδιά στα λεξικά ρυθμίσεων
+    (limit_sets, mappings, cities) του run_batch.
+    """
+    name: str
+    limits: str = "eu"
+    mapping: str = "admin"
+    period: Optional[str] = None  # None = ένας μέσος 2010–2013
+    city: str = "thessaloniki"
+
+
+# ---------------- κοινές είσοδοι ---------------- #
+
+def _weights(city: dict, mapping: Union[dict, str], spatial_kwargs: dict) -> pd.DataFrame:
+    """Στατικό mapping (dict) ή μέθοδος χωρικής αντιστοίχισης (str)."""
+    if isinstance(mapping, dict):
+        return weights_from_mapping(mapping)
+    return spatial_weights(city["pollution"], city["sheets"], city["centroids"],
+                           method=mapping, **spatial_kwargs)
+
+
+def load_shared_inputs(scenarios: Sequence[Scenario],
+                       cities: Dict[str, dict],
+                       mappings: Dict[str, Union[dict, str]],
+                       spatial_kwargs: Optional[dict] = None,
+                       cache=None,
+                       workers: int = 1) -> Dict[str, dict]:
+    """
+    Διαβάζει μία φορά ό,τι χρειάζονται τα σενάρια, ανά πόλη.
+
+    Returns
+    -------
+    dict
+        {πόλη: {"means", "model", "demo", "weights": {αντιστοίχιση: DataFrame}}}
+    """
+    spatial_kwargs = spatial_kwargs or {}
+    shared = {}
+    for city_name in dict.fromkeys(s.city for s in scenarios):
+        if city_name not in cities:
+            raise ValueError(f"Άγνωστη πόλη: {city_name!r} (επιλογές: {list(cities)})")
+        city = cities[city_name]
+        used = [s for s in scenarios if s.city == city_name]
+        print(f"📥 Είσοδοι {city_name}: {len(used)} σενάρια")
+
+        # Μέσοι 2010–2013 ή/και μοντέλο μετρήσεων για χρονική ανάλυση·
+        # με cache το δεύτερο διάβασμα των φύλλων έρχεται από τον δίσκο
+        means = model = None
+        if any(s.period is None for s in used):
+            means = aggregate_and_compute_mean_pollutant_levels(
+                city["pollution"], city["sheets"], measurements_only=True,
+                cache=cache, workers=workers)
+        if any(s.period is not None for s in used):
+            model = build_measurement_model(city["pollution"], city["sheets"],
+                                            cache=cache, workers=workers)
+
+        weights = {}
+        for mapping_name in dict.fromkeys(s.mapping for s in used):
+            if mapping_name not in mappings:
+                raise ValueError(f"Άγνωστη αντιστοίχιση: {mapping_name!r} "
+                                 f"(επιλογές: {list(mappings)})")
+            weights[mapping_name] = _weights(city, mappings[mapping_name], spatial_kwargs)
+
+        shared[city_name] = {
+            "means": means,
+            "model": model,
+            "demo": clean_and_normalize_demographic_data(city["census"], cache=cache),
+            "weights": weights,
+        }
+    return shared
+
+
+# ---------------- αξιολόγηση σεναρίου ---------------- #
+
+def evaluate_scenario(scenario: Scenario,
+                      inputs: dict,
+                      limit_sets: Dict[str, Union[dict, pd.DataFrame]]) -> Dict[str, pd.DataFrame]:
+    """
+    Έκθεση, έλεγχος ορίων & API_pc ενός σεναρίου (χωρίς I/O).
+
+    Returns
+    -------
+    dict
+        "comparison": Δημοτική Κοινότητα, Ρύπος, Περίοδος, Έκθεση,
+        Πληθυσμός, Ρύποι ανά κάτοικο, Όριο, Περιθώριο, Κατάσταση, Υποδείκτης
+        (το σύνολο ορίων – ΕΕ, WHO κ.λπ. – ονομάζει η στήλη "Όρια" του _labelled)
+        "api": Δημοτική Κοινότητα, Περίοδος, Πληθυσμός, Ρύποι, API, API_pc
+    """
+    if scenario.limits not in limit_sets:
+        raise ValueError(f"Άγνωστο σύνολο ορίων: {scenario.limits!r} "
+                         f"(επιλογές: {list(limit_sets)})")
+    if scenario.period is not None and scenario.period not in EXPOSURE_PERIODS:
+        raise ValueError(f"Άγνωστη περίοδος: {scenario.period!r} "
+                         f"(επιλογές: {list(EXPOSURE_PERIODS)})")
+    limits = limit_sets[scenario.limits]
+    source = inputs["means"] if scenario.period is None else inputs["model"]
+    result = compute_exposure(source, inputs["weights"][scenario.mapping],
+                              inputs["demo"], limits, period=scenario.period)
+
+    exposure = result["exposure"]
+    population = (
+        inputs["demo"].drop_duplicates("Δημοτική Κοινότητα")
+        .set_index("Δημοτική Κοινότητα")["Πληθυσμός"]
+    )
+    exposure["Πληθυσμός"] = (
+        exposure["Δημοτική Κοινότητα"].astype("object").map(population).astype("Int64")
+    )
+    exposure["Ρύποι ανά κάτοικο"] = exposure["Έκθεση"] / exposure["Πληθυσμός"]
+    status = classify_compliance(exposure["Ρύπος"].astype("object"),
+                                 exposure["Έκθεση"], limits)
+    # Το όριο είναι του scenario.limits, όχι απαραίτητα της ΕΕ
+    status = status.rename(columns={"Όριο ΕΕ": "Όριο"})
+    for col in status.columns:
+        exposure[col] = status[col]
+    # Υποδείκτης στο τέλος, δίπλα στην Κατάσταση
+    exposure["Υποδείκτης"] = exposure.pop("Υποδείκτης")
+    return {"comparison": exposure, "api": result["api"]}
+
+
+def _init_worker(shared: dict) -> None:
+    global _SHARED
+    _SHARED = shared
+
+
+def _evaluate_shared(scenario: Scenario) -> Dict[str, pd.DataFrame]:
+    return evaluate_scenario(scenario, _SHARED["inputs"][scenario.city],
+                             _SHARED["limit_sets"])
+
+
+# ---------------- public ---------------- #
+
+def _labelled(scenario: Scenario, df: pd.DataFrame) -> pd.DataFrame:
+    """Στήλες του σεναρίου μπροστά από τον πίνακα αποτελεσμάτων του."""
+    labels = {
+        "Σενάριο": scenario.name,
+        "Πόλη": scenario.city,
+        "Όρια": scenario.limits,
+        "Αντιστοίχιση": scenario.mapping,
+    }
+    out = df.copy()
+    for i, (col, value) in enumerate(labels.items()):
+        out.insert(i, col, value)
+    return out
+
+
+def concat_results(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Συνένωση πινάκων σεναρίων με κοινές categorical στήλες."""
+    out = pd.concat([f.astype({c: "object" for c in f.columns
+                               if isinstance(f[c].dtype, pd.CategoricalDtype)})
+                     for f in frames], ignore_index=True)
+    for col in ("Σενάριο", "Πόλη", "Όρια", "Αντιστοίχιση",
+                "Δημοτική Κοινότητα", "Ρύπος", "Περίοδος"):
+        if col in out.columns:
+            out[col] = out[col].astype("category")
+    if "Κατάσταση" in out.columns:
+        out["Κατάσταση"] = out["Κατάσταση"].astype(pd.CategoricalDtype(STATUS_CATEGORIES))
+    return out
+
+
+def scenarios_table(scenarios: Sequence[Scenario]) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Σενάριο": [s.name for s in scenarios],
+        "Πόλη": [s.city for s in scenarios],
+        "Όρια": [s.limits for s in scenarios],
+        "Αντιστοίχιση": [s.mapping for s in scenarios],
+        "Περίοδος": [s.period or "2010–2013" for s in scenarios],
+    })
+
+
+def run_batch(scenarios: Sequence[Scenario],
+              cities: Dict[str, dict],
+              limit_sets: Dict[str, Union[dict, pd.DataFrame]],
+              mappings: Dict[str, Union[dict, str]],
+              spatial_kwargs: Optional[dict] = None,
+              workers: Optional[int] = None,
+              cache=None,
+              read_workers: int = 1) -> Dict[str, pd.DataFrame]:
+    """
+    Εκτελεί όλα τα σενάρια με κοινές, μία φορά parsed εισόδους.
+
+    Parameters
+    ----------
+    cities : dict
+        {πόλη: {"pollution", "sheets", "census", "centroids"}}.
+    limit_sets : dict
+        {όνομα: λεξικό ορίων ή πίνακας ορίων}.
+    mappings : dict
+        {όνομα: στατικό mapping Σταθμός -> Δημοτική Κοινότητα (dict) ή
+        μέθοδος χωρικής αντιστοίχισης "nearest" / "idw" (str)}.
+    workers : int, optional
+        Διεργασίες για τα σενάρια· ≤ 1 -> σειριακά στην ίδια διεργασία.
+
+    Returns
+    -------
+    dict
+        "scenarios": ορισμοί σεναρίων
+        "comparison": ενιαίος πίνακας σύγκρισης (ένα block ανά σενάριο)
+        "summary": υπερβάσεις ανά σενάριο × ρύπο
+        "api": API / API_pc ανά σενάριο × Δημοτική Κοινότητα × περίοδο
+    """
+    names = [s.name for s in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Διπλά ονόματα σεναρίων: {names}")
+
+    inputs = load_shared_inputs(scenarios, cities, mappings, spatial_kwargs,
+                                cache=cache, workers=read_workers)
+    shared = {"inputs": inputs, "limit_sets": limit_sets}
+
+    print(f"🧪 Σενάρια: {len(scenarios)}")
+    if workers is not None and workers > 1 and len(scenarios) > 1:
+        with process_pool(min(workers, len(scenarios)),
+                          initializer=_init_worker, initargs=(shared,)) as pool:
+            results = list(pool.map(_evaluate_shared, scenarios))
+    else:
+        _init_worker(shared)
+        results = [_evaluate_shared(s) for s in scenarios]
+
+    comparison = concat_results([_labelled(s, r["comparison"]) for s, r in zip(scenarios, results)])
+    api = concat_results([_labelled(s, r["api"]) for s, r in zip(scenarios, results)])
+    summary = concat_results([
+        _labelled(s, exceedance_counts(r["comparison"]))
+        for s, r in zip(scenarios, results)
+    ])
+    return {
+        "scenarios": scenarios_table(scenarios),
+        "comparison": comparison,
+        "summary": summary,
+        "api": api,
+    }
+
+
+def export_batch(batch: Dict[str, pd.DataFrame], outxlsx: Path, **kwargs) -> Dict[str, dict]:
+    """Σενάρια (φύλλο Mapping), σύγκριση, σύνοψη & API_pc σε ένα αρχείο."""
+    from export_excel import export_results
+
+    return export_results(batch["scenarios"], batch["comparison"], outxlsx,
+                          extra_tables={"Σύνοψη": batch["summary"], "API_pc": batch["api"]},
+                          **kwargs)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Φόρτωση απογραφής 2011 (extended .xlsx & metropolitan .xls)
+
+Και τα δύο αρχεία έχουν την ίδια δομή (Επίπεδο, α/α, Γεωγραφικός κωδικός
+Καλλικράτη, Περιγραφή, Μόνιμος Πληθυσμός). Το extended προσθέτει τις
+Δημοτικές Κοινότητες των Διαμερισμάτων Θεσσαλονίκης (χωρίς κωδικό).
+
+- Ενιαίος πίνακας για όλες τις υποδιαιρέσεις (Δήμοι, Δημοτικές Ενότητες,
+  Δημοτικές Κοινότητες, Οικισμοί, Διαμερίσματα) μόνο με vectorized
+  πράξεις (str accessor, ffill) – χωρίς apply/lambda ανά γραμμή
+- CensusTable: lookups O(1) με γεωγραφικό κωδικό ή κανονικοποιημένο όνομα
+"""
+
+from pathlib import Path
+from typing import Iterable, Optional, Union
+import numpy as np
+import pandas as pd
+
+CENSUS_COLUMNS = ["Επίπεδο", "α/α", "Κωδικός", "Περιγραφή", "Πληθυσμός"]
+
+LEVEL_NAMES = {
+    5: "Δήμος",
+    6: "Δημοτική Ενότητα",
+    7: "Δημοτική Κοινότητα",
+    8: "Οικισμός",
+}
+# Επίπεδα > 8 στο extended αρχείο: Δημοτικές Κοινότητες Διαμερισμάτων
+DISTRICT_KIND = "Διαμέρισμα"
+COMMUNITY_KINDS = ("Δημοτική Κοινότητα", DISTRICT_KIND)
+
+_ACCENTS = str.maketrans("ΆΈΉΊΌΎΏΪΫ", "ΑΕΗΙΟΥΩΙΥ")
+_PREFIXES = r"^(?:ΔΗΜΟΣ|ΔΗΜΟΤΙΚΗ ΕΝΟΤΗΤΑ|Δημοτική Κοινότητα)\s+"
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """
+    Κλειδί αναζήτησης: κεφαλαία χωρίς τόνους, χωρίς "(Έδρα: ...)" και
+    άρθρο (",η"), με ενιαία κενά.
+    """
+    return (
+        names.astype("string")
+        .str.replace(r"\s*\(.*\)\s*$", "", regex=True)
+        .str.upper()
+        .str.translate(_ACCENTS)
+        .str.replace(r",\s*(?:Η|Ο|ΤΟ|ΟΙ|ΤΑ)$", "", regex=True)
+        .str.replace(r"\s*-\s*", " - ", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def normalize_name(name: str) -> str:
+    return normalize_names(pd.Series([name])).iloc[0]
+
+
+def read_census(path: Path, cache=None) -> pd.DataFrame:
+    """
+    Ένα αρχείο απογραφής -> πίνακας υποδιαιρέσεων.
+
+    Στήλες: Κωδικός, Επίπεδο, Είδος, Περιγραφή, Όνομα, Κλειδί, Πληθυσμός.
+    Τα Διαμερίσματα (χωρίς κωδικό στο αρχείο) παίρνουν κωδικό
+    "<κωδικός προηγούμενης γραμμής>.<αριθμός διαμερίσματος>".
+    """
+    if cache is not None:
+        key = cache.key(path, "census")
+        table = cache.get(key)
+        if table is None:
+            table = read_census(path)
+            cache.put(key, table)
+        return table
+
+    raw = pd.read_excel(path, header=None, skiprows=2, usecols=range(5),
+                        names=CENSUS_COLUMNS, dtype={2: str})
+    raw = raw.dropna(subset=["Περιγραφή"])
+
+    level = pd.to_numeric(raw["Επίπεδο"], errors="coerce").astype("Int64")
+    description = raw["Περιγραφή"].astype("string").str.strip()
+    code = raw["Κωδικός"].astype("string").str.strip()
+
+    district_no = description.str.extract(r"(\d+)ου\s+Διαμερίσματος", expand=False)
+    is_district = district_no.notna()
+    code = code.mask(is_district, code.ffill() + "." + district_no)
+
+    kind = level.map(LEVEL_NAMES).astype("string").mask(is_district, DISTRICT_KIND)
+    name = description.str.replace(r"\s*\(.*\)\s*$", "", regex=True)
+    name = name.str.replace(_PREFIXES, "", regex=True)
+    name = name.str.replace(r",\s*(?:η|ο|το|οι|τα)$", "", regex=True)
+    name = name.mask(is_district, district_no + "ο Διαμέρισμα")
+
+    table = pd.DataFrame({
+        "Κωδικός": code,
+        "Επίπεδο": level,
+        "Είδος": kind,
+        "Περιγραφή": description,
+        "Όνομα": name,
+        "Κλειδί": normalize_names(description),
+        "Πληθυσμός": pd.to_numeric(raw["Πληθυσμός"], errors="coerce").astype("Int64"),
+    })
+    return table.dropna(subset=["Κωδικός"]).reset_index(drop=True)
+
+
+class CensusTable:
+    """
+    Πίνακας πληθυσμού με ευρετήρια:
+    - γεωγραφικός κωδικός -> γραμμή (pd.Index, hash lookup)
+    - κανονικοποιημένο όνομα (Περιγραφή ή Όνομα) -> γραμμή (dict)
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table.reset_index(drop=True)
+        self._codes = pd.Index(self.table["Κωδικός"])
+        names = {}
+        # Πρώτα τα πλήρη ονόματα (πιο συγκεκριμένα), μετά τα σύντομα
+        for keys in (self.table["Κλειδί"], normalize_names(self.table["Όνομα"])):
+            for key, pos in zip(keys, range(len(self.table))):
+                names.setdefault(key, pos)
+        self._names = names
+
+    @classmethod
+    def from_files(cls, paths: Iterable[Path], cache=None) -> "CensusTable":
+        """Ένωση αρχείων· για κοινούς κωδικούς κρατείται το πρώτο αρχείο."""
+        tables = [read_census(Path(p), cache=cache) for p in paths]
+        table = pd.concat(tables, ignore_index=True).drop_duplicates("Κωδικός")
+        return cls(table)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def position(self, key: str) -> Optional[int]:
+        """Θέση γραμμής για κωδικό ή όνομα (None αν δεν βρεθεί)."""
+        if key in self._codes:
+            return self._codes.get_loc(key)
+        return self._names.get(normalize_name(key))
+
+    def lookup(self, key: str) -> Optional[pd.Series]:
+        pos = self.position(key)
+        return None if pos is None else self.table.iloc[pos]
+
+    def population(self, key: str):
+        pos = self.position(key)
+        return pd.NA if pos is None else self.table["Πληθυσμός"].iloc[pos]
+
+    def populations(self, keys: Iterable[str]) -> pd.Series:
+        """Πληθυσμοί για πολλά κλειδιά (κωδικοί ή ονόματα) με ένα indexing."""
+        keys = list(keys)
+        positions = np.array([-1 if (p := self.position(k)) is None else p for k in keys])
+        values = self.table["Πληθυσμός"].to_numpy(dtype="float64", na_value=np.nan)
+        out = np.where(positions >= 0, values[np.maximum(positions, 0)], np.nan)
+        return pd.Series(out, index=keys, name="Πληθυσμός").astype("Int64")
+
+    def communities(self) -> pd.DataFrame:
+        """Δημοτικές Κοινότητες & Διαμερίσματα: (Δημοτική Κοινότητα, Πληθυσμός)."""
+        rows = self.table[self.table["Είδος"].isin(COMMUNITY_KINDS)]
+        return pd.DataFrame({
+            "Δημοτική Κοινότητα": rows["Όνομα"].astype(str).to_numpy(),
+            "Πληθυσμός": rows["Πληθυσμός"].to_numpy(),
+        }).astype({"Πληθυσμός": "Int64"})
+
+
+def load_census(paths: Union[Path, Iterable[Path]], cache=None) -> CensusTable:
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    return CensusTable.from_files(paths, cache=cache)
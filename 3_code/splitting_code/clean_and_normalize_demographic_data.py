@@ -6,44 +6,35 @@ Process – clean_and_normalize_demographic_data
 
 Διαβάζει το Excel απογραφής και επιστρέφει
 πίνακα με Πληθυσμό ανά Δημοτική Κοινότητα (1ο, 2ο, κτλ Διαμέρισμα).
+
+Το parsing γίνεται από το census_loader, που διαβάζει και το extended
+(.xlsx) και το metropolitan (.xls) αρχείο.
 """
 
 from pathlib import Path
+from typing import Iterable, Union
 import pandas as pd
 
+from census_loader import load_census
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    colmap = {}
-    for c in df.columns:
-        c_clean = str(c).replace("\n", " ").strip()
-        c_clean = c_clean.replace("Ημερο -", "Ημερο-").replace("PM2,5", "PM2.5")
-        colmap[c] = c_clean
-    return df.rename(columns=colmap)
-
-
-def _read_population(pop_path: Path) -> pd.DataFrame:
-    pop_raw = pd.read_excel(pop_path)
-    pop = _normalize_columns(pop_raw)
-
-    name_col = next((c for c in pop.columns if "Unnamed: 3" in c), None)
-    pop_col = next((c for c in pop.columns if "Unnamed: 4" in c), None)
 
-    pop = pop[[name_col, pop_col]].dropna()
-    pop = pop[pop[name_col].astype(str).str.startswith("Δημοτική Κοινότητα")]
-    pop = pop.rename(columns={name_col: "Δημοτική Κοινότητα", pop_col: "Πληθυσμός"})
-    pop["Πληθυσμός"] = pd.to_numeric(pop["Πληθυσμός"], errors="coerce").astype("Int64")
-
-    pop["Δημοτική Κοινότητα"] = (
-        pop["Δημοτική Κοινότητα"]
-        .str.extract(r"(Δημοτική Κοινότητα\s*(\d+)[ου]*)")[1]
-        .astype(str)
-        .apply(lambda x: f"{x}ο Διαμέρισμα")
-    )
-    return pop
-
-
-def clean_and_normalize_demographic_data(population_path: Path) -> pd.DataFrame:
+def clean_and_normalize_demographic_data(
+    population_path: Union[Path, Iterable[Path]],
+    cache=None
+) -> pd.DataFrame:
     """
     Public function (ίδιο όνομα με το αρχικό script).
+
+    Parameters
+    ----------
+    population_path : Path | list[Path]
+        Αρχείο (ή αρχεία) απογραφής.
+    cache : InputCache, optional
+        Παρακάμπτεται το parsing όταν το αρχείο δεν άλλαξε.
+
+    Returns
+    -------
+    DataFrame
+        Δημοτική Κοινότητα ("1ο Διαμέρισμα", ..., "Τριανδρίας"), Πληθυσμός.
     """
-    return _read_population(population_path)
+    return load_census(population_path, cache=cache).communities()
@@ -5,12 +5,33 @@
 Controller για Thessaloniki Air Quality Workflow (Scenario 2)
 
 - Κρατάει όλα τα CONFIG (paths, σταθμούς, όρια ρύπων)
-- Καλεί τα processes με τη σειρά
+- Καλεί τα processes ως DAG (ανεξάρτητα processes τρέχουν παράλληλα)
 - Γράφει όλα τα outputs στον φάκελο 4_Outputs
+
+CLI (τρέχει μόνο τα stages που χρειάζεται το ζητούμενο αποτέλεσμα· τα
+βαριά modules – pandas, matplotlib, openpyxl – φορτώνονται όταν τρέξει
+stage που τα χρειάζεται):
+    python controller_scenario2.py                  # = all
+    python controller_scenario2.py compliance --out compliance.csv
+    python controller_scenario2.py export --sinks xlsx parquet
+    python controller_scenario2.py plot --format svg
+    python controller_scenario2.py batch --processes 4   # EU vs WHO 2021 κ.λπ.
 """
 
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
 from pathlib import Path
-import pandas as pd
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
+
+from dag_executor import Stage, required_stages, run_dag
+from instrumentation import Instrumentation
+
+if TYPE_CHECKING:  # μόνο για type hints – όχι import κατά την εκκίνηση
+    import pandas as pd
+    from input_cache import InputCache
 
 
 # Πλέον πάμε δύο επίπεδα πάνω: splitting_code -> 3_code -> ROOT
@@ -18,9 +39,6 @@ ROOT_DIR = Path(__file__).resolve().parents[2]
 
 DATA_DIR = ROOT_DIR / "2_data"
 OUTPUT_DIR = ROOT_DIR / "4_Outputs"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Φύλλα Excel με σταθμούς μέτρησης
 STATION_SHEETS = [
@@ -38,6 +56,12 @@ STATION_TO_AREA_ADMIN = {
     "Στ. ΝΕΟΥ ΔΗΜΑΡΧΕΙΟΥ": "5ο Διαμέρισμα"
 }
 
+# Χωρική αντιστοίχιση σταθμών -> περιοχών:
+# None (στατικό STATION_TO_AREA_ADMIN) | "nearest" | "idw"
+SPATIAL_ASSIGNMENT = None
+IDW_POWER = 2.0
+IDW_NEIGHBOURS = 3
+
 # Όρια ρύπων (ΕΕ/Οδηγίες)
 LIMITS = {
     "SO2": 125,
@@ -49,74 +73,820 @@ LIMITS = {
     "CO": 10
 }
 
+# WHO Air Quality Guidelines 2021 (χρήση ως εναλλακτικό σύνολο ορίων στο
+# batch). PM2.5/PM10/NO2: ετήσια· O3 (peak season), SO2 & CO (24ωρα)
+# δεν έχουν ετήσια τιμή και χρησιμοποιούνται ως αυστηρό όριο αναφοράς.
+WHO_2021_LIMITS = {
+    "SO2": 40,
+    "NO2": 10,
+    "O3": 60,
+    "PM10": 15,
+    "PM2.5": 5,
+    "CO": 4
+}
+
 # Αρχεία εισόδου/εξόδου
 POLLUTION_XLSX = DATA_DIR / "metriseis_atmosfairikis_rypansis_dimotikoy_diktyoy_2010_2013.xlsx"
 POPULATION_XLSX = DATA_DIR / "resident_population_census2011-extended thessaloniki.xlsx"
+POPULATION_METRO_XLS = DATA_DIR / "resident_population_census2011_Thessaloniki_metropolitan.xls"
+# Αρχεία απογραφής (για κοινούς κωδικούς προτεραιότητα έχει το πρώτο)
+CENSUS_FILES = [POPULATION_XLSX, POPULATION_METRO_XLS]
+AREA_CENTROIDS_CSV = DATA_DIR / "area_centroids.csv"
 OUTPUT_EXCEL = OUTPUT_DIR / "atmospheric_analysis_thessaloniki.xlsx"
+# Manifest με hash περιεχομένου ανά artifact: αμετάβλητα γραφήματα / αρχεία
+# εξαγωγής δεν ξαναγράφονται (βλ. output_manifest)
+MEMOIZE_OUTPUTS = True
+OUTPUT_MANIFEST = OUTPUT_DIR / ".manifest.json"
 
+# Πηγή μετρήσεων: "xlsx" (POLLUTION_XLSX) ή "dataset" (Hive-partitioned
+# Parquet πόλη/σταθμός/έτος στο DATASET_DIR, βλ. partitioned_store)· με
+# dataset τα φίλτρα του DATASET_QUERY γίνονται pruning partitions/row groups
+DATA_SOURCE = "xlsx"
+DATASET_DIR = ROOT_DIR / "dataset"
+DATASET_QUERY = dict(cities=["thessaloniki"], stations=None, pollutants=None,
+                     start=None, end=None)
 
-# ---------------- IMPORT PROCESSES ---------------- #
+# Cache των parsed εισόδων (Feather, LRU με όριο μεγέθους)
+CACHE_DIR = ROOT_DIR / ".cache" / "inputs"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
 
-from aggregate_and_compute_mean_pollutant_levels import (
-    aggregate_and_compute_mean_pollutant_levels,
-)
-from clean_and_normalize_demographic_data import (
-    clean_and_normalize_demographic_data,
-)
-from merge_and_compute_per_capita import merge_and_compute_per_capita
-from assess_compliance_with_eu_limits import assess_compliance_with_eu_limits
-from generate_graphs_and_visual_summaries import (
-    generate_graphs_and_visual_summaries,
-)
-from export_excel import export_excel
+# Παραλληλία: stages του DAG (threads) & ανάγνωση φύλλων (processes)
+STAGE_WORKERS = 4
+SHEET_WORKERS = min(len(STATION_SHEETS), os.cpu_count() or 1)
+CHART_WORKERS = os.cpu_count() or 1
+
+# Streaming ανάγνωση μετρήσεων σε chunks (για αρχεία μεγαλύτερα από τη μνήμη)
+STREAMING_INGEST = False
+STREAMING_CHUNK_ROWS = 50_000
+
+# Έλεγχος ποιότητας μετρήσεων (βλ. data_quality): "report" -> μόνο κάλυψη
+# & σημαίες στο Excel, "clean" -> μέσοι & έκθεση από τις καθαρισμένες
+# μετρήσεις (χωρίς αρνητικές τιμές, με συμπληρωμένα μικρά κενά)· ακραίες/
+# κολλημένες τιμές μόνο αναφέρονται και υπερβάσεις/εκατοστημόρια
+# διαβάζουν πάντα τις raw μετρήσεις
+DATA_QUALITY = "report"
+QC_WINDOW = None            # None -> ανάλογα με το βήμα (ημέρα/ώρα)
+QC_MAD_THRESHOLD = 5.0
+QC_STUCK_RUN = 6
+QC_MAX_GAP = 2
+QC_STUCK_FLOOR = None       # None -> όρια ανίχνευσης ανά ρύπο του data_quality
+
+# Persisted κατάσταση συσσώρευσης για incremental ενημερώσεις
+AGGREGATION_STATE = ROOT_DIR / ".cache" / "aggregation_state.json"
+# KLL sketches ανά σταθμό × ρύπο × μήνα για εκατοστημόρια (βλ. percentile_store)
+QUANTILE_SKETCHES = ROOT_DIR / ".cache" / "quantile_sketches.json"
+PERCENTILES = (0.5, 0.904, 0.998)
+
+# Εξαγωγή αποτελεσμάτων: sinks "xlsx" / "parquet" / "csv",
+# streaming xlsx (σταθερή μνήμη) και φύλλα ανά "station" / "pollutant"
+EXPORT_SINKS = ("xlsx",)
+EXPORT_STREAMING = False
+EXPORT_SPLIT_BY = None
+
+# Instrumentation ανά stage: JSON log + Chrome trace στο TRACE_DIR,
+# tracemalloc (με overhead) και cProfile ανά stage προαιρετικά
+INSTRUMENT = True
+INSTRUMENT_TRACEMALLOC = False
+PROFILE_STAGES = False
+TRACE_DIR = ROOT_DIR / ".cache" / "traces"
+
+# Batch σεναρίων: σύνολα ορίων, αντιστοιχίσεις (στατικό dict ή μέθοδος
+# "nearest"/"idw"), πόλεις (σύνολα εισόδων) και η λίστα σεναρίων
+LIMIT_SETS = {"eu": LIMITS, "who2021": WHO_2021_LIMITS}
+MAPPINGS = {"admin": STATION_TO_AREA_ADMIN, "nearest": "nearest", "idw": "idw"}
+CITIES = {
+    "thessaloniki": dict(pollution=POLLUTION_XLSX, sheets=STATION_SHEETS,
+                         census=CENSUS_FILES, centroids=AREA_CENTROIDS_CSV),
+}
+# (όνομα, όρια, αντιστοίχιση, περίοδος, πόλη)· περίοδος None = μέσος 2010–2013
+BATCH_SCENARIOS = [
+    ("EU – διοικητική", "eu", "admin", None, "thessaloniki"),
+    ("WHO 2021 – διοικητική", "who2021", "admin", None, "thessaloniki"),
+    ("EU – IDW", "eu", "idw", None, "thessaloniki"),
+    ("WHO 2021 – IDW", "who2021", "idw", None, "thessaloniki"),
+    ("EU – ετήσια", "eu", "admin", "annual", "thessaloniki"),
+    ("WHO 2021 – ετήσια", "who2021", "admin", "annual", "thessaloniki"),
+]
+BATCH_WORKERS = min(len(BATCH_SCENARIOS), os.cpu_count() or 1)
+BATCH_EXCEL = OUTPUT_DIR / "scenario_comparison.xlsx"
+
+# Γραφήματα: "png" | "svg" | "preview" (PNG χαμηλής ανάλυσης)
+CHART_FORMAT = "png"
+CHART_DPI = 300
+
+# Τοπική υπηρεσία ερωτημάτων (βλ. query_service): LRU cache απαντήσεων
+# και έλεγχος αλλαγών στα αρχεία εισόδου ανά SERVICE_POLL_SECONDS
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_CACHE_ENTRIES = 256
+SERVICE_POLL_SECONDS = 2.0
+
+# HTML dashboard χρονοσειρών: επίπεδα zoom × σημεία ανά tile, "minmax" / "lttb"
+DASHBOARD_HTML = OUTPUT_DIR / "dashboard.html"
+DASHBOARD_METHOD = "minmax"
+DASHBOARD_POINTS = 500
+DASHBOARD_LEVELS = 5
+
+
+# ---------------- LAZY PROCESSES ---------------- #
+
+def _lazy(module: str, name: str) -> Callable:
+    """Callable που κάνει import το module μόνο όταν κληθεί (όχι στην εκκίνηση)."""
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    call.__name__ = call.__qualname__ = name
+    return call
 
 
 # ---------------- CONTROLLER LOGIC ---------------- #
 
-def main():
+def _assignment_weights() -> pd.DataFrame:
+    """Πίνακας βαρών περιοχές × σταθμοί (στατικός ή χωρικός)."""
+    from spatial_assignment import spatial_weights, weights_from_mapping
+
+    if SPATIAL_ASSIGNMENT is None:
+        return weights_from_mapping(STATION_TO_AREA_ADMIN)
+    return spatial_weights(
+        POLLUTION_XLSX, STATION_SHEETS, AREA_CENTROIDS_CSV,
+        method=SPATIAL_ASSIGNMENT, power=IDW_POWER, k=IDW_NEIGHBOURS,
+    )
+
+
+def _merge_weighted(env_df: pd.DataFrame,
+                    demo_df: pd.DataFrame,
+                    weights: pd.DataFrame) -> pd.DataFrame:
+    from merge_and_compute_per_capita import merge_and_compute_per_capita
+
+    return merge_and_compute_per_capita(env_df, demo_df, weights=weights)
+
+
+def _measurements(env_means: pd.DataFrame, cache: InputCache):
+    """
+    Μοντέλο μετρήσεων για τους κανόνες ημερών· τρέχει μετά το #1 ώστε
+    τα parsed φύλλα να έρχονται από το cache.
+    """
+    from aggregate_and_compute_mean_pollutant_levels import build_measurement_model
+
+    return build_measurement_model(POLLUTION_XLSX, STATION_SHEETS,
+                                   cache=cache, workers=SHEET_WORKERS)
+
+
+def _streamed_means(stream: dict) -> pd.DataFrame:
+    return stream["means"]
+
+
+def _streamed_model(stream: dict):
+    return stream["model"]
+
+
+def _cleaned_model(quality: dict):
+    return quality["model"]
+
+
+def _sketches(model):
+    """
+    Sketches εκατοστημορίων, persisted στο QUANTILE_SKETCHES. Αν το store
+    χτίστηκε από τις ίδιες μετρήσεις φορτώνεται, ώστε να κρατά και ό,τι
+    συγχώνευσαν τα incremental updates· αλλιώς ξαναχτίζεται.
+    """
+    from percentile_store import SketchStore, model_digest
+
+    if QUANTILE_SKETCHES.exists():
+        store = SketchStore.load(QUANTILE_SKETCHES)
+        if store.source == model_digest(model):
+            print(f"♻ Sketches εκατοστημορίων από {QUANTILE_SKETCHES}")
+            return store
+    store = SketchStore.from_model(model)
+    store.save(QUANTILE_SKETCHES)
+    return store
+
+
+def _manifest():
+    from output_manifest import OutputManifest
+
+    return OutputManifest(OUTPUT_MANIFEST) if MEMOIZE_OUTPUTS else None
+
+
+def _export(mapping_df: pd.DataFrame,
+            assessed: pd.DataFrame,
+            exposure: dict,
+            exceedances: dict,
+            sketches,
+            quality: dict,
+            **kwargs) -> dict:
+    from export_excel import export_results
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    return export_results(mapping_df, assessed,
+                          extra_tables={"API_pc": exposure["api"],
+                                        "Υπερβάσεις ανά έτος": exceedances["counts"],
+                                        "Επεισόδια υπερβάσεων": exceedances["events"],
+                                        "Εκατοστημόρια": sketches.percentiles(
+                                            "annual", PERCENTILES),
+                                        "Κάλυψη δεδομένων": quality["coverage"]},
+                          manifest=_manifest(), **kwargs)
+
+
+def _visuals(assessed: pd.DataFrame, exposure: dict, **kwargs) -> None:
+    from generate_graphs_and_visual_summaries import generate_graphs_and_visual_summaries
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    return generate_graphs_and_visual_summaries(assessed, manifest=_manifest(),
+                                                api=exposure["api"], **kwargs)
+
+
+def _dashboard(model, **kwargs):
+    from dashboard import write_dashboard
+
+    return write_dashboard(model, manifest=_manifest(), **kwargs)
+
+
+def build_stages(cache: InputCache) -> list:
+    """
+    DAG των processes: τα #1 (περιβαλλοντικά) και #2 (δημογραφικά) δεν
+    μοιράζονται δεδομένα και τρέχουν ταυτόχρονα· export & γραφήματα
+    τρέχουν επίσης παράλληλα μετά το #4.
+
+    Με DATA_QUALITY == "clean" τα #3, έκθεση και dashboard παίρνουν
+    μέσους/μετρήσεις από το stage ποιότητας αντί για τα raw· υπερβάσεις και
+    sketches μετρούν πάντα τις raw μετρήσεις.
+
+    Με STREAMING_INGEST το workbook διαβάζεται μία φορά σε chunks (stage
+    "stream") και από αυτό προκύπτουν και οι μέσοι και το μοντέλο
+    μετρήσεων.
+    """
+    clean = DATA_QUALITY == "clean"
+    env_key = "env_clean" if clean else "env_means"
+    model_key = "clean_measurements" if clean else "measurements"
+    if DATA_SOURCE == "dataset":
+        source_stages = [
+            Stage(
+                "scan", _lazy("partitioned_store", "scan_store"),
+                kwargs=dict(root=DATASET_DIR, **DATASET_QUERY),
+                label="Ερώτημα στο partitioned store (pruning)",
+            ),
+            Stage(
+                "env_means", _lazy("partitioned_store", "means_frame"),
+                deps=("scan",),
+                label="Process #1 – μέσοι ανά σταθμό/ρύπο (partitioned store)",
+            ),
+            Stage(
+                "measurements", _lazy("partitioned_store", "model_from_scan"),
+                deps=("scan",),
+                label="Μοντέλο μετρήσεων σταθμών",
+            ),
+        ]
+    elif STREAMING_INGEST:
+        # Ένα πέρασμα σε chunks δίνει μέσους και μοντέλο μετρήσεων
+        source_stages = [
+            Stage(
+                "stream", _lazy("streaming_ingestion", "stream_measurements"),
+                kwargs=dict(pollution_path=POLLUTION_XLSX,
+                            station_sheets=STATION_SHEETS,
+                            chunk_rows=STREAMING_CHUNK_ROWS),
+                label="Streaming ανάγνωση μετρήσεων (chunks)",
+            ),
+            Stage(
+                "env_means", _streamed_means,
+                deps=("stream",),
+                label="Process #1 – aggregate_and_compute_mean_pollutant_levels (streaming)",
+            ),
+            Stage(
+                "measurements", _streamed_model,
+                deps=("stream",),
+                label="Μοντέλο μετρήσεων σταθμών",
+            ),
+        ]
+    else:
+        source_stages = [
+            Stage(
+                "env_means", _lazy("aggregate_and_compute_mean_pollutant_levels",
+                                   "aggregate_and_compute_mean_pollutant_levels"),
+                kwargs=dict(pollution_path=POLLUTION_XLSX,
+                            station_sheets=STATION_SHEETS,
+                            measurements_only=True,
+                            cache=cache,
+                            workers=SHEET_WORKERS),
+                label="Process #1 – aggregate_and_compute_mean_pollutant_levels",
+            ),
+            Stage(
+                "measurements", _measurements,
+                deps=("env_means",),
+                kwargs=dict(cache=cache),
+                label="Μοντέλο μετρήσεων σταθμών",
+            ),
+        ]
+
+    return [
+        # --- Process #1: Environmental (Aggregate & Mean) + μοντέλο μετρήσεων ---
+        *source_stages,
+        # --- Process #2: Demographic (Clean & Normalize) ---
+        Stage(
+            "demo_clean", _lazy("clean_and_normalize_demographic_data",
+                                "clean_and_normalize_demographic_data"),
+            kwargs=dict(population_path=CENSUS_FILES, cache=cache),
+            label="Process #2 – clean_and_normalize_demographic_data",
+        ),
+        # --- Αντιστοίχιση σταθμών -> περιοχών (πίνακας βαρών) ---
+        Stage(
+            "weights", _assignment_weights,
+            label="Αντιστοίχιση Σταθμός -> Δημοτική Κοινότητα",
+        ),
+        # --- Process #3: Merge & Per-Capita ---
+        Stage(
+            "merged_per_capita", _merge_weighted,
+            deps=(env_key, "demo_clean", "weights"),
+            label="Process #3 – merge_and_compute_per_capita",
+        ),
+        # --- Process #4: Assess Compliance with EU limits ---
+        Stage(
+            "assessed", _lazy("assess_compliance_with_eu_limits",
+                              "assess_compliance_with_eu_limits"),
+            deps=("merged_per_capita",),
+            kwargs=dict(limits=LIMITS),
+            label="Process #4 – assess_compliance_with_eu_limits",
+        ),
+        # --- Έκθεση πληθυσμού & API_pc ---
+        Stage(
+            "exposure", _lazy("exposure", "compute_exposure"),
+            deps=(env_key, "weights", "demo_clean"),
+            kwargs=dict(limits=LIMITS),
+            label="Έκθεση πληθυσμού & API_pc",
+        ),
+        # --- Ποιότητα δεδομένων: κάλυψη, ακραίες/κολλημένες τιμές, κενά ---
+        Stage(
+            "quality", _lazy("data_quality", "assess_quality"),
+            deps=("measurements",),
+            kwargs=dict(window=QC_WINDOW, mad_threshold=QC_MAD_THRESHOLD,
+                        stuck_run=QC_STUCK_RUN, max_gap=QC_MAX_GAP,
+                        stuck_floor=QC_STUCK_FLOOR),
+            label="Ποιότητα δεδομένων & κάλυψη (κανόνες ΕΕ)",
+        ),
+        *([
+            Stage(
+                "env_clean", _lazy("data_quality", "clean_means"),
+                deps=("env_means", "quality"),
+                label="Μέσοι από καθαρισμένες μετρήσεις",
+            ),
+            Stage(
+                "clean_measurements", _cleaned_model,
+                deps=("quality",),
+                label="Καθαρισμένες μετρήσεις",
+            ),
+        ] if clean else []),
+        # --- Κανόνες πλήθους υπερβάσεων ΕΕ (επεισόδια, ημέρες/έτος) ---
+        Stage(
+            "exceedances", _lazy("exceedance_events", "detect_exceedances"),
+            deps=("measurements",),
+            label="Επεισόδια & ημέρες υπέρβασης (κανόνες ΕΕ)",
+        ),
+        # --- Εκατοστημόρια: mergeable sketches ανά σταθμό × ρύπο × μήνα ---
+        Stage(
+            "sketches", _sketches,
+            deps=("measurements",),
+            label="Sketches εκατοστημορίων (KLL)",
+        ),
+        # --- Export (Excel / Parquet / CSV) ---
+        Stage(
+            "mapping_df", _lazy("spatial_assignment", "weights_to_mapping_frame"),
+            deps=("weights",),
+            label="Mapping Σταθμός -> Δημοτική Κοινότητα",
+        ),
+        Stage(
+            "export", _export,
+            deps=("mapping_df", "assessed", "exposure", "exceedances", "sketches",
+                  "quality"),
+            kwargs=dict(outxlsx=OUTPUT_EXCEL, sinks=EXPORT_SINKS,
+                        streaming=EXPORT_STREAMING, split_by=EXPORT_SPLIT_BY),
+            label="Export – export_excel",
+        ),
+        # --- Process #5: Visuals ---
+        Stage(
+            "visuals", _visuals,
+            deps=("assessed", "exposure"),
+            kwargs=dict(output_dir=OUTPUT_DIR, limits=LIMITS,
+                        fmt=CHART_FORMAT, dpi=CHART_DPI,
+                        workers=CHART_WORKERS),
+            label="Process #5 – generate_graphs_and_visual_summaries",
+        ),
+        # --- HTML dashboard χρονοσειρών (υποδειγματοληψία ανά επίπεδο zoom) ---
+        Stage(
+            "dashboard", _dashboard,
+            deps=(model_key,),
+            kwargs=dict(outhtml=DASHBOARD_HTML, limits=LIMITS, points=DASHBOARD_POINTS,
+                        levels=DASHBOARD_LEVELS, method=DASHBOARD_METHOD),
+            label="Dashboard χρονοσειρών (HTML)",
+        ),
+    ]
+
+
+# Υποεντολές CLI -> stage-στόχοι (None = όλα τα stages)
+COMMANDS = {
+    "aggregate": ("env_means",),
+    "per-capita": ("merged_per_capita",),
+    "compliance": ("assessed",),
+    "exceedances": ("exceedances",),
+    "quality": ("quality",),
+    "export": ("export",),
+    "plot": ("visuals",),
+    "dashboard": ("dashboard",),
+    "all": None,
+}
+# Υποεντολές με αποτέλεσμα dict: ο πίνακας που εκτυπώνεται / γράφεται σε CSV
+COMMAND_TABLES = {"exceedances": "counts", "quality": "coverage"}
+
+
+def run(targets: Optional[Sequence[str]] = None) -> dict:
+    """
+    Τρέχει τα stages που χρειάζονται για τους στόχους (None -> όλα).
+
+    Returns
+    -------
+    dict
+        {όνομα stage: αποτέλεσμα}
+    """
+    from input_cache import InputCache
+
+    cache = InputCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    stages = build_stages(cache)
+    if targets is not None:
+        stages = required_stages(stages, targets)
+
+    if INSTRUMENT:
+        instr = Instrumentation(trace_malloc=INSTRUMENT_TRACEMALLOC,
+                                profile_dir=TRACE_DIR / "profiles" if PROFILE_STAGES else None)
+        with instr:
+            results = run_dag(stages, max_workers=STAGE_WORKERS, wrap=instr.wrap)
+        instr.write(TRACE_DIR)
+    else:
+        results = run_dag(stages, max_workers=STAGE_WORKERS)
+    return results
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        description="Thessaloniki Air Quality Workflow (Scenario 2)")
+    ap.add_argument("--workers", type=int, default=STAGE_WORKERS,
+                    help="παράλληλα stages του DAG")
+    ap.add_argument("--no-instrument", action="store_true",
+                    help="χωρίς stages.json / trace.json")
+    ap.add_argument("--streaming", action="store_true",
+                    help="streaming ανάγνωση μετρήσεων σε chunks (μία ανάγνωση· οι μέσοι με "
+                         "σταθερή μνήμη, υπερβάσεις/ποιότητα/sketches/dashboard από "
+                         "συμπαγές μοντέλο που χτίζεται από τα ίδια chunks)")
+    ap.add_argument("--dataset", action="store_true",
+                    help="μετρήσεις από το partitioned store (DATASET_DIR) αντί για το xlsx")
+    ap.add_argument("--city", nargs="+", help="πόλεις του ερωτήματος (με --dataset)")
+    ap.add_argument("--query-stations", nargs="+", metavar="ΣΤΑΘΜΟΣ",
+                    help="σταθμοί του ερωτήματος (με --dataset)")
+    ap.add_argument("--query-pollutants", nargs="+", metavar="ΡΥΠΟΣ",
+                    help="ρύποι του ερωτήματος (με --dataset)")
+    ap.add_argument("--query-start", help="από (YYYY, YYYY-MM ή YYYY-MM-DD, με --dataset)")
+    ap.add_argument("--query-end", help="έως (inclusive, με --dataset)")
+    ap.add_argument("--force", action="store_true",
+                    help="εγγραφή όλων των εξόδων, ακόμη κι αν δεν άλλαξαν")
+    ap.add_argument("--clean-data", action="store_true",
+                    help="μέσοι & έκθεση χωρίς αρνητικές τιμές, με συμπληρωμένα μικρά κενά")
+    sub = ap.add_subparsers(dest="command", metavar="{" + ",".join(COMMANDS) + "}")
+
+    for name, help_text in [
+        ("aggregate", "Process #1 – μέσοι ανά σταθμό/ρύπο"),
+        ("per-capita", "Process #1–#3 – ρύποι ανά κάτοικο"),
+        ("compliance", "Process #1–#4 – έλεγχος ορίων ΕΕ"),
+        ("exceedances", "υπερβάσεις ανά έτος (κανόνες ημερών ΕΕ)"),
+        ("quality", "κάλυψη δεδομένων ανά σταθμό/ρύπο/έτος (κανόνες ΕΕ)"),
+    ]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--out", type=Path,
+                       help="CSV εξόδου (default: εκτύπωση στην οθόνη)")
+
+    p = sub.add_parser("export", help="Excel / Parquet / CSV αποτελεσμάτων")
+    p.add_argument("--sinks", nargs="+", default=list(EXPORT_SINKS),
+                   choices=["xlsx", "parquet", "csv"])
+    p.add_argument("--split-by", choices=["station", "pollutant"], default=EXPORT_SPLIT_BY)
+    p.add_argument("--streaming-xlsx", action="store_true", default=EXPORT_STREAMING)
+
+    p = sub.add_parser("plot", help="Process #5 – γραφήματα")
+    p.add_argument("--format", choices=["png", "svg", "preview"], default=CHART_FORMAT)
+    p.add_argument("--dpi", type=int, default=CHART_DPI)
+
+    p = sub.add_parser("dashboard", help="HTML dashboard χρονοσειρών με επίπεδα zoom")
+    p.add_argument("--method", choices=["minmax", "lttb"], default=DASHBOARD_METHOD)
+    p.add_argument("--points", type=int, default=DASHBOARD_POINTS,
+                   help="σημεία ανά tile")
+    p.add_argument("--levels", type=int, default=DASHBOARD_LEVELS,
+                   help="μέγιστα επίπεδα zoom")
+
+    sub.add_parser("all", help="όλο το workflow (default)")
+
+    p = sub.add_parser("percentiles",
+                       help="εκατοστημόρια από τα persisted sketches (χωρίς parsing)")
+    p.add_argument("--period", choices=["monthly", "annual", "overall"], default="annual")
+    p.add_argument("--by", choices=["station", "district"], default="station")
+    p.add_argument("--stations", nargs="+")
+    p.add_argument("--pollutants", nargs="+")
+    p.add_argument("--start", help="YYYY ή YYYY-MM")
+    p.add_argument("--end", help="YYYY ή YYYY-MM")
+    p.add_argument("--rebuild", action="store_true",
+                   help="ξαναχτίσιμο των sketches από τις μετρήσεις")
+    p.add_argument("--out", type=Path,
+                   help="CSV εξόδου (default: εκτύπωση στην οθόνη)")
+
+    p = sub.add_parser("serve", help="τοπική HTTP υπηρεσία ερωτημάτων στα aggregates")
+    p.add_argument("--host", default=SERVICE_HOST)
+    p.add_argument("--port", type=int, default=SERVICE_PORT)
+    p.add_argument("--cache-entries", type=int, default=SERVICE_CACHE_ENTRIES,
+                   help="μέγεθος του LRU cache απαντήσεων")
+
+    p = sub.add_parser("ingest",
+                       help="workbooks -> partitioned store πόλη/σταθμός/έτος (Parquet)")
+    p.add_argument("--cities", nargs="+", help="υποσύνολο των CITIES (default: όλες)")
+
+    p = sub.add_parser("centroids",
+                       help="κεντροειδή περιοχών από αρχείο ορίων GeoJSON -> AREA_CENTROIDS_CSV")
+    p.add_argument("boundaries", type=Path, help="όρια περιοχών (GeoJSON, WGS84)")
+    p.add_argument("--name-property", required=True,
+                   help="ιδιότητα του GeoJSON με το όνομα της περιοχής")
+    p.add_argument("--source", required=True,
+                   help="πηγή των ορίων (φορέας, σύνολο δεδομένων, ημερομηνία λήψης)")
+
+    p = sub.add_parser("batch", help="σύγκριση σεναρίων (όρια × αντιστοίχιση × περίοδος)")
+    p.add_argument("--scenarios", nargs="+", metavar="ΟΝΟΜΑ",
+                   help="υποσύνολο των BATCH_SCENARIOS (default: όλα)")
+    p.add_argument("--processes", type=int, default=BATCH_WORKERS,
+                   help="διεργασίες για τα σενάρια (1 = σειριακά)")
+    p.add_argument("--sinks", nargs="+", default=list(EXPORT_SINKS),
+                   choices=["xlsx", "parquet", "csv"])
+    return ap
+
+
+def _apply_args(args: argparse.Namespace) -> None:
+    """Οι επιλογές της γραμμής εντολών υπερισχύουν του CONFIG του module."""
+    config = globals()
+    config["STAGE_WORKERS"] = args.workers
+    config["INSTRUMENT"] = INSTRUMENT and not args.no_instrument
+    config["STREAMING_INGEST"] = STREAMING_INGEST or args.streaming
+    config["MEMOIZE_OUTPUTS"] = MEMOIZE_OUTPUTS and not args.force
+    if args.dataset:
+        config["DATA_SOURCE"] = "dataset"
+    query = dict(DATASET_QUERY)
+    for key, value in [("cities", args.city), ("stations", args.query_stations),
+                       ("pollutants", args.query_pollutants),
+                       ("start", args.query_start), ("end", args.query_end)]:
+        if value is not None:
+            query[key] = value
+    config["DATASET_QUERY"] = query
+    if args.clean_data:
+        config["DATA_QUALITY"] = "clean"
+    if args.command == "export":
+        config["EXPORT_SINKS"] = tuple(args.sinks)
+        config["EXPORT_SPLIT_BY"] = args.split_by
+        config["EXPORT_STREAMING"] = args.streaming_xlsx
+    elif args.command == "plot":
+        config["CHART_FORMAT"] = args.format
+        config["CHART_DPI"] = args.dpi
+    elif args.command == "dashboard":
+        config["DASHBOARD_METHOD"] = args.method
+        config["DASHBOARD_POINTS"] = args.points
+        config["DASHBOARD_LEVELS"] = args.levels
+
+
+def batch_main(scenarios: Optional[Sequence[str]] = None,
+               processes: int = BATCH_WORKERS,
+               sinks: Sequence[str] = EXPORT_SINKS) -> dict:
+    """
+    Όλα (ή τα επιλεγμένα) BATCH_SCENARIOS με κοινές εισόδους και ένα
+    αρχείο σύγκρισης (BATCH_EXCEL).
+    """
+    from batch_runner import Scenario, export_batch, run_batch
+    from input_cache import InputCache
+
+    selected = [Scenario(*spec) for spec in BATCH_SCENARIOS]
+    if scenarios:
+        unknown = [n for n in scenarios if n not in {s.name for s in selected}]
+        if unknown:
+            raise ValueError(f"Άγνωστα σενάρια: {unknown}")
+        selected = [s for s in selected if s.name in scenarios]
+
+    cache = InputCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    batch = run_batch(selected, CITIES, LIMIT_SETS, MAPPINGS,
+                      spatial_kwargs=dict(power=IDW_POWER, k=IDW_NEIGHBOURS),
+                      workers=processes, cache=cache, read_workers=SHEET_WORKERS)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    export_batch(batch, BATCH_EXCEL, sinks=sinks, streaming=EXPORT_STREAMING)
+    return batch
+
+
+def ingest_main(cities: Optional[Sequence[str]] = None) -> dict:
+    """Τα workbooks των CITIES στο partitioned store (DATASET_DIR)."""
+    from input_cache import InputCache
+    from partitioned_store import PartitionedStore, ingest_cities
+
+    cache = InputCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    written = ingest_cities(DATASET_DIR, CITIES, cities, cache=cache, workers=SHEET_WORKERS)
+    return {"partitions": PartitionedStore(DATASET_DIR).summary(), "written": written}
+
+
+def centroids_main(boundaries: Path, name_property: str, source: str) -> pd.DataFrame:
+    """Κεντροειδή από αρχείο ορίων -> AREA_CENTROIDS_CSV (με την πηγή στην κεφαλίδα)."""
+    from spatial_assignment import boundary_centroids, write_area_centroids
+
+    centroids = boundary_centroids(boundaries, name_property)
+    write_area_centroids(centroids, AREA_CENTROIDS_CSV, source, boundaries=boundaries)
+    print(f"📍 Κεντροειδή: {AREA_CENTROIDS_CSV}")
+    return centroids
+
+
+def percentiles_main(period: str = "annual",
+                     by: str = "station",
+                     rebuild: bool = False,
+                     **query) -> pd.DataFrame:
+    """
+    Εκατοστημόρια από το QUANTILE_SKETCHES· τα sketches χτίζονται (μία
+    φορά) μόνο αν λείπουν ή ζητηθεί rebuild.
+    """
+    from percentile_store import SketchStore
+
+    if rebuild:
+        QUANTILE_SKETCHES.unlink(missing_ok=True)
+    if not QUANTILE_SKETCHES.exists():
+        store = run(["sketches"])["sketches"]
+    else:
+        store = SketchStore.load(QUANTILE_SKETCHES)
+    if by == "district":
+        return store.district_percentiles(_assignment_weights(), period, PERCENTILES, **query)
+    return store.percentiles(period, PERCENTILES, **query)
+
+
+# Stages που χρειάζεται η υπηρεσία ερωτημάτων
+SERVICE_STAGES = ("assessed", "exposure", "exceedances", "quality", "sketches")
+
+
+def service_tables() -> dict:
+    """
+    Aggregates της υπηρεσίας ερωτημάτων από ένα run των SERVICE_STAGES:
+    έλεγχος ορίων ανά σταθμό, έκθεση & κατάσταση ανά Δημοτική Κοινότητα
+    (2010–2013 και ανά έτος), API_pc, υπερβάσεις, κάλυψη, εκατοστημόρια.
+    """
+    import pandas as pd
+    from batch_runner import Scenario, concat_results, evaluate_scenario
+
+    results = run(list(SERVICE_STAGES))
+    model_key = "clean_measurements" if DATA_QUALITY == "clean" else "measurements"
+    env_key = "env_clean" if DATA_QUALITY == "clean" else "env_means"
+    inputs = {"means": results[env_key], "model": results[model_key],
+              "demo": results["demo_clean"], "weights": {"current": results["weights"]}}
+    evaluated = [evaluate_scenario(Scenario(name, mapping="current", period=period),
+                                   inputs, {"eu": LIMITS})
+                 for name, period in (("overall", None), ("annual", "annual"))]
+
+    return {
+        "compliance": results["assessed"],
+        "districts": concat_results([r["comparison"] for r in evaluated]),
+        "api": concat_results([r["api"] for r in evaluated]),
+        "exceedances": results["exceedances"]["counts"],
+        "events": results["exceedances"]["events"],
+        "coverage": results["quality"]["coverage"],
+        "percentiles": pd.concat(
+            [results["sketches"].percentiles(period, PERCENTILES)
+             for period in ("annual", "overall")], ignore_index=True),
+    }
+
+
+def service_inputs() -> list:
+    """Αρχεία εισόδου που παρακολουθεί η υπηρεσία (αλλαγή -> επαναϋπολογισμός)."""
+    paths = [*CENSUS_FILES]
+    if DATA_SOURCE == "dataset":
+        paths += sorted(DATASET_DIR.glob("city=*/station=*/year=*/*.parquet"))
+    else:
+        paths.append(POLLUTION_XLSX)
+    if SPATIAL_ASSIGNMENT is not None:
+        paths.append(AREA_CENTROIDS_CSV)
+    return paths
+
+
+def serve_main(host: str = SERVICE_HOST,
+               port: int = SERVICE_PORT,
+               cache_entries: int = SERVICE_CACHE_ENTRIES) -> None:
+    from query_service import serve
+
+    serve(service_tables, service_inputs, host=host, port=port,
+          cache_entries=cache_entries, poll_seconds=SERVICE_POLL_SECONDS)
+
+
+def _print_or_save(table: pd.DataFrame, out: Optional[Path]) -> None:
+    if out is not None:
+        Path(out).parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(out, index=False, encoding="utf-8-sig")
+        print(f"\n📄 Αποθήκευση CSV: {out}")
+    else:
+        print()
+        print(table.to_string(index=False))
+
+
+def _workflow(command: str = "all", out: Optional[Path] = None) -> dict:
+    """Τα stages της υποεντολής (COMMANDS) με το τρέχον CONFIG του module."""
     print("📂 Paths εισόδου / εξόδου:")
     print(f"  Ρύπανση:      {POLLUTION_XLSX}")
     print(f"  Πληθυσμός:    {POPULATION_XLSX}")
     print(f"  Output dir:   {OUTPUT_DIR}")
     print(f"  Output Excel: {OUTPUT_EXCEL}")
 
-    # --- Process #1: Environmental (Aggregate & Mean) ---
-    print("\n▶ Process #1 – aggregate_and_compute_mean_pollutant_levels")
-    env_means = aggregate_and_compute_mean_pollutant_levels(
-        POLLUTION_XLSX,
-        STATION_SHEETS
-    )
+    targets = COMMANDS[command]
+    results = run(targets)
 
-    # --- Process #2: Demographic (Clean & Normalize) ---
-    print("\n▶ Process #2 – clean_and_normalize_demographic_data")
-    demo_clean = clean_and_normalize_demographic_data(POPULATION_XLSX)
+    if targets is not None and command not in ("export", "plot", "dashboard"):
+        table = results[targets[0]]
+        if command in COMMAND_TABLES:
+            table = table[COMMAND_TABLES[command]]
+        _print_or_save(table, out)
+        print(f"\n✅ Ολοκληρώθηκε ({command}).")
+    else:
+        print(f"\n✅ Ολοκληρώθηκε. Δες αποτελέσματα στον φάκελο: {OUTPUT_DIR}")
+    return results
 
-    # --- Process #3: Merge & Per-Capita ---
-    print("\n▶ Process #3 – merge_and_compute_per_capita")
-    merged_per_capita = merge_and_compute_per_capita(
-        env_means,
-        demo_clean,
-        STATION_TO_AREA_ADMIN
-    )
 
-    # --- Process #4: Assess Compliance with EU limits ---
-    print("\n▶ Process #4 – assess_compliance_with_eu_limits")
-    assessed = assess_compliance_with_eu_limits(merged_per_capita, LIMITS)
+def main() -> dict:
+    """
+    Όλο το workflow με το CONFIG του module· δεν διαβάζει το sys.argv, οπότε
+    καλείται με ασφάλεια από notebooks / tests (η γραμμή εντολών: cli).
+    """
+    return _workflow("all")
+
 
-    # --- Export Excel ---
-    print("\n▶ Export – export_excel")
-    mapping_df = pd.DataFrame({
-        "Σταθμός": list(STATION_TO_AREA_ADMIN.keys()),
-        "Δημοτική Κοινότητα": list(STATION_TO_AREA_ADMIN.values()),
-    })
-    export_excel(mapping_df, assessed, OUTPUT_EXCEL)
+def cli(argv: Optional[Sequence[str]] = None) -> dict:
+    """Entry point της γραμμής εντολών (argv=None -> sys.argv)."""
+    args = _build_parser().parse_args(argv)
+    command = args.command or "all"
+    _apply_args(args)
 
-    # --- Process #5: Visuals ---
-    print("\n▶ Process #5 – generate_graphs_and_visual_summaries")
-    generate_graphs_and_visual_summaries(assessed, OUTPUT_DIR, LIMITS)
+    if command == "batch":
+        batch = batch_main(args.scenarios, args.processes, args.sinks)
+        print(f"\n✅ Ολοκληρώθηκε. Σύγκριση σεναρίων: {BATCH_EXCEL}")
+        return batch
+    if command == "serve":
+        serve_main(args.host, args.port, args.cache_entries)
+        return {}
+    if command == "ingest":
+        result = ingest_main(args.cities)
+        _print_or_save(result["partitions"], None)
+        return result
+    if command == "centroids":
+        table = centroids_main(args.boundaries, args.name_property, args.source)
+        _print_or_save(table, None)
+        return {"centroids": table}
+    if command == "percentiles":
+        table = percentiles_main(args.period, args.by, args.rebuild,
+                                 stations=args.stations, pollutants=args.pollutants,
+                                 start=args.start, end=args.end)
+        _print_or_save(table, args.out)
+        return {"percentiles": table}
 
-    print(f"\n✅ Ολοκληρώθηκε. Δες αποτελέσματα στον φάκελο: {OUTPUT_DIR}")
+    return _workflow(command, getattr(args, "out", None))
+
+
+# Επιπλέον πίνακες του export (σειρά του πλήρους run)· στο incremental
+# update όσοι δεν ξαναϋπολογίζονται κρατιούνται από την προηγούμενη εξαγωγή
+EXPORT_TABLES = ("API_pc", "Υπερβάσεις ανά έτος", "Επεισόδια υπερβάσεων",
+                 "Εκατοστημόρια", "Κάλυψη δεδομένων")
+
+
+def update_main(new_chunks):
+    """
+    Incremental ενημέρωση με νέες γραμμές [(σταθμός, DataFrame), ...]·
+    την πρώτη φορά χτίζεται η κατάσταση από ολόκληρο το ιστορικό.
+    Εξαγωγή με τα ίδια sinks/manifest με το πλήρες run· υπερβάσεις και
+    κάλυψη μένουν όπως τις έγραψε το τελευταίο πλήρες run.
+    """
+    from clean_and_normalize_demographic_data import clean_and_normalize_demographic_data
+    from export_excel import read_exported_tables
+    from incremental_update import build_state, update_with_new_rows
+    from input_cache import InputCache
+    from spatial_assignment import weights_to_mapping_frame
+
+    if not AGGREGATION_STATE.exists():
+        print(f"🧮 Αρχική κατάσταση: {AGGREGATION_STATE}")
+        build_state(POLLUTION_XLSX, STATION_SHEETS).save(AGGREGATION_STATE)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    cache = InputCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    demo_clean = clean_and_normalize_demographic_data(CENSUS_FILES, cache=cache)
+    weights = _assignment_weights()
+    manifest = _manifest()
+    return update_with_new_rows(
+        AGGREGATION_STATE, new_chunks, demo_clean,
+        STATION_TO_AREA_ADMIN, LIMITS, OUTPUT_DIR, OUTPUT_EXCEL,
+        weights=weights,
+        mapping_df=weights_to_mapping_frame(weights),
+        chart_kwargs=dict(fmt=CHART_FORMAT, dpi=CHART_DPI, workers=CHART_WORKERS,
+                          manifest=manifest),
+        export_kwargs=dict(sinks=EXPORT_SINKS, streaming=EXPORT_STREAMING,
+                           split_by=EXPORT_SPLIT_BY, manifest=manifest),
+        extra_tables=read_exported_tables(OUTPUT_EXCEL, EXPORT_TABLES, EXPORT_SINKS),
+        sketch_path=QUANTILE_SKETCHES,
+        percentiles=PERCENTILES,
+    )
 
 
 if __name__ == "__main__":
-    main()
+    cli()
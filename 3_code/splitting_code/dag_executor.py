@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Μικρός DAG executor για τα processes του controller.
+
+Κάθε Stage δηλώνει από ποια stages εξαρτάται· όσα stages έχουν έτοιμες
+εξαρτήσεις τρέχουν ταυτόχρονα σε thread pool, οπότε ο συνολικός χρόνος
+είναι αυτός του critical path και όχι το άθροισμα όλων των stages.
+
+Τα process pools που ανοίγουν τα stages (ανάγνωση φύλλων, γραφήματα)
+φτιάχνονται με process_pool: fork από διεργασία με πολλά threads
+μπορεί να αντιγράψει στο παιδί lock που κρατά κάποιο άλλο thread
+(logging, InputCache, manifest) και να κολλήσει, οπότε τα workers
+ξεκινούν με spawn. Έτσι είναι και άμεσα παιδιά της διεργασίας (όχι του
+forkserver), ώστε το instrumentation να μετρά το CPU/I-O τους.
+"""
+
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Μέθοδος εκκίνησης των workers των process pools
+POOL_START_METHOD = "spawn"
+
+
+class Stage:
+    """
+    Ένα βήμα του DAG.
+
+    Parameters
+    ----------
+    name : str
+        Μοναδικό όνομα· με αυτό το όνομα αποθηκεύεται το αποτέλεσμα.
+    func : callable
+        Καλείται ως func(*[αποτελέσματα deps], **kwargs).
+    deps : iterable[str]
+        Ονόματα stages των οποίων τα αποτελέσματα χρειάζεται.
+    kwargs : dict, optional
+        Σταθερά ορίσματα (config).
+    label : str, optional
+        Κείμενο για το banner προόδου.
+    """
+
+    def __init__(self,
+                 name: str,
+                 func: Callable[..., Any],
+                 deps: Iterable[str] = (),
+                 kwargs: Optional[Dict[str, Any]] = None,
+                 label: Optional[str] = None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.kwargs = kwargs or {}
+        self.label = label or name
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, deps={self.deps!r})"
+
+
+def process_pool(max_workers: int, **kwargs) -> ProcessPoolExecutor:
+    """ProcessPoolExecutor ασφαλές για κλήση μέσα από threads (χωρίς fork)."""
+    return ProcessPoolExecutor(max_workers=max_workers,
+                               mp_context=multiprocessing.get_context(POOL_START_METHOD),
+                               **kwargs)
+
+
+def _validate(stages: List[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Διπλά ονόματα stages: {names}")
+    known = set(names)
+    for s in stages:
+        unknown = [d for d in s.deps if d not in known]
+        if unknown:
+            raise ValueError(f"Το stage {s.name!r} εξαρτάται από άγνωστα: {unknown}")
+
+    # Έλεγχος κύκλων (Kahn)
+    indeg = {s.name: len(s.deps) for s in stages}
+    children = {s.name: [] for s in stages}
+    for s in stages:
+        for d in s.deps:
+            children[d].append(s.name)
+    ready = [n for n, k in indeg.items() if k == 0]
+    seen = 0
+    while ready:
+        n = ready.pop()
+        seen += 1
+        for c in children[n]:
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                ready.append(c)
+    if seen != len(stages):
+        raise ValueError("Το γράφημα των stages έχει κύκλο")
+
+
+def required_stages(stages: List[Stage], targets: Iterable[str]) -> List[Stage]:
+    """
+    Μόνο τα stages που χρειάζονται για τους στόχους (οι ίδιοι και οι
+    μεταβατικές εξαρτήσεις τους), με τη σειρά της λίστας.
+    """
+    by_name = {s.name: s for s in stages}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise ValueError(f"Άγνωστα stages-στόχοι: {unknown}")
+    needed = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(by_name[name].deps)
+    return [s for s in stages if s.name in needed]
+
+
+def run_dag(stages: List[Stage],
+            max_workers: Optional[int] = None,
+            wrap: Optional[Callable[[Stage, Callable[..., Any]], Callable[..., Any]]] = None
+            ) -> Dict[str, Any]:
+    """
+    Εκτελεί τα stages σεβόμενο τις εξαρτήσεις.
+
+    Με max_workers=1 η εκτέλεση είναι σειριακή, με τη σειρά της λίστας.
+    Με wrap(stage, func) -> func κάθε κλήση τυλίγεται (π.χ. instrumentation).
+
+    Returns
+    -------
+    dict
+        {όνομα stage: αποτέλεσμα}
+    """
+    _validate(stages)
+    pending = list(stages)
+    results: Dict[str, Any] = {}
+
+    def _submit_ready(pool, running):
+        for s in list(pending):
+            if all(d in results for d in s.deps):
+                pending.remove(s)
+                print(f"\n▶ {s.label}")
+                args = [results[d] for d in s.deps]
+                func = wrap(s, s.func) if wrap is not None else s.func
+                running[pool.submit(func, *args, **s.kwargs)] = s
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        _submit_ready(pool, running)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                results[s.name] = fut.result()
+            _submit_ready(pool, running)
+
+    return results
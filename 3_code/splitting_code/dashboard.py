@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Dashboard χρονοσειρών σε ένα αυτόνομο αρχείο HTML
+
+Οι μετρήσεις (MeasurementModel) υποδειγματοληπτούνται ανά σταθμό × ρύπο
+σε επίπεδα zoom: το επίπεδο L χωρίζει όλο το διάστημα σε 2^L tiles των
+~points σημείων. Ο browser διαλέγει το επίπεδο από το ορατό διάστημα και
+σχεδιάζει μόνο τα tiles που το καλύπτουν, οπότε κάθε εικόνα έχει το πολύ
+μερικές χιλιάδες σημεία όσο μεγάλη κι αν είναι η σειρά.
+
+Μέθοδοι υποδειγματοληψίας (διατηρούν το σχήμα & τις αιχμές):
+- "minmax": min & max ανά κάδο χρόνου (reduceat, χωρίς loop ανά κάδο)
+- "lttb": Largest-Triangle-Three-Buckets (ένα σημείο ανά κάδο)
+
+Tiles που χωρούν αυτούσια μπαίνουν χωρίς υποδειγματοληψία· δεν
+παράγονται επίπεδα πέρα από την αρχική ανάλυση. Το HTML δεν έχει
+εξωτερικές εξαρτήσεις (canvas + vanilla JS, δεδομένα ως JSON).
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from data_model import MeasurementModel
+from output_manifest import OutputManifest, frame_digest, value_digest
+
+METHODS = ("minmax", "lttb")
+DEFAULT_POINTS = 500
+DEFAULT_LEVELS = 5
+
+# Αυξάνεται όταν αλλάζει το HTML / η μορφή των δεδομένων
+DASHBOARD_VERSION = 1
+
+
+# ---------------- υποδειγματοληψία ---------------- #
+
+def minmax_indices(t: np.ndarray, y: np.ndarray, start: float, end: float,
+                   buckets: int) -> np.ndarray:
+    """
+    Θέσεις (ταξινομημένες) των min & max ανά κάδο του [start, end).
+    Τα t πρέπει να είναι ταξινομημένα, οπότε οι κάδοι είναι συνεχόμενα
+    τμήματα: min/max με reduceat και πρώτη θέση που τα πετυχαίνει.
+    """
+    if len(t) == 0:
+        return np.empty(0, dtype="int64")
+    width = (end - start) / buckets
+    b = np.clip(((t - start) // width).astype("int64"), 0, buckets - 1)
+    bounds = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    segment = np.repeat(np.arange(len(bounds)), np.diff(np.r_[bounds, len(b)]))
+
+    def first(hit: np.ndarray) -> np.ndarray:
+        pos = np.flatnonzero(hit)
+        seg = segment[pos]
+        return pos[np.r_[True, seg[1:] != seg[:-1]]]
+
+    lowest = np.minimum.reduceat(y, bounds)[segment]
+    highest = np.maximum.reduceat(y, bounds)[segment]
+    return np.union1d(first(y == lowest), first(y == highest))
+
+
+def lttb_indices(t: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: n_out θέσεις (πρώτη & τελευταία πάντα)."""
+    n = len(t)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype("int64")
+    out = np.empty(n_out, dtype="int64")
+    out[0], out[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        # Μέσος του επόμενου κάδου ως τρίτη κορυφή του τριγώνου
+        ct, cy = t[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((t[prev] - ct) * (y[lo:hi] - y[prev])
+                      - (t[prev] - t[lo:hi]) * (cy - y[prev]))
+        prev = lo + int(np.argmax(area))
+        out[i + 1] = prev
+    return out
+
+
+def _tile(t: np.ndarray, y: np.ndarray, start: float, end: float,
+          points: int, method: str) -> Dict[str, list]:
+    lo, hi = np.searchsorted(t, [start, end])
+    tt, yy = t[lo:hi], y[lo:hi]
+    if len(tt) > points:
+        if method == "minmax":
+            idx = minmax_indices(tt, yy, start, end, max(points // 2, 1))
+        else:
+            idx = lttb_indices(tt, yy, points)
+        tt, yy = tt[idx], yy[idx]
+    return {"t": tt.astype("int64").tolist(), "y": np.round(yy, 2).tolist()}
+
+
+def series_levels(t: np.ndarray, y: np.ndarray, t_max: int,
+                  points: int = DEFAULT_POINTS,
+                  levels: int = DEFAULT_LEVELS,
+                  method: str = "minmax") -> List[List[Dict[str, list]]]:
+    """
+    Επίπεδα zoom μιας σειράς (t σε βήματα από την αρχή, ταξινομημένα):
+    λίστα επιπέδων, το καθένα λίστα με 2^L tiles {"t", "y"}.
+    """
+    out = []
+    span = t_max + 1
+    for level in range(levels):
+        n_tiles = 2 ** level
+        edges = np.linspace(0, span, n_tiles + 1)
+        out.append([_tile(t, y, edges[i], edges[i + 1], points, method)
+                    for i in range(n_tiles)])
+        # Όταν κάθε tile χωράει αυτούσιο, βαθύτερα επίπεδα δεν προσθέτουν τίποτα
+        if len(t) <= points * n_tiles:
+            break
+    return out
+
+
+# ---------------- δεδομένα dashboard ---------------- #
+
+def dashboard_data(model: MeasurementModel,
+                   limits: Optional[dict] = None,
+                   points: int = DEFAULT_POINTS,
+                   levels: int = DEFAULT_LEVELS,
+                   method: str = "minmax",
+                   title: str = "Ποιότητα αέρα Θεσσαλονίκης") -> dict:
+    """Προϋπολογισμένα επίπεδα zoom όλων των σειρών (απλές δομές για JSON)."""
+    if method not in METHODS:
+        raise ValueError(f"Άγνωστη μέθοδος: {method!r} (επιλογές: {list(METHODS)})")
+
+    facts = model.facts.dropna(subset=["Τιμή"])
+    dates = facts["Ημερομηνία"]
+    subdaily = bool((dates != dates.dt.normalize()).any())
+    step = pd.Timedelta(hours=1) if subdaily else pd.Timedelta(days=1)
+    t0 = dates.min().floor(step)
+    steps = ((dates - t0) // step).to_numpy(dtype="int64")
+    t_max = int(steps.max())
+
+    s = facts["station_id"].to_numpy(dtype="int64")
+    p = facts["pollutant_id"].to_numpy(dtype="int64")
+    values = facts["Τιμή"].to_numpy(dtype="float64")
+    order = np.lexsort((steps, p, s))
+    s, p, steps, values = s[order], p[order], steps[order], values[order]
+    starts = np.flatnonzero(np.r_[True, (s[1:] != s[:-1]) | (p[1:] != p[:-1])])
+    ends = np.r_[starts[1:], len(s)]
+
+    station_names = model.stations["Σταθμός"].astype(str).to_numpy()
+    pollutant_names = model.pollutants["Ρύπος"].astype(str).to_numpy()
+    series = []
+    for lo, hi in zip(starts, ends):
+        pollutant = pollutant_names[p[lo]]
+        series.append({
+            "station": station_names[s[lo]],
+            "pollutant": pollutant,
+            "unit": "mg/m³" if pollutant == "CO" else "μg/m³",
+            "levels": series_levels(steps[lo:hi], values[lo:hi], t_max,
+                                    points, levels, method),
+        })
+
+    return {
+        "title": title,
+        "t0": int(t0.value // 10**6),
+        "step_ms": int(step.value // 10**6),
+        "t_max": t_max,
+        "points": points,
+        "limits": {k: v for k, v in (limits or {}).items()},
+        "series": series,
+    }
+
+
+def write_dashboard(model: MeasurementModel,
+                    outhtml: Path,
+                    limits: Optional[dict] = None,
+                    points: int = DEFAULT_POINTS,
+                    levels: int = DEFAULT_LEVELS,
+                    method: str = "minmax",
+                    manifest: Optional[OutputManifest] = None) -> Path:
+    """
+    Γράφει το αυτόνομο HTML dashboard.
+
+    Parameters
+    ----------
+    points : int
+        Σημεία ανά tile (ανά σειρά & επίπεδο zoom).
+    levels : int
+        Μέγιστο πλήθος επιπέδων zoom (1, 2, 4, … tiles).
+    method : {"minmax", "lttb"}
+        Μέθοδος υποδειγματοληψίας.
+    manifest : OutputManifest, optional
+        Παράλειψη όταν μετρήσεις & παράμετροι δεν άλλαξαν.
+    """
+    outhtml = Path(outhtml)
+    digest = None
+    if manifest is not None:
+        digest = value_digest(DASHBOARD_VERSION, frame_digest(model.facts),
+                              model.stations["Σταθμός"].astype(str).tolist(),
+                              model.pollutants["Ρύπος"].astype(str).tolist(),
+                              limits, points, levels, method)
+        if manifest.fresh("dashboard", outhtml, digest):
+            manifest.report_skipped([outhtml])
+            return outhtml
+
+    data = dashboard_data(model, limits, points, levels, method)
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    html = (_TEMPLATE.replace("__TITLE__", data["title"])
+            .replace("__DATA__", payload.replace("</", "<\\/")))
+    outhtml.parent.mkdir(parents=True, exist_ok=True)
+    outhtml.write_text(html, encoding="utf-8")
+    if manifest is not None:
+        manifest.commit("dashboard", {outhtml: digest})
+
+    n_points = sum(len(tile["t"]) for sr in data["series"]
+                   for level in sr["levels"] for tile in level)
+    print(f"📈 Dashboard: {outhtml} ({len(data['series'])} σειρές, "
+          f"{n_points} σημεία, {outhtml.stat().st_size / 1024:.0f} KB)")
+    return outhtml
+
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="el">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+ body { font-family: sans-serif; margin: 12px; color: #222; }
+ #controls { display: flex; flex-wrap: wrap; gap: 12px; align-items: center; margin-bottom: 8px; }
+ #stations label { margin-right: 10px; white-space: nowrap; }
+ #chart { width: 100%; height: 520px; border: 1px solid #ccc; cursor: grab; }
+ #info { font-size: 12px; color: #666; margin-top: 4px; }
+</style>
+</head>
+<body>
+<h2>__TITLE__</h2>
+<div id="controls">
+ <label>Ρύπος <select id="pollutant"></select></label>
+ <span id="stations"></span>
+ <button id="reset">Επαναφορά zoom</button>
+</div>
+<canvas id="chart"></canvas>
+<div id="info">Τροχός: zoom · σύρσιμο: μετακίνηση · διπλό κλικ: επαναφορά</div>
+<script id="data" type="application/json">__DATA__</script>
+<script>
+"use strict";
+const D = JSON.parse(document.getElementById("data").textContent);
+const COLORS = ["#1f77b4", "#d62728", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b",
+                "#e377c2", "#17becf", "#bcbd22", "#7f7f7f"];
+const canvas = document.getElementById("chart"), ctx = canvas.getContext("2d");
+const selPollutant = document.getElementById("pollutant");
+const boxStations = document.getElementById("stations");
+const span = D.t_max + 1;
+let view = [0, span];
+
+const pollutants = [...new Set(D.series.map(s => s.pollutant))];
+const stations = [...new Set(D.series.map(s => s.station))];
+pollutants.forEach(p => selPollutant.add(new Option(p, p)));
+stations.forEach((st, i) => {
+  const label = document.createElement("label");
+  label.innerHTML = `<input type="checkbox" checked value="${st}"> ` +
+                    `<span style="color:${COLORS[i % COLORS.length]}">■</span> ${st}`;
+  boxStations.appendChild(label);
+});
+
+function visibleSeries() {
+  const checked = new Set([...boxStations.querySelectorAll("input:checked")].map(b => b.value));
+  return D.series.filter(s => s.pollutant === selPollutant.value && checked.has(s.station));
+}
+
+// Επίπεδο: το tile (span / 2^L) να μην είναι μικρότερο από το ορατό διάστημα
+function tilesFor(series) {
+  const want = Math.floor(Math.log2(span / (view[1] - view[0])));
+  const L = Math.max(0, Math.min(series.levels.length - 1, want));
+  const tiles = series.levels[L], width = span / tiles.length;
+  const first = Math.max(0, Math.floor(view[0] / width));
+  const last = Math.min(tiles.length - 1, Math.floor(view[1] / width));
+  return {tiles: tiles.slice(first, last + 1), gap: 2 * Math.max(1, width / D.points * 2)};
+}
+
+function fmtDate(t) {
+  return new Date(D.t0 + t * D.step_ms).toISOString().slice(0, D.step_ms < 86400000 ? 13 : 10)
+    .replace("T", " ");
+}
+
+function draw() {
+  const dpr = window.devicePixelRatio || 1;
+  const W = canvas.clientWidth, H = canvas.clientHeight;
+  canvas.width = W * dpr; canvas.height = H * dpr;
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+  ctx.clearRect(0, 0, W, H);
+  const m = {l: 60, r: 10, t: 10, b: 30}, pw = W - m.l - m.r, ph = H - m.t - m.b;
+
+  const shown = visibleSeries().map(s => ({s, ...tilesFor(s)}));
+  let ymax = 0, n = 0;
+  shown.forEach(({tiles}) => tiles.forEach(tile => tile.t.forEach((t, i) => {
+    if (t >= view[0] && t <= view[1]) { ymax = Math.max(ymax, tile.y[i]); n++; }
+  })));
+  const limit = D.limits[selPollutant.value];
+  if (limit !== undefined) ymax = Math.max(ymax, limit);
+  ymax = ymax * 1.05 || 1;
+  const X = t => m.l + (t - view[0]) / (view[1] - view[0]) * pw;
+  const Y = y => m.t + ph - y / ymax * ph;
+
+  ctx.strokeStyle = "#ddd"; ctx.fillStyle = "#444"; ctx.font = "11px sans-serif";
+  for (let i = 0; i <= 5; i++) {
+    const y = ymax * i / 5;
+    ctx.beginPath(); ctx.moveTo(m.l, Y(y)); ctx.lineTo(m.l + pw, Y(y)); ctx.stroke();
+    ctx.textAlign = "right"; ctx.fillText(y.toFixed(1), m.l - 4, Y(y) + 4);
+  }
+  ctx.textAlign = "center";
+  for (let i = 0; i <= 5; i++) {
+    const t = view[0] + (view[1] - view[0]) * i / 5;
+    ctx.fillText(fmtDate(t), Math.min(Math.max(X(t), m.l + 40), m.l + pw - 40), H - 10);
+  }
+
+  ctx.save();
+  ctx.beginPath(); ctx.rect(m.l, m.t, pw, ph); ctx.clip();
+  shown.forEach(({s, tiles, gap}) => {
+    ctx.strokeStyle = COLORS[stations.indexOf(s.station) % COLORS.length];
+    ctx.lineWidth = 1;
+    ctx.beginPath();
+    let prev = null;
+    tiles.forEach(tile => tile.t.forEach((t, i) => {
+      if (prev === null || t - prev > gap) ctx.moveTo(X(t), Y(tile.y[i]));
+      else ctx.lineTo(X(t), Y(tile.y[i]));
+      prev = t;
+    }));
+    ctx.stroke();
+  });
+  if (limit !== undefined) {
+    ctx.strokeStyle = "orange"; ctx.setLineDash([6, 4]);
+    ctx.beginPath(); ctx.moveTo(m.l, Y(limit)); ctx.lineTo(m.l + pw, Y(limit)); ctx.stroke();
+    ctx.setLineDash([]); ctx.fillStyle = "orange"; ctx.textAlign = "left";
+    ctx.fillText(`Όριο ΕΕ: ${limit}`, m.l + 4, Y(limit) - 4);
+  }
+  ctx.restore();
+  const unit = shown.length ? shown[0].s.unit : "";
+  document.getElementById("info").textContent =
+    `${fmtDate(view[0])} – ${fmtDate(view[1])} · ${unit} · ${n} σημεία · ` +
+    "τροχός: zoom · σύρσιμο: μετακίνηση · διπλό κλικ: επαναφορά";
+}
+
+function clampView(lo, hi) {
+  const w = Math.min(span, Math.max(hi - lo, 10));
+  lo = Math.max(0, Math.min(lo, span - w));
+  view = [lo, lo + w];
+  draw();
+}
+
+canvas.addEventListener("wheel", e => {
+  e.preventDefault();
+  const rect = canvas.getBoundingClientRect();
+  const f = Math.min(1, Math.max(0, (e.clientX - rect.left - 60) / (rect.width - 70)));
+  const at = view[0] + f * (view[1] - view[0]);
+  const k = e.deltaY < 0 ? 0.8 : 1.25;
+  clampView(at - (at - view[0]) * k, at + (view[1] - at) * k);
+}, {passive: false});
+let drag = null;
+canvas.addEventListener("mousedown", e => { drag = {x: e.clientX, view: view.slice()}; });
+window.addEventListener("mouseup", () => { drag = null; });
+window.addEventListener("mousemove", e => {
+  if (!drag) return;
+  const dt = (drag.x - e.clientX) / (canvas.clientWidth - 70) * (drag.view[1] - drag.view[0]);
+  clampView(drag.view[0] + dt, drag.view[1] + dt);
+});
+canvas.addEventListener("dblclick", () => clampView(0, span));
+document.getElementById("reset").addEventListener("click", () => clampView(0, span));
+selPollutant.addEventListener("change", draw);
+boxStations.addEventListener("change", draw);
+window.addEventListener("resize", draw);
+draw();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Συμπαγές long-format μοντέλο μετρήσεων
+
+- Πίνακας γεγονότων (facts): station_id, pollutant_id, Ημερομηνία, Τιμή
+  με ακέραιους κωδικούς και float32 τιμές
+- Πίνακες διαστάσεων (lookup): σταθμοί, ρύποι
+
+Οι ελληνικές ετικέτες αποθηκεύονται μία φορά στις διαστάσεις· οι
+ομαδοποιήσεις γίνονται σε ακέραιους κωδικούς.
+
+Το μοντέλο το διαβάζουν τα stages που δουλεύουν σε επίπεδο μέτρησης
+(έκθεση, υπερβάσεις, ποιότητα, sketches, dashboard). Τα Processes #1–#5
+δουλεύουν ακόμη σε wide πίνακες μέσων ανά σταθμό/ρύπο με categorical
+στήλες: οι μέσοι του #1 υπολογίζονται σε float64 από τις αρχικές τιμές
+και κρατούν την αρχική ετικέτα στήλης (Ρύπος_raw), ενώ το μοντέλο έχει
+float32 τιμές και μόνο τον κανονικοποιημένο ρύπο, οπότε means() διαφέρει
+από τα αποτελέσματα του αρχικού script στο επίπεδο ακρίβειας float32.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _smallest_int(n: int) -> str:
+    for dtype in ("int8", "int16", "int32"):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return "int64"
+
+
+def encode_dimension(values: pd.Series, name: str):
+    """
+    Κωδικοποίηση στήλης σε (κωδικούς, πίνακα διάστασης).
+    Κενές τιμές -> κωδικός -1.
+    """
+    cat = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+    categories = cat.cat.categories
+    codes = cat.cat.codes.astype(_smallest_int(len(categories)))
+    dim = pd.DataFrame({f"{name}_id": np.arange(len(categories),
+                                                dtype=codes.dtype),
+                        name: categories})
+    return codes, dim
+
+
+class MeasurementModel:
+    """
+    Parameters
+    ----------
+    facts : DataFrame
+        station_id, pollutant_id, Ημερομηνία, Τιμή (float32).
+    stations : DataFrame
+        station_id, Σταθμός.
+    pollutants : DataFrame
+        pollutant_id, Ρύπος.
+    """
+
+    def __init__(self,
+                 facts: pd.DataFrame,
+                 stations: pd.DataFrame,
+                 pollutants: pd.DataFrame):
+        self.facts = facts
+        self.stations = stations
+        self.pollutants = pollutants
+
+    @classmethod
+    def from_long(cls, long: pd.DataFrame) -> "MeasurementModel":
+        """Από long frame (Σταθμός, Ρύπος, Ημερομηνία, Τιμή)."""
+        station_codes, stations = encode_dimension(long["Σταθμός"], "Σταθμός")
+        pollutant_codes, pollutants = encode_dimension(long["Ρύπος"], "Ρύπος")
+        stations = stations.rename(columns={"Σταθμός_id": "station_id"})
+        pollutants = pollutants.rename(columns={"Ρύπος_id": "pollutant_id"})
+        facts = pd.DataFrame({
+            "station_id": station_codes.to_numpy(),
+            "pollutant_id": pollutant_codes.to_numpy(),
+            "Ημερομηνία": long["Ημερομηνία"].to_numpy(),
+            "Τιμή": long["Τιμή"].to_numpy(dtype="float32"),
+        })
+        return cls(facts, stations, pollutants)
+
+    # ---------------- ερωτήματα ---------------- #
+
+    def means(self) -> pd.DataFrame:
+        """
+        Μέσοι ανά σταθμό/ρύπο (άθροιση σε float64) με groupby στους κωδικούς.
+        """
+        grouped = (
+            self.facts.assign(Τιμή=self.facts["Τιμή"].astype("float64"))
+            .groupby(["station_id", "pollutant_id"], sort=True)["Τιμή"]
+            .mean()
+            .reset_index()
+        )
+        return pd.DataFrame({
+            "Σταθμός": pd.Categorical.from_codes(grouped["station_id"],
+                                                 self.stations["Σταθμός"]),
+            "Ρύπος": pd.Categorical.from_codes(grouped["pollutant_id"],
+                                               self.pollutants["Ρύπος"]),
+            "Μέσος Όρος": grouped["Τιμή"].to_numpy(),
+        })
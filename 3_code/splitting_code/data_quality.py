@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Έλεγχος ποιότητας μετρήσεων πριν τη συσσώρευση
+
+Οι μετρήσεις (MeasurementModel) γίνονται πυκνός πίνακας χρόνος × σειρά
+(σειρά = σταθμός × ρύπος) σε κανονικό βήμα (ημέρα ή ώρα)· όλοι οι
+έλεγχοι είναι πράξεις στηλών πάνω σε αυτόν (rolling σε Cython, numpy
+RLE), χωρίς loop ανά σειρά ή ανά ημέρα:
+
+- αρνητικές τιμές -> άκυρες (οι μόνες που αφαιρούνται)
+- ακραίες τιμές: |x - κινητός διάμεσος| > k · 1.4826 · MAD (κεντραρισμένο
+  παράθυρο· για ημερήσια δεδομένα ~1 μήνας, ώστε επεισόδια ρύπανσης
+  λίγων ημερών να μη μοιάζουν με σφάλματα)
+- "κολλημένος" αισθητήρας: ≥ stuck_run ίδιες διαδοχικές τιμές πάνω από το
+  όριο ανίχνευσης του ρύπου (κοντά σε αυτό, με ακέραια ανάλυση, οι
+  επαναλήψεις είναι φυσιολογικές)
+- συμπλήρωση μικρών κενών (≤ max_gap βήματα, γραμμική παρεμβολή εντός
+  της σειράς)
+- κάλυψη δεδομένων ανά σταθμό × ρύπο × έτος και κανόνες ΕΕ
+  (2008/50/ΕΚ, Παράρτημα I): ημέρα έγκυρη με ≥ 75% των ωριαίων τιμών,
+  έτος έγκυρο με ≥ 90% κάλυψη· οι συμπληρωμένες τιμές δεν μετρούν
+
+Ακραίες και κολλημένες τιμές είναι ενδείξεις για έλεγχο, όχι αποδείξεις
+σφάλματος (π.χ. πραγματικά επεισόδια, χαμηλές συγκεντρώσεις), οπότε
+μόνο αναφέρονται (σημαίες, "Επισημάνθηκαν") και μένουν στις μετρήσεις.
+"""
+
+from typing import Dict, Optional, Union
+import numpy as np
+import pandas as pd
+
+from data_model import MeasurementModel
+from exceedance_events import is_subdaily
+from schema_registry import mean_column
+
+FLAG_OK = 0
+FLAG_NEGATIVE = 1
+FLAG_OUTLIER = 2
+FLAG_STUCK = 3
+FLAG_IMPUTED = 4
+FLAG_LABELS = ["Εντάξει", "Αρνητική τιμή", "Ακραία τιμή",
+               "Κολλημένος αισθητήρας", "Συμπληρώθηκε"]
+
+# Βήματα κεντραρισμένου παραθύρου ανά συχνότητα (ημέρα / ώρα)
+DEFAULT_WINDOWS = {"D": 31, "h": 25}
+DEFAULT_MAD_THRESHOLD = 5.0
+DEFAULT_STUCK_RUN = 6
+DEFAULT_MAX_GAP = 2
+# Όριο ανίχνευσης ανά ρύπο (μονάδες του φύλλου: CO σε mg/m3, τα άλλα σε
+# μg/m3)· σε ή κάτω από αυτό δεν γίνεται έλεγχος κολλημένου αισθητήρα
+DEFAULT_DETECTION_FLOORS = {"CO": 0.2, "NO": 10.0, "NO2": 5.0, "O3": 5.0,
+                            "PM10": 5.0, "PM2.5": 5.0, "SO2": 5.0}
+
+DAILY_CAPTURE = 0.75        # ωριαίες τιμές ανά ημέρα
+ANNUAL_CAPTURE = 0.90       # ημέρες (ή ώρες) ανά έτος
+
+_MAD_SCALE = 1.4826
+
+
+# ---------------- πυκνός πίνακας ---------------- #
+
+def _dense(model: MeasurementModel, freq: str):
+    """
+    Μετρήσεις -> (X[T, K], χρόνοι, station_id[K], pollutant_id[K]).
+    Διπλές χρονοσφραγίδες στο ίδιο βήμα: μέσος όρος.
+    """
+    facts = model.facts.dropna(subset=["Τιμή"])
+    dates = facts["Ημερομηνία"].dt.floor(freq)
+    times = pd.date_range(dates.min(), dates.max(), freq=freq)
+    n_p = len(model.pollutants)
+    series = (facts["station_id"].to_numpy(dtype="int64") * n_p
+              + facts["pollutant_id"].to_numpy(dtype="int64"))
+    k, uniques = pd.factorize(series, sort=True)
+    t = times.get_indexer(dates)
+
+    shape = (len(times), len(uniques))
+    flat = t * shape[1] + k
+    values = facts["Τιμή"].to_numpy(dtype="float64")
+    sums = np.bincount(flat, weights=values, minlength=shape[0] * shape[1])
+    counts = np.bincount(flat, minlength=shape[0] * shape[1])
+    X = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+    return X.reshape(shape), times, uniques // n_p, uniques % n_p
+
+
+def _run_lengths(mask: np.ndarray) -> np.ndarray:
+    """
+    Για κάθε κελί True: μήκος της σειράς συνεχόμενων True στη στήλη του
+    (0 για False). RLE στον πίνακα σε σειρά στηλών (Fortran).
+    """
+    flat = mask.ravel(order="F")
+    n_rows = mask.shape[0]
+    boundary = np.empty(flat.size, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = flat[1:] != flat[:-1]
+    boundary[::n_rows] = True  # αρχή κάθε στήλης
+    starts = np.flatnonzero(boundary)
+    lengths = np.diff(np.append(starts, flat.size))
+    out = np.repeat(lengths, lengths) * flat
+    return out.reshape(mask.shape, order="F")
+
+
+def _stuck(X: np.ndarray, stuck_run: int) -> np.ndarray:
+    """Κελιά που ανήκουν σε ≥ stuck_run ίδιες διαδοχικές (μη κενές) τιμές."""
+    same = np.zeros(X.shape, dtype=bool)
+    same[1:] = (X[1:] == X[:-1])
+    # Η σειρά ίσων ξεκινά ένα βήμα πριν από το πρώτο "same"
+    run = _run_lengths(same)
+    start = np.zeros(X.shape, dtype=bool)
+    start[:-1] = same[1:] & ~same[:-1]
+    flagged = run >= stuck_run - 1
+    flagged[:-1] |= start[:-1] & flagged[1:]
+    return flagged
+
+
+# ---------------- public ---------------- #
+
+def _series_floors(floors: Union[float, Dict[str, float]],
+                   pollutant_ids: np.ndarray,
+                   model: MeasurementModel) -> np.ndarray:
+    """Όριο ανίχνευσης ανά στήλη (σειρά) του πυκνού πίνακα· άγνωστος ρύπος -> 0."""
+    if not isinstance(floors, dict):
+        return np.full(len(pollutant_ids), float(floors))
+    by_pollutant = (model.pollutants["Ρύπος"].astype(str).map(floors)
+                    .fillna(0.0).to_numpy(dtype="float64"))
+    return by_pollutant[pollutant_ids]
+
+
+def assess_quality(model: MeasurementModel,
+                   window: Optional[int] = None,
+                   mad_threshold: float = DEFAULT_MAD_THRESHOLD,
+                   stuck_run: int = DEFAULT_STUCK_RUN,
+                   max_gap: int = DEFAULT_MAX_GAP,
+                   stuck_floor: Union[float, Dict[str, float], None] = None
+                   ) -> Dict[str, object]:
+    """
+    Σημαίες ποιότητας, καθαρισμένες μετρήσεις και κάλυψη δεδομένων.
+
+    Parameters
+    ----------
+    window : int, optional
+        Βήματα του κεντραρισμένου κινητού διάμεσου/MAD (None ->
+        DEFAULT_WINDOWS ανάλογα με το βήμα των δεδομένων).
+    mad_threshold : float
+        Πολλαπλάσιο του (κλιμακωμένου) MAD για ακραία τιμή.
+    stuck_run : int
+        Ίδιες διαδοχικές τιμές που θεωρούνται κολλημένος αισθητήρας.
+    max_gap : int
+        Μέγιστο κενό (βήματα) που συμπληρώνεται με παρεμβολή.
+    stuck_floor : float | dict, optional
+        Όριο ανίχνευσης (ένα για όλους ή {ρύπος: όριο})· σειρές ίσων τιμών
+        σε ή κάτω από αυτό δεν επισημαίνονται (None ->
+        DEFAULT_DETECTION_FLOORS).
+
+    Returns
+    -------
+    dict
+        "model": καθαρισμένο MeasurementModel (χωρίς αρνητικές τιμές, με
+        συμπληρωμένα μικρά κενά· ακραίες/κολλημένες τιμές μένουν)
+        "flags": Σταθμός, Ρύπος, Ημερομηνία, Τιμή, Σημαία (μόνο μη "Εντάξει")
+        "coverage": Σταθμός, Ρύπος, Έτος, Αναμενόμενες, Μετρήσεις,
+        Απορρίφθηκαν, Επισημάνθηκαν, Συμπληρώθηκαν, Έγκυρες, Κάλυψη %,
+        Έγκυρες ημέρες, Κάλυψη ημερών %, Έγκυρο έτος
+    """
+    hourly = is_subdaily(model.facts["Ημερομηνία"])
+    freq = "h" if hourly else "D"
+    if window is None:
+        window = DEFAULT_WINDOWS[freq]
+    if stuck_floor is None:
+        stuck_floor = DEFAULT_DETECTION_FLOORS
+    X, times, station_ids, pollutant_ids = _dense(model, freq)
+    measured = ~np.isnan(X)
+
+    # --- σημαίες ---
+    flags = np.zeros(X.shape, dtype="int8")
+    negative = measured & (X < 0)
+    flags[negative] = FLAG_NEGATIVE
+    candidates = np.where(negative, np.nan, X)
+
+    frame = pd.DataFrame(candidates)
+    rolling = dict(window=window, center=True, min_periods=window // 2 + 1)
+    median = frame.rolling(**rolling).median().to_numpy()
+    deviation = np.abs(candidates - median)
+    mad = pd.DataFrame(deviation).rolling(**rolling).median().to_numpy()
+    with np.errstate(invalid="ignore"):
+        outlier = (deviation > mad_threshold * _MAD_SCALE * mad) & (mad > 0)
+    flags[outlier & (flags == FLAG_OK)] = FLAG_OUTLIER
+    stuck = _stuck(candidates, stuck_run)
+    floor = _series_floors(stuck_floor, pollutant_ids, model)
+    with np.errstate(invalid="ignore"):
+        stuck = stuck & (candidates > floor)
+    flags[stuck & measured & (flags == FLAG_OK)] = FLAG_STUCK
+
+    # Μόνο οι αρνητικές αφαιρούνται· ακραίες/κολλημένες απλώς αναφέρονται
+    valid = measured & ~negative
+    suspect = valid & (flags != FLAG_OK)
+    clean = np.where(valid, X, np.nan)
+
+    # --- συμπλήρωση μικρών κενών (μόνο εντός της σειράς) ---
+    gaps = ~valid
+    short = gaps & (_run_lengths(gaps) <= max_gap)
+    filled = pd.DataFrame(clean).interpolate(limit_area="inside").to_numpy()
+    imputed = short & ~np.isnan(filled)
+    clean = np.where(imputed, filled, clean)
+    # Άκυρες μετρήσεις που αντικαταστάθηκαν κρατούν τη σημαία τους
+    flags[imputed & ~measured] = FLAG_IMPUTED
+
+    # --- καθαρισμένο μοντέλο ---
+    t_idx, k_idx = np.nonzero(~np.isnan(clean))
+    facts = pd.DataFrame({
+        "station_id": station_ids[k_idx].astype(model.facts["station_id"].dtype),
+        "pollutant_id": pollutant_ids[k_idx].astype(model.facts["pollutant_id"].dtype),
+        "Ημερομηνία": times[t_idx],
+        "Τιμή": clean[t_idx, k_idx].astype("float32"),
+    }).sort_values(["station_id", "pollutant_id", "Ημερομηνία"], kind="stable")
+    cleaned = MeasurementModel(facts.reset_index(drop=True), model.stations,
+                               model.pollutants)
+
+    # --- σημαίες σε long μορφή (μόνο οι μη "Εντάξει") ---
+    ft, fk = np.nonzero(flags != FLAG_OK)
+    flags_df = pd.DataFrame({
+        "Σταθμός": pd.Categorical.from_codes(station_ids[fk], model.stations["Σταθμός"]),
+        "Ρύπος": pd.Categorical.from_codes(pollutant_ids[fk], model.pollutants["Ρύπος"]),
+        "Ημερομηνία": times[ft],
+        "Τιμή": X[ft, fk],
+        "Σημαία": pd.Categorical.from_codes(flags[ft, fk], FLAG_LABELS),
+    })
+
+    coverage = _coverage(times, hourly, measured, valid, suspect, imputed,
+                         station_ids, pollutant_ids, model)
+    return {"model": cleaned, "flags": flags_df, "coverage": coverage}
+
+
+def _coverage(times: pd.DatetimeIndex,
+              hourly: bool,
+              measured: np.ndarray,
+              valid: np.ndarray,
+              suspect: np.ndarray,
+              imputed: np.ndarray,
+              station_ids: np.ndarray,
+              pollutant_ids: np.ndarray,
+              model: MeasurementModel) -> pd.DataFrame:
+    """Κάλυψη ανά σειρά × έτος με groupby στο έτος (πάνω σε όλες τις στήλες)."""
+    years = times.year
+
+    def per_year(mask: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(mask.astype("int64"), index=years).groupby(level=0).sum()
+
+    expected = pd.Series(1, index=years).groupby(level=0).sum()
+    counts = {
+        "Μετρήσεις": per_year(measured),
+        "Απορρίφθηκαν": per_year(measured & ~valid),
+        "Επισημάνθηκαν": per_year(suspect),
+        "Συμπληρώθηκαν": per_year(imputed),
+        "Έγκυρες": per_year(valid),
+    }
+    if hourly:
+        # Ημέρα έγκυρη με ≥ 75% έγκυρες ωριαίες τιμές
+        day_valid = pd.DataFrame(valid.astype("int64"), index=times).resample("D").sum()
+        hours = pd.Series(1, index=times).resample("D").sum()
+        days_ok = day_valid.ge(DAILY_CAPTURE * hours.to_numpy()[:, None])
+        valid_days = days_ok.groupby(days_ok.index.year).sum()
+        expected_days = hours.groupby(hours.index.year).size()
+    else:
+        valid_days = counts["Έγκυρες"]
+        expected_days = expected
+
+    n_years, n_series = len(expected), len(station_ids)
+    out = pd.DataFrame({
+        "Σταθμός": pd.Categorical.from_codes(np.tile(station_ids, n_years),
+                                             model.stations["Σταθμός"]),
+        "Ρύπος": pd.Categorical.from_codes(np.tile(pollutant_ids, n_years),
+                                           model.pollutants["Ρύπος"]),
+        "Έτος": np.repeat(expected.index.to_numpy(), n_series),
+        "Αναμενόμενες": np.repeat(expected.to_numpy(), n_series),
+    })
+    for name, table in counts.items():
+        out[name] = table.to_numpy().ravel()
+    out["Κάλυψη %"] = 100.0 * out["Έγκυρες"] / out["Αναμενόμενες"]
+    out["Έγκυρες ημέρες"] = valid_days.to_numpy().ravel()
+    out["Κάλυψη ημερών %"] = (
+        100.0 * out["Έγκυρες ημέρες"] / np.repeat(expected_days.to_numpy(), n_series)
+    )
+    out["Έγκυρο έτος"] = out["Κάλυψη ημερών %"] >= 100.0 * ANNUAL_CAPTURE
+    return (out.sort_values(["Σταθμός", "Ρύπος", "Έτος"], kind="stable")
+            .reset_index(drop=True))
+
+
+def clean_means(env_df: pd.DataFrame,
+                quality: Dict[str, object],
+                value_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Μέσοι του Process #1 από τις καθαρισμένες μετρήσεις (ίδιο σχήμα) +
+    "Κάλυψη %" όλης της περιόδου ανά σταθμό/ρύπο.
+    """
+    means = quality["model"].means()
+    key = pd.MultiIndex.from_arrays([means["Σταθμός"].astype(str), means["Ρύπος"].astype(str)])
+    cleaned = pd.Series(means["Μέσος Όρος"].to_numpy(), index=key)
+
+    coverage = quality["coverage"]
+    totals = coverage.groupby(["Σταθμός", "Ρύπος"], observed=True)[
+        ["Έγκυρες", "Αναμενόμενες"]].sum()
+    totals.index = pd.MultiIndex.from_arrays([totals.index.get_level_values(0).astype(str),
+                                              totals.index.get_level_values(1).astype(str)])
+    capture = 100.0 * totals["Έγκυρες"] / totals["Αναμενόμενες"]
+
+    out = env_df.copy()
+    if value_col is None:
+        value_col = mean_column(out.columns)
+    rows = pd.MultiIndex.from_arrays([out["Σταθμός"].astype(str), out["Ρύπος"].astype(str)])
+    out[value_col] = cleaned.reindex(rows).to_numpy()
+    out["Κάλυψη %"] = capture.reindex(rows).to_numpy()
+    return out
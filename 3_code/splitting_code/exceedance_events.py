@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Επεισόδια υπερβάσεων & κανόνες πλήθους ημερών της ΕΕ (2008/50/ΕΚ)
+
+Ο έλεγχος μέσου όρου (assess_compliance_with_eu_limits) δεν αρκεί για
+κανόνες τύπου "PM10: ημερήσιος μέσος 50 μg/m³, έως 35 υπερβάσεις/έτος".
+Εδώ, πάνω στις μετρήσεις σταθμών (MeasurementModel):
+- ημερήσια στατιστικά (ημερήσιος μέσος, μέγιστος ημερήσιος 8ωρος
+  κινητός μέσος, ωριαίες τιμές)
+- run-length encoding συνεχόμενων υπερβάσεων -> επεισόδια
+- υπερβάσεις ανά έτος και έλεγχος του επιτρεπόμενου πλήθους
+
+Όλα με numpy/pandas πάνω σε ακέραιους κωδικούς (χωρίς loop ανά ημέρα)·
+κλιμακώνεται και σε ωριαία δεδομένα όλου του δικτύου.
+
+Σημ.: με ημερήσια δεδομένα (όπως το αρχείο 2010–2013) ο 8ωρος κινητός
+μέσος δεν υπολογίζεται· χρησιμοποιείται ο ημερήσιος μέσος (κάτω φράγμα
+του μέγιστου 8ωρου) και οι ωριαίοι κανόνες παραλείπονται.
+"""
+
+from typing import Dict, NamedTuple, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from assess_compliance_with_eu_limits import STATUS_CATEGORIES
+from data_model import MeasurementModel
+
+DAILY_MEAN = "daily_mean"
+MAX_DAILY_8H_MEAN = "max_daily_8h_mean"
+HOURLY = "hourly"
+STATISTICS = (DAILY_MEAN, MAX_DAILY_8H_MEAN, HOURLY)
+
+_STEPS = {
+    DAILY_MEAN: np.timedelta64(1, "D"),
+    MAX_DAILY_8H_MEAN: np.timedelta64(1, "D"),
+    HOURLY: np.timedelta64(1, "h"),
+}
+_STEP_LABELS = {DAILY_MEAN: "ημέρα", MAX_DAILY_8H_MEAN: "ημέρα", HOURLY: "ώρα"}
+_STATISTIC_LABELS = {
+    DAILY_MEAN: "ημερήσιος μέσος",
+    MAX_DAILY_8H_MEAN: "μέγιστος ημερήσιος 8ωρος",
+    HOURLY: "ωριαία τιμή",
+}
+
+# 8ωρος κινητός μέσος: έγκυρος με ≥ 75% των ωρών (6 από 8)
+ROLLING_8H_MIN_HOURS = 6
+
+
+class DayCountRule(NamedTuple):
+    """Όριο που επιτρέπεται να ξεπεραστεί έως max_per_year φορές ανά έτος."""
+    pollutant: str
+    statistic: str
+    threshold: float
+    max_per_year: int
+
+    @property
+    def label(self) -> str:
+        return (f"{self.pollutant} {_STATISTIC_LABELS[self.statistic]} > "
+                f"{self.threshold:g} (≤ {self.max_per_year}/έτος)")
+
+
+# Οδηγία 2008/50/ΕΚ, Παράρτημα XI & VII (O3: στόχος, μέσος 3 ετών)
+EU_DAY_COUNT_RULES = (
+    DayCountRule("PM10", DAILY_MEAN, 50, 35),
+    DayCountRule("SO2", DAILY_MEAN, 125, 3),
+    DayCountRule("O3", MAX_DAILY_8H_MEAN, 120, 25),
+    DayCountRule("CO", MAX_DAILY_8H_MEAN, 10, 0),
+    DayCountRule("NO2", HOURLY, 200, 18),
+    DayCountRule("SO2", HOURLY, 350, 24),
+)
+
+
+# ---------------- ημερήσια / ωριαία στατιστικά ---------------- #
+
+def is_subdaily(dates: pd.Series) -> bool:
+    """True αν υπάρχουν χρονοσφραγίδες εντός ημέρας (π.χ. ωριαία δεδομένα)."""
+    dates = pd.to_datetime(dates)
+    return bool((dates != dates.dt.normalize()).any())
+
+
+def statistic_values(model: MeasurementModel, statistic: str) -> pd.DataFrame:
+    """
+    Τιμές του στατιστικού ανά σταθμό × ρύπο × βήμα (ημέρα ή ώρα).
+
+    Returns
+    -------
+    DataFrame
+        station_id, pollutant_id, Ημερομηνία, Τιμή – ταξινομημένο ανά
+        σταθμό, ρύπο, χρόνο (όπως το θέλει το run_length_events).
+    """
+    if statistic not in STATISTICS:
+        raise ValueError(f"Άγνωστο στατιστικό: {statistic!r} (επιλογές: {list(STATISTICS)})")
+    facts = model.facts.dropna(subset=["Τιμή"])
+    keys = ["station_id", "pollutant_id"]
+    values = facts.assign(Τιμή=facts["Τιμή"].astype("float64"))
+    subdaily = is_subdaily(values["Ημερομηνία"])
+
+    if statistic == MAX_DAILY_8H_MEAN and subdaily:
+        ordered = values.sort_values(keys + ["Ημερομηνία"], kind="stable")
+        rolled = (
+            ordered.groupby(keys, sort=False)
+            .rolling("8h", on="Ημερομηνία", min_periods=ROLLING_8H_MIN_HOURS)["Τιμή"]
+            .mean()
+            .reset_index(level=keys, drop=True)
+        )
+        values = ordered.assign(Τιμή=rolled.to_numpy()).dropna(subset=["Τιμή"])
+        func = "max"
+    else:
+        func = "mean"
+
+    freq = "h" if statistic == HOURLY else "D"
+    out = (
+        values.assign(Ημερομηνία=values["Ημερομηνία"].dt.floor(freq))
+        .groupby(keys + ["Ημερομηνία"], sort=True)["Τιμή"]
+        .agg(func)
+        .reset_index()
+    )
+    return out
+
+
+# ---------------- run-length encoding ---------------- #
+
+def run_length_events(values: pd.DataFrame,
+                      threshold: float,
+                      step: np.timedelta64) -> pd.DataFrame:
+    """
+    Επεισόδια = μέγιστες σειρές συνεχόμενων βημάτων με Τιμή > threshold.
+
+    Ένα run σπάει όταν αλλάζει σταθμός/ρύπος, όταν αλλάζει η κατάσταση
+    υπέρβασης ή όταν λείπει βήμα (κενό στα δεδομένα). Υπολογισμός με
+    np.diff / cumsum / reduceat – χωρίς loop.
+
+    Returns
+    -------
+    DataFrame
+        station_id, pollutant_id, Έναρξη, Λήξη, Διάρκεια (βήματα), Μέγιστο
+    """
+    columns = ["station_id", "pollutant_id", "Έναρξη", "Λήξη", "Διάρκεια", "Μέγιστο"]
+    if values.empty:
+        return pd.DataFrame(columns=columns)
+
+    s = values["station_id"].to_numpy()
+    p = values["pollutant_id"].to_numpy()
+    t = values["Ημερομηνία"].to_numpy(dtype="datetime64[ns]")
+    v = values["Τιμή"].to_numpy(dtype="float64")
+    exceeded = v > threshold
+
+    boundary = np.empty(len(v), dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (
+        (s[1:] != s[:-1]) | (p[1:] != p[:-1])
+        | (exceeded[1:] != exceeded[:-1])
+        | ((t[1:] - t[:-1]) != step)
+    )
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(v)) - 1
+    keep = exceeded[starts]
+    starts, ends = starts[keep], ends[keep]
+
+    return pd.DataFrame({
+        "station_id": s[starts],
+        "pollutant_id": p[starts],
+        "Έναρξη": t[starts],
+        "Λήξη": t[ends],
+        "Διάρκεια": (ends - starts + 1).astype("int64"),
+        "Μέγιστο": np.maximum.reduceat(v, starts) if len(starts) else np.array([], float),
+    })[columns]
+
+
+def yearly_counts(values: pd.DataFrame,
+                  events: pd.DataFrame,
+                  threshold: float) -> pd.DataFrame:
+    """
+    Ανά σταθμό × ρύπο × έτος: βήματα με δεδομένα, υπερβάσεις και
+    μεγαλύτερο επεισόδιο (επεισόδια μετρούν στο έτος έναρξης).
+    """
+    keys = ["station_id", "pollutant_id", "Έτος"]
+    counts = (
+        values.assign(Έτος=values["Ημερομηνία"].dt.year,
+                      _exceeded=(values["Τιμή"] > threshold).astype("int64"))
+        .groupby(keys, sort=True)["_exceeded"]
+        .agg(Μετρήσεις="size", Υπερβάσεις="sum")
+        .reset_index()
+    )
+    longest = (
+        events.assign(Έτος=pd.to_datetime(events["Έναρξη"]).dt.year)
+        .groupby(keys)["Διάρκεια"].max()
+        .rename("Μέγιστο επεισόδιο")
+    )
+    counts = counts.join(longest, on=keys)
+    counts["Μέγιστο επεισόδιο"] = counts["Μέγιστο επεισόδιο"].fillna(0).astype("int64")
+    return counts
+
+
+# ---------------- public ---------------- #
+
+def _decode(df: pd.DataFrame, model: MeasurementModel) -> pd.DataFrame:
+    """Κωδικοί -> categorical ετικέτες Σταθμός / Ρύπος (μπροστά)."""
+    out = df.drop(columns=["station_id", "pollutant_id"])
+    out.insert(0, "Σταθμός", pd.Categorical.from_codes(df["station_id"].to_numpy(),
+                                                        model.stations["Σταθμός"]))
+    out.insert(1, "Ρύπος", pd.Categorical.from_codes(df["pollutant_id"].to_numpy(),
+                                                      model.pollutants["Ρύπος"]))
+    return out
+
+
+def detect_exceedances(model: MeasurementModel,
+                       rules: Sequence[DayCountRule] = EU_DAY_COUNT_RULES,
+                       hourly: Optional[bool] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Εφαρμόζει τους κανόνες πλήθους υπερβάσεων στις μετρήσεις.
+
+    Parameters
+    ----------
+    model : MeasurementModel
+        Μετρήσεις σταθμών (βλ. build_measurement_model).
+    rules : sequence[DayCountRule]
+        Default: EU_DAY_COUNT_RULES.
+    hourly : bool, optional
+        Αν τα δεδομένα είναι ωριαία· None -> ανίχνευση από τις ημερομηνίες.
+        Χωρίς ωριαία δεδομένα οι κανόνες HOURLY παραλείπονται.
+
+    Returns
+    -------
+    dict
+        "counts": Κανόνας, Σταθμός, Ρύπος, Έτος, Όριο, Βήμα, Μετρήσεις,
+        Υπερβάσεις, Επιτρεπόμενες, Μέγιστο επεισόδιο, Κατάσταση
+        "events": Κανόνας, Σταθμός, Ρύπος, Έναρξη, Λήξη, Διάρκεια, Μέγιστο
+    """
+    if hourly is None:
+        hourly = is_subdaily(model.facts["Ημερομηνία"])
+    pollutant_ids = dict(zip(model.pollutants["Ρύπος"], model.pollutants["pollutant_id"]))
+
+    cache: Dict[str, pd.DataFrame] = {}
+    counts, events = [], []
+    for rule in rules:
+        if rule.statistic == HOURLY and not hourly:
+            continue
+        if rule.pollutant not in pollutant_ids:
+            continue
+        if rule.statistic not in cache:
+            cache[rule.statistic] = statistic_values(model, rule.statistic)
+        stat = cache[rule.statistic]
+        values = stat[stat["pollutant_id"] == pollutant_ids[rule.pollutant]]
+
+        rule_events = run_length_events(values, rule.threshold, _STEPS[rule.statistic])
+        rule_counts = yearly_counts(values, rule_events, rule.threshold)
+        rule_counts.insert(0, "Κανόνας", rule.label)
+        rule_counts["Όριο"] = float(rule.threshold)
+        rule_counts["Βήμα"] = _STEP_LABELS[rule.statistic]
+        rule_counts["Επιτρεπόμενες"] = rule.max_per_year
+        rule_events.insert(0, "Κανόνας", rule.label)
+        counts.append(rule_counts)
+        events.append(rule_events)
+
+    if not counts:
+        return {"counts": pd.DataFrame(), "events": pd.DataFrame()}
+
+    counts_df = pd.concat(counts, ignore_index=True)
+    violated = (counts_df["Υπερβάσεις"] > counts_df["Επιτρεπόμενες"]).to_numpy()
+    counts_df["Κατάσταση"] = pd.Categorical.from_codes(violated.astype("int8"),
+                                                       STATUS_CATEGORIES)
+    counts_df = _decode(counts_df, model)[[
+        "Κανόνας", "Σταθμός", "Ρύπος", "Έτος", "Όριο", "Βήμα", "Μετρήσεις",
+        "Υπερβάσεις", "Επιτρεπόμενες", "Μέγιστο επεισόδιο", "Κατάσταση",
+    ]]
+    events_df = _decode(pd.concat(events, ignore_index=True), model)[[
+        "Κανόνας", "Σταθμός", "Ρύπος", "Έναρξη", "Λήξη", "Διάρκεια", "Μέγιστο",
+    ]]
+    for df in (counts_df, events_df):
+        df["Κανόνας"] = df["Κανόνας"].astype("category")
+    return {"counts": counts_df, "events": events_df}
@@ -8,23 +8,247 @@ Process – export_excel
 - Mapping Σταθμός -> Δημοτική Κοινότητα
 - Αποτελέσματα με μέσους & ανά κάτοικο
 σε ένα Excel αρχείο.
+
+Επιπλέον:
+- streaming=True: γράψιμο γραμμή-γραμμή με openpyxl write_only
+  (σταθερή μνήμη, ανεξάρτητη από το μέγεθος των αποτελεσμάτων)
+- split_by="station" | "pollutant": ένα φύλλο ανά σταθμό / ρύπο
+- export_results: ίδια αποτελέσματα και σε Parquet / CSV (sinks), με
+  χρόνο εγγραφής και μέγεθος εξόδου ανά sink
+- extra_tables: επιπλέον πίνακες (π.χ. API_pc) ως φύλλα / αρχεία
+- manifest (βλ. output_manifest): αρχεία με ίδιο hash περιεχομένου δεν
+  ξαναγράφονται· αρχεία πινάκων που δεν εξάγονται πια διαγράφονται
+- read_exported_tables: πίνακες προηγούμενης εξαγωγής (για incremental
+  ενημέρωση που δεν ξαναϋπολογίζει όλους τους πίνακες)
 """
 
+import re
+import time
 from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
 import pandas as pd
+from openpyxl import Workbook
+
+from output_manifest import OutputManifest, frame_digest, value_digest
+
+MAPPING_SHEET = "Mapping"
+RESULTS_SHEET = "Συνολικοί Μέσοι & Ανά Κάτοικο"
+
+SPLIT_COLUMNS = {"station": "Σταθμός", "pollutant": "Ρύπος"}
+SINKS = ("xlsx", "parquet", "csv")
+_SINK_LABELS = {"xlsx": "Excel", "parquet": "Parquet", "csv": "CSV"}
+
+# Γραμμές ανά μπλοκ μετατροπής στο streaming γράψιμο
+STREAM_BLOCK_ROWS = 10_000
+
+# Αυξάνεται όταν αλλάζει ο τρόπος εγγραφής (ακυρώνει τα memoized αρχεία)
+EXPORT_VERSION = 1
+
+_SHEET_MAX_LEN = 31
+_SHEET_INVALID = re.compile(r"[\[\]:*?/\\]")
+
+
+def _sheet_name(name, used: set) -> str:
+    """Έγκυρο & μοναδικό όνομα φύλλου (≤ 31 χαρακτήρες, χωρίς []:*?/\\)."""
+    base = _SHEET_INVALID.sub("_", str(name))[:_SHEET_MAX_LEN] or "Sheet"
+    candidate, i = base, 2
+    while candidate.lower() in used:
+        suffix = f" ({i})"
+        candidate = base[:_SHEET_MAX_LEN - len(suffix)] + suffix
+        i += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _result_sheets(mapping_df: pd.DataFrame,
+                   results_df: pd.DataFrame,
+                   split_by: Optional[str] = None,
+                   extra_tables: Optional[Dict[str, pd.DataFrame]] = None
+                   ) -> Dict[str, pd.DataFrame]:
+    """
+    Φύλλα προς εγγραφή: Mapping + αποτελέσματα (ενιαία ή ανά σταθμό/ρύπο)
+    + επιπλέον πίνακες.
+    """
+    used = set()
+    sheets = {_sheet_name(MAPPING_SHEET, used): mapping_df}
+    if split_by is None:
+        sheets[_sheet_name(RESULTS_SHEET, used)] = results_df
+    elif split_by not in SPLIT_COLUMNS:
+        raise ValueError(f"Άγνωστο split_by: {split_by!r} (επιλογές: {list(SPLIT_COLUMNS)})")
+    else:
+        for key, group in results_df.groupby(SPLIT_COLUMNS[split_by], sort=False, observed=True):
+            sheets[_sheet_name(key, used)] = group
+    for name, df in (extra_tables or {}).items():
+        sheets[_sheet_name(name, used)] = df
+    return sheets
+
+
+def _iter_rows(df: pd.DataFrame, block_rows: int = STREAM_BLOCK_ROWS) -> Iterable[tuple]:
+    """Γραμμές ως tuples (NaN/NaT -> κενό κελί), μετατροπή ανά μπλοκ."""
+    for start in range(0, len(df), block_rows):
+        block = df.iloc[start:start + block_rows].astype(object)
+        block = block.where(block.notna(), None)
+        yield from block.itertuples(index=False, name=None)
+
+
+def _write_xlsx_streaming(sheets: Dict[str, pd.DataFrame], outxlsx: Path) -> None:
+    wb = Workbook(write_only=True)
+    for name, df in sheets.items():
+        ws = wb.create_sheet(name)
+        ws.append([str(c) for c in df.columns])
+        for row in _iter_rows(df):
+            ws.append(row)
+    wb.save(outxlsx)
+
+
+def _write_xlsx(sheets: Dict[str, pd.DataFrame], outxlsx: Path) -> None:
+    with pd.ExcelWriter(outxlsx) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def _sink_paths(base: Path, sink: str, names: Iterable[str]) -> Dict[str, Path]:
+    """<stem>_<πίνακας>.<ext> δίπλα στο xlsx."""
+    return {name: base.with_name(f"{base.stem}_{name}.{sink}") for name in names}
+
+
+def _report(sink: str, paths: Sequence[Path], seconds: float, skipped: int = 0) -> dict:
+    size = sum(Path(p).stat().st_size for p in paths)
+    note = f", {skipped} αμετάβλητα" if skipped else ""
+    print(f"📄 Αποθήκευση {_SINK_LABELS[sink]}: {', '.join(str(p) for p in paths)} "
+          f"({size / 1024:.1f} KB, {seconds:.2f}s{note})")
+    return {"paths": [str(p) for p in paths], "seconds": seconds, "bytes": size,
+            "skipped": skipped}
+
+
+def _sheets_digest(sheets: Dict[str, pd.DataFrame], streaming: bool) -> str:
+    return value_digest(EXPORT_VERSION, streaming,
+                        [(name, frame_digest(df)) for name, df in sheets.items()])
 
 
 def export_excel(mapping_df: pd.DataFrame,
                  results_df: pd.DataFrame,
-                 outxlsx: Path) -> None:
+                 outxlsx: Path,
+                 streaming: bool = False,
+                 split_by: Optional[str] = None,
+                 extra_tables: Optional[Dict[str, pd.DataFrame]] = None,
+                 manifest: Optional[OutputManifest] = None) -> dict:
     """
     Public function (ίδιο όνομα με το αρχικό script στο κομμάτι ΕΞΑΓΩΓΕΣ).
+
+    Parameters
+    ----------
+    streaming : bool
+        Αν True, γράψιμο γραμμή-γραμμή (openpyxl write_only, σταθερή μνήμη).
+    split_by : {"station", "pollutant"}, optional
+        Ένα φύλλο αποτελεσμάτων ανά σταθμό / ρύπο αντί για ενιαίο φύλλο.
+    extra_tables : dict, optional
+        {όνομα φύλλου: DataFrame} μετά τα αποτελέσματα.
+    manifest : OutputManifest, optional
+        Αν δοθεί, το αρχείο δεν ξαναγράφεται όταν τα φύλλα δεν άλλαξαν.
+
+    Returns
+    -------
+    dict
+        paths / seconds / bytes / skipped της εγγραφής.
     """
-    with pd.ExcelWriter(outxlsx) as writer:
-        mapping_df.to_excel(writer, sheet_name="Mapping", index=False)
-        results_df.to_excel(
-            writer,
-            sheet_name="Συνολικοί Μέσοι & Ανά Κάτοικο",
-            index=False
-        )
-    print(f"📄 Αποθήκευση Excel: {outxlsx}")
\ No newline at end of file
+    t0 = time.perf_counter()
+    sheets = _result_sheets(mapping_df, results_df, split_by, extra_tables)
+    digest = _sheets_digest(sheets, streaming) if manifest is not None else None
+    if manifest is not None and manifest.fresh("export:xlsx", outxlsx, digest):
+        manifest.report_skipped([outxlsx])
+        return _report("xlsx", [outxlsx], time.perf_counter() - t0, skipped=1)
+
+    if streaming:
+        _write_xlsx_streaming(sheets, outxlsx)
+    else:
+        _write_xlsx(sheets, outxlsx)
+    if manifest is not None:
+        manifest.commit("export:xlsx", {Path(outxlsx): digest})
+    return _report("xlsx", [outxlsx], time.perf_counter() - t0)
+
+
+def export_results(mapping_df: pd.DataFrame,
+                   results_df: pd.DataFrame,
+                   outxlsx: Path,
+                   sinks: Sequence[str] = ("xlsx",),
+                   streaming: bool = False,
+                   split_by: Optional[str] = None,
+                   extra_tables: Optional[Dict[str, pd.DataFrame]] = None,
+                   manifest: Optional[OutputManifest] = None
+                   ) -> Dict[str, dict]:
+    """
+    Εξαγωγή στα επιλεγμένα sinks ("xlsx", "parquet", "csv").
+
+    Parquet/CSV γράφονται δίπλα στο outxlsx ως <stem>_mapping.*,
+    <stem>_results.* και <stem>_<όνομα>.* για τα extra_tables (ενιαίος
+    πίνακας· το split_by αφορά μόνο το xlsx). Με manifest γράφονται μόνο
+    όσα αρχεία άλλαξαν και διαγράφονται όσα αφορούν πίνακες που έλειψαν.
+
+    Returns
+    -------
+    dict
+        {sink: {"paths", "seconds", "bytes"}}
+    """
+    unknown = [s for s in sinks if s not in SINKS]
+    if unknown:
+        raise ValueError(f"Άγνωστα sinks: {unknown} (επιλογές: {list(SINKS)})")
+
+    outxlsx = Path(outxlsx)
+    tables = {"mapping": mapping_df, "results": results_df, **(extra_tables or {})}
+    reports = {}
+    for sink in sinks:
+        if sink == "xlsx":
+            reports[sink] = export_excel(mapping_df, results_df, outxlsx,
+                                         streaming=streaming, split_by=split_by,
+                                         extra_tables=extra_tables, manifest=manifest)
+            continue
+
+        paths = _sink_paths(outxlsx, sink, tables)
+        t0 = time.perf_counter()
+        digests, skipped = {}, []
+        for name, df in tables.items():
+            path = paths[name]
+            if manifest is not None:
+                digests[path] = value_digest(EXPORT_VERSION, sink, frame_digest(df))
+                if manifest.fresh(f"export:{sink}", path, digests[path]):
+                    skipped.append(path)
+                    continue
+            if sink == "parquet":
+                df.to_parquet(path, index=False)
+            else:
+                # utf-8-sig: σωστά ελληνικά όταν το CSV ανοίγει σε Excel
+                df.to_csv(path, index=False, encoding="utf-8-sig")
+        if manifest is not None:
+            manifest.report_skipped(skipped)
+            manifest.commit(f"export:{sink}", digests)
+        reports[sink] = _report(sink, list(paths.values()), time.perf_counter() - t0,
+                                skipped=len(skipped))
+    return reports
+
+
+def read_exported_tables(outxlsx: Path,
+                         names: Iterable[str],
+                         sinks: Sequence[str] = ("xlsx",)) -> Dict[str, pd.DataFrame]:
+    """
+    Οι πίνακες names από την προηγούμενη εξαγωγή: φύλλο του xlsx, αλλιώς
+    <stem>_<όνομα>.parquet / .csv. Όσοι δεν βρεθούν παραλείπονται.
+    """
+    outxlsx = Path(outxlsx)
+    names = list(names)
+    found: Dict[str, pd.DataFrame] = {}
+    if "xlsx" in sinks and outxlsx.exists():
+        sheets = pd.ExcelFile(outxlsx).sheet_names
+        for name in names:
+            sheet = _sheet_name(name, set())
+            if sheet in sheets:
+                found[name] = pd.read_excel(outxlsx, sheet_name=sheet)
+    for sink in ("parquet", "csv"):
+        if sink not in sinks:
+            continue
+        for name, path in _sink_paths(outxlsx, sink, names).items():
+            if name in found or not path.exists():
+                continue
+            found[name] = (pd.read_parquet(path) if sink == "parquet"
+                           else pd.read_csv(path, encoding="utf-8-sig"))
+    return {name: found[name] for name in names if name in found}
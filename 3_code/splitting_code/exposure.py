@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Έκθεση πληθυσμού & Air Pollution Index per Capita (API_pc)
+
+Όλοι οι υπολογισμοί είναι dense numpy πράξεις πινάκων:
+- C[s, p, t]: συγκέντρωση σταθμού s, ρύπου p, περιόδου t
+- W[a, s]:    βάρη περιοχής a από σταθμό s (βλ. spatial_assignment)
+- E = W @ C:  έκθεση περιοχής (κανονικοποίηση ανά διαθέσιμους σταθμούς)
+- I = E / L:  υποδείκτης ρύπου (τιμή / όριο ΕΕ)
+- API[a, t] = Σ_p I[a, p, t] / N[a, t],  API_pc = API / πληθυσμός περιοχής
+  (N: πλήθος ρύπων με υποδείκτη· μέσος υποδείκτης, ώστε περιοχές με
+  λιγότερους μετρούμενους ρύπους να μη φαίνονται καθαρότερες)
+- πληθυσμιακά σταθμισμένη έκθεση: Σ_a pop_a E[a] / Σ_a pop_a
+"""
+
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from assess_compliance_with_eu_limits import limits_by_pollutant, limits_table
+from data_model import MeasurementModel
+from schema_registry import mean_column, mean_label, mean_period
+
+# Περίοδοι χρονικής ανάλυσης -> pandas Period frequency
+EXPOSURE_PERIODS = {"daily": "D", "monthly": "M", "annual": "Y"}
+OVERALL_LABEL = "2010–2013"
+
+
+# ---------------- κύβος συγκεντρώσεων ---------------- #
+
+def cube_from_means(env_df: pd.DataFrame,
+                    value_col: Optional[str] = None
+                    ) -> Tuple[np.ndarray, pd.Index, pd.Index, pd.Index]:
+    """
+    Μέσοι ανά σταθμό/ρύπο -> κύβος (S, P, 1)· η περίοδος από το όνομα
+    της στήλης μέσων ("Μέσος Όρος 2012" -> "2012").
+    """
+    if value_col is None:
+        value_col = mean_column(env_df.columns)
+    stations = pd.Categorical(env_df["Σταθμός"])
+    pollutants = pd.Categorical(env_df["Ρύπος"])
+    cube = np.full((len(stations.categories), len(pollutants.categories), 1), np.nan)
+    values = pd.to_numeric(env_df[value_col], errors="coerce").to_numpy(float)
+    cube[stations.codes, pollutants.codes, 0] = values
+    return (cube, pd.Index(stations.categories, name="Σταθμός"),
+            pd.Index(pollutants.categories, name="Ρύπος"),
+            pd.Index([mean_period(value_col) or OVERALL_LABEL], name="Περίοδος"))
+
+
+def cube_from_model(model: MeasurementModel,
+                    period: Optional[str] = None
+                    ) -> Tuple[np.ndarray, pd.Index, pd.Index, pd.Index]:
+    """
+    Μοντέλο μετρήσεων -> κύβος (S, P, T) μέσων ανά περίοδο, με bincount
+    στους ακέραιους κωδικούς (χωρίς groupby σε strings).
+    """
+    facts = model.facts
+    s = facts["station_id"].to_numpy(dtype="int64")
+    p = facts["pollutant_id"].to_numpy(dtype="int64")
+    values = facts["Τιμή"].to_numpy(dtype="float64")
+    if period is None:
+        t = np.zeros(len(facts), dtype="int64")
+        dates = facts["Ημερομηνία"]
+        label = mean_period(mean_label(dates.min(), dates.max()))
+        times = pd.Index([label or OVERALL_LABEL], name="Περίοδος")
+    else:
+        if period not in EXPOSURE_PERIODS:
+            raise ValueError(f"Άγνωστη περίοδος: {period!r} "
+                             f"(επιλογές: {list(EXPOSURE_PERIODS)})")
+        t, uniques = pd.factorize(facts["Ημερομηνία"].dt.to_period(EXPOSURE_PERIODS[period]),
+                                  sort=True)
+        times = pd.Index(uniques.astype(str), name="Περίοδος")
+
+    valid = ~np.isnan(values) & (s >= 0) & (p >= 0) & (t >= 0)
+    n_s, n_p, n_t = len(model.stations), len(model.pollutants), len(times)
+    flat = (s[valid] * n_p + p[valid]) * n_t + t[valid]
+    sums = np.bincount(flat, weights=values[valid], minlength=n_s * n_p * n_t)
+    counts = np.bincount(flat, minlength=n_s * n_p * n_t)
+    cube = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+    return (cube.reshape(n_s, n_p, n_t),
+            pd.Index(model.stations["Σταθμός"], name="Σταθμός"),
+            pd.Index(model.pollutants["Ρύπος"], name="Ρύπος"),
+            times)
+
+
+# ---------------- πράξεις πινάκων ---------------- #
+
+def area_exposure(cube: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    E[a, p, t] = Σ_s W[a, s] C[s, p, t] / Σ_s W[a, s] [C διαθέσιμο]
+
+    Δύο matmul (τιμές & μάσκα διαθεσιμότητας)· περιοχή χωρίς διαθέσιμο
+    σταθμό -> NaN.
+    """
+    n_s, n_p, n_t = cube.shape
+    available = ~np.isnan(cube)
+    flat = np.where(available, cube, 0.0).reshape(n_s, n_p * n_t)
+    num = weights @ flat
+    den = weights @ available.reshape(n_s, n_p * n_t).astype("float64")
+    out = np.divide(num, den, out=np.full(num.shape, np.nan), where=den > 0)
+    return out.reshape(len(weights), n_p, n_t)
+
+
+def sub_indices(exposure: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """I[a, p, t] = E[a, p, t] / L[p] (NaN για ρύπους χωρίς όριο)."""
+    return exposure / limits[None, :, None]
+
+
+def air_pollution_index(indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    API[a, t] = Σ_p I[a, p, t] / N[a, t] και N[a, t] (πλήθος διαθέσιμων
+    υποδεικτών)· NaN αν κανένας υποδείκτης.
+    """
+    known = ~np.isnan(indices)
+    total = np.where(known, indices, 0.0).sum(axis=1)
+    count = known.sum(axis=1)
+    api = np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+    return api, count
+
+
+def population_weighted(exposure: np.ndarray, population: np.ndarray) -> np.ndarray:
+    """PWE[p, t] = Σ_a pop_a E[a, p, t] / Σ_a pop_a [E διαθέσιμο]."""
+    n_a, n_p, n_t = exposure.shape
+    pop = np.where(np.isnan(population), 0.0, population)
+    available = ~np.isnan(exposure)
+    num = pop @ np.where(available, exposure, 0.0).reshape(n_a, n_p * n_t)
+    den = pop @ available.reshape(n_a, n_p * n_t).astype("float64")
+    out = np.divide(num, den, out=np.full(num.shape, np.nan), where=den > 0)
+    return out.reshape(n_p, n_t)
+
+
+# ---------------- public ---------------- #
+
+def _long(values: np.ndarray, **axes: pd.Index) -> pd.DataFrame:
+    """Άξονες πίνακα -> long frame με categorical στήλες (σειρά ravel)."""
+    grids = np.meshgrid(*[np.arange(len(ax)) for ax in axes.values()], indexing="ij")
+    return pd.DataFrame({
+        name: pd.Categorical.from_codes(grid.ravel(), categories=ax)
+        for (name, ax), grid in zip(axes.items(), grids)
+    })
+
+
+def compute_exposure(source: Union[pd.DataFrame, MeasurementModel],
+                     weights: pd.DataFrame,
+                     demo_df: pd.DataFrame,
+                     limits: Union[dict, pd.DataFrame],
+                     period: Optional[str] = None,
+                     limit_period: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Έκθεση, υποδείκτες και API_pc ανά Δημοτική Κοινότητα.
+
+    Parameters
+    ----------
+    source : DataFrame | MeasurementModel
+        Μέσοι ανά σταθμό/ρύπο (έξοδος Process #1) ή μοντέλο μετρήσεων για
+        χρονική ανάλυση.
+    weights : DataFrame
+        Βάρη περιοχές × σταθμοί (index: Δημοτική Κοινότητα).
+    period : {"daily", "monthly", "annual"}, optional
+        Μόνο με MeasurementModel· None -> ένας μέσος για όλη την περίοδο.
+
+    Returns
+    -------
+    dict
+        "exposure": Δημοτική Κοινότητα, Ρύπος, Περίοδος, Έκθεση, Υποδείκτης
+        "api": Δημοτική Κοινότητα, Περίοδος, Πληθυσμός, Ρύποι, API, API_pc
+        (Ρύποι: πλήθος υποδεικτών στον μέσο του API)
+        "population_weighted": Ρύπος, Περίοδος, Σταθμισμένη Έκθεση, Υποδείκτης
+    """
+    if isinstance(source, MeasurementModel):
+        cube, stations, pollutants, times = cube_from_model(source, period)
+    else:
+        cube, stations, pollutants, times = cube_from_means(source)
+
+    areas = weights.index
+    w = weights.reindex(columns=stations, fill_value=0.0).to_numpy(dtype="float64")
+    population = (
+        demo_df.drop_duplicates("Δημοτική Κοινότητα")
+        .set_index("Δημοτική Κοινότητα")["Πληθυσμός"]
+        .reindex(areas)
+        .to_numpy(dtype="float64", na_value=np.nan)
+    )
+    limit_vec = (
+        limits_by_pollutant(limits_table(limits), limit_period)
+        .reindex(pollutants).to_numpy(dtype="float64")
+    )
+
+    exposure = area_exposure(cube, w)
+    indices = sub_indices(exposure, limit_vec)
+    api, n_pollutants = air_pollution_index(indices)
+    pwe = population_weighted(exposure, population)
+
+    exposure_df = _long(exposure, **{"Δημοτική Κοινότητα": areas,
+                                     "Ρύπος": pollutants, "Περίοδος": times})
+    exposure_df["Έκθεση"] = exposure.ravel()
+    exposure_df["Υποδείκτης"] = indices.ravel()
+
+    api_df = _long(api, **{"Δημοτική Κοινότητα": areas, "Περίοδος": times})
+    api_df["Πληθυσμός"] = np.repeat(population, len(times))
+    api_df["Ρύποι"] = n_pollutants.ravel()
+    api_df["API"] = api.ravel()
+    api_df["API_pc"] = api_df["API"] / api_df["Πληθυσμός"]
+
+    pwe_df = _long(pwe, **{"Ρύπος": pollutants, "Περίοδος": times})
+    pwe_df["Σταθμισμένη Έκθεση"] = pwe.ravel()
+    pwe_df["Υποδείκτης"] = (pwe / limit_vec[:, None]).ravel()
+
+    return {
+        "exposure": exposure_df.dropna(subset=["Έκθεση"]).reset_index(drop=True),
+        "api": api_df.dropna(subset=["API"]).reset_index(drop=True),
+        "population_weighted": pwe_df.dropna(subset=["Σταθμισμένη Έκθεση"]).reset_index(drop=True),
+    }
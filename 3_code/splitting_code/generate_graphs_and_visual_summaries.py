@@ -5,112 +5,270 @@
 Process – generate_graphs_and_visual_summaries
 
 Παράγει:
-- Γραφήματα ρύπου ανά Δημοτική Κοινότητα
-- Γράφημα συνολικών ρύπων ανά κάτοικο
+- Γραφήματα ρύπου ανά Δημοτική Κοινότητα (μία μπάρα ανά Κοινότητα: σταθμισμένος
+  μέσος των σταθμών της)
+- Γράφημα API_pc ανά Δημοτική Κοινότητα (από το stage έκθεσης· οι
+  υποδείκτες είναι αδιάστατοι, ώστε να συνδυάζονται ρύποι με διαφορετικές
+  μονάδες, π.χ. CO σε mg/m³)
 και τα αποθηκεύει στον φάκελο outputs.
+
+Η σχεδίαση γίνεται headless με το object-oriented API του Agg (χωρίς το
+global state του pyplot), ώστε τα γραφήματα να αποδίδονται παράλληλα σε
+process pool. Κάθε worker κρατά ένα έτοιμο Figure/Axes και το
+επαναχρησιμοποιεί για όλα τα γραφήματα που του αναλογούν.
+
+Με manifest (βλ. output_manifest) κάθε γράφημα έχει hash από το spec
+του (δεδομένα, όριο, ετικέτες) + dpi/format· όσα δεν άλλαξαν δεν
+ξανασχεδιάζονται και γραφήματα ρύπων που χάθηκαν διαγράφονται.
 """
 
 from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
+from dag_executor import process_pool
+from output_manifest import OutputManifest, value_digest
+from schema_registry import mean_column
 
-def _plot_pollutant_by_district(df: pd.DataFrame, outdir: Path, limits: dict) -> None:
-    df = df.dropna(subset=["Μέσος Όρος 2010–2013"])
-    pollutants = df["Ρύπος"].unique()
+# format -> (επέκταση αρχείου, default dpi, suffix ονόματος)
+RENDER_FORMATS = {
+    "png": ("png", 300, ""),
+    "svg": ("svg", 300, ""),
+    "preview": ("png", 72, "_preview"),
+}
 
-    for pollutant in pollutants:
-        sub = df[df["Ρύπος"] == pollutant].copy()
-        if sub.empty:
-            continue
+# Σταθερά metadata / hash salt ώστε τα αρχεία να είναι byte-stable
+_SAVE_METADATA = {
+    "png": {"Software": None},
+    "svg": {"Date": None, "Creator": None},
+}
+_SVG_HASHSALT = "mdat-scenario2"
 
-        sub["Χρώμα"] = sub.apply(
-            lambda r: "red" if "Υπέρβαση" in str(r["Κατάσταση"]) else "green",
-            axis=1
-        )
+# Αυξάνεται όταν αλλάζει η σχεδίαση (ακυρώνει τα memoized γραφήματα)
+RENDER_VERSION = 1
 
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(
-            sub["Δημοτική Κοινότητα"],
-            sub["Μέσος Όρος 2010–2013"],
-            color=sub["Χρώμα"],
-            alpha=0.8
-        )
+_FIGSIZE = (10, 6)
 
-        for bar, val in zip(bars, sub["Μέσος Όρος 2010–2013"]):
-            plt.text(
-                bar.get_x() + bar.get_width() / 2,
-                bar.get_height() + 0.5,
-                f"{val:.1f}",
-                ha="center",
-                va="bottom",
-                fontsize=9
-            )
-
-        if pollutant in limits:
-            plt.axhline(
-                limits[pollutant],
-                color="orange",
-                linestyle="--",
-                label=f"Όριο ΕΕ: {limits[pollutant]} {'mg/m³' if pollutant=='CO' else 'μg/m³'}"
-            )
-
-        plt.title(f"{pollutant} – Μέσος Όρος 2010–2013 ανά Δημοτική Κοινότητα")
-        plt.ylabel("Συγκέντρωση")
-        plt.xlabel("Δημοτική Κοινότητα")
-        plt.legend()
-        plt.grid(axis="y", linestyle="--", alpha=0.4)
-        plt.tight_layout()
-
-        save_path = outdir / f"{pollutant}_by_district.png"
-        plt.savefig(save_path, dpi=300)
-        plt.close()
-        print(f"📊 Αποθηκεύτηκε γράφημα: {save_path}")
-
-
-def _plot_total_pollution_per_capita(df: pd.DataFrame, outdir: Path) -> None:
-    df = df.dropna(subset=["Ρύποι ανά κάτοικο"])
-    total_per_district = (
-        df.groupby("Δημοτική Κοινότητα", as_index=False)["Ρύποι ανά κάτοικο"].sum()
-    )
+API_CHART = "API_per_Capita"
+
+_SUBPLOT_PARAMS = ("left", "bottom", "right", "top", "wspace", "hspace")
+
+# Figure/Axes template ανά διεργασία (επαναχρησιμοποιείται)
+_TEMPLATE: Optional[Tuple[Figure, object, dict]] = None
 
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(
-        total_per_district["Δημοτική Κοινότητα"],
-        total_per_district["Ρύποι ανά κάτοικο"],
-        color="royalblue",
-        alpha=0.8
-    )
 
-    for bar, val in zip(bars, total_per_district["Ρύποι ανά κάτοικο"]):
-        plt.text(
+def _get_template() -> Tuple[Figure, object]:
+    """
+    Επιστρέφει το Figure/Axes της διεργασίας, επαναφέροντας τη διάταξη
+    στην αρχική, ώστε το αποτέλεσμα να μην εξαρτάται από το ποια
+    γραφήματα σχεδιάστηκαν πριν (byte-stable έξοδος).
+    """
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        fig = Figure(figsize=_FIGSIZE)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        params = {k: getattr(fig.subplotpars, k) for k in _SUBPLOT_PARAMS}
+        _TEMPLATE = (fig, ax, params)
+
+    fig, ax, params = _TEMPLATE
+    ax.clear()
+    fig.subplots_adjust(**params)
+    return fig, ax
+
+
+def _render_bar_chart(spec: dict, save_path: Path, dpi: int, ext: str) -> Path:
+    """
+    Σχεδιάζει ένα bar chart από το spec (απλό dict, picklable) στο
+    κοινό template και το αποθηκεύει.
+    """
+    fig, ax = _get_template()
+
+    bars = ax.bar(spec["x"], spec["heights"], color=spec["colors"], alpha=0.8)
+    for bar, val in zip(bars, spec["heights"]):
+        ax.text(
             bar.get_x() + bar.get_width() / 2,
-            bar.get_height() + 0.00001,
-            f"{val:.6f}",
+            bar.get_height() + spec["text_offset"],
+            spec["text_fmt"].format(val),
             ha="center",
             va="bottom",
             fontsize=9
         )
 
-    plt.title("Συνολικοί Ρύποι Ανά Κάτοικο (2010–2013) ανά Δημοτική Κοινότητα")
-    plt.ylabel("Συνολικοί Ρύποι ανά Κάτοικο (μονάδες συγκέντρωσης)")
-    plt.xlabel("Δημοτική Κοινότητα")
-    plt.grid(axis="y", linestyle="--", alpha=0.5)
-    plt.tight_layout()
+    if spec.get("limit") is not None:
+        ax.axhline(spec["limit"], color="orange", linestyle="--",
+                   label=spec["limit_label"])
+        ax.legend()
+
+    ax.set_title(spec["title"])
+    ax.set_ylabel(spec["ylabel"])
+    ax.set_xlabel("Δημοτική Κοινότητα")
+    ax.grid(axis="y", linestyle="--", alpha=spec["grid_alpha"])
+    fig.tight_layout()
+
+    with matplotlib.rc_context({"svg.hashsalt": _SVG_HASHSALT}):
+        fig.savefig(save_path, dpi=dpi, format=ext,
+                    metadata=_SAVE_METADATA.get(ext))
+    return save_path
+
+
+def _render_job(job: Tuple[dict, Path, int, str]) -> Path:
+    return _render_bar_chart(*job)
 
-    save_path = outdir / "Total_Pollutants_per_Capita.png"
-    plt.savefig(save_path, dpi=300)
-    plt.close()
-    print(f"📊 Αποθηκεύτηκε συνολικό γράφημα: {save_path}")
+
+def _district_values(sub: pd.DataFrame) -> pd.Series:
+    """
+    Μία τιμή ανά Δημοτική Κοινότητα: σταθμισμένος μέσος των σταθμών της
+    (Βάρος από τον πίνακα αντιστοίχισης, π.χ. IDW· αλλιώς ίσα βάρη).
+    """
+    weight = sub["Βάρος"] if "Βάρος" in sub.columns else pd.Series(1.0, index=sub.index)
+    sums = (
+        sub.assign(_w=weight, _wv=weight * sub[mean_column(sub.columns)])
+        .groupby("Δημοτική Κοινότητα", sort=False, observed=True)[["_w", "_wv"]]
+        .sum()
+    )
+    return sums["_wv"] / sums["_w"]
+
+
+def _pollutant_specs(df: pd.DataFrame, limits: dict) -> List[Tuple[str, dict]]:
+    value_col = mean_column(df.columns)
+    df = df.dropna(subset=[value_col])
+
+    specs = []
+    # Ένα groupby pass (κωδικοί categorical) αντί για σύγκριση strings ανά ρύπο
+    for pollutant, sub in df.groupby("Ρύπος", sort=False, observed=True):
+        values = _district_values(sub)
+        if values.empty:
+            continue
+        limit = limits.get(pollutant)
+        spec = {
+            "x": values.index.astype(str).tolist(),
+            "heights": values.tolist(),
+            "colors": ["red" if limit is not None and v > limit else "green"
+                       for v in values],
+            "text_offset": 0.5,
+            "text_fmt": "{:.1f}",
+            "title": f"{pollutant} – {value_col} ανά Δημοτική Κοινότητα",
+            "ylabel": "Συγκέντρωση",
+            "grid_alpha": 0.4,
+        }
+        if limit is not None:
+            unit = "mg/m³" if pollutant == "CO" else "μg/m³"
+            spec["limit"] = limit
+            spec["limit_label"] = f"Όριο ΕΕ: {limit} {unit}"
+        specs.append((f"{pollutant}_by_district", spec))
+    return specs
+
+
+def _api_per_capita_spec(api: pd.DataFrame) -> Tuple[str, dict]:
+    """
+    API_pc ανά Δημοτική Κοινότητα (έξοδος του stage έκθεσης): μέσος
+    υποδείκτης συγκέντρωση / όριο ΕΕ, αδιάστατος, ανά κάτοικο. Με πολλές
+    περιόδους σχεδιάζεται ο μέσος τους.
+    """
+    api = api.dropna(subset=["API_pc"])
+    per_district = (
+        api.groupby("Δημοτική Κοινότητα", sort=False, observed=True)["API_pc"].mean()
+    )
+    periods = api["Περίοδος"].astype(str).unique()
+    period = periods[0] if len(periods) == 1 else f"{periods[0]}–{periods[-1]}"
+    heights = per_district.tolist()
+    spec = {
+        "x": per_district.index.astype(str).tolist(),
+        "heights": heights,
+        "colors": "royalblue",
+        "text_offset": max(heights, default=0.0) * 0.01,
+        "text_fmt": "{:.2e}",
+        "title": f"Air Pollution Index ανά κάτοικο (API_pc, {period}) "
+                 "ανά Δημοτική Κοινότητα",
+        "ylabel": "API_pc (μέσος λόγος συγκέντρωση / όριο ΕΕ, ανά κάτοικο)",
+        "grid_alpha": 0.5,
+    }
+    return API_CHART, spec
+
+
+def _render_all(named_specs: List[Tuple[str, dict]],
+                outdir: Path,
+                fmt: str,
+                dpi: Optional[int],
+                workers: int,
+                manifest: Optional[OutputManifest] = None,
+                evict: bool = True) -> List[Path]:
+    """Σχεδιάζει τα specs· επιστρέφει τα αρχεία που γράφτηκαν (όχι τα αμετάβλητα)."""
+    ext, default_dpi, suffix = RENDER_FORMATS[fmt]
+    dpi = dpi or default_dpi
+    jobs = [(spec, outdir / f"{name}{suffix}.{ext}", dpi, ext)
+            for name, spec in named_specs]
+
+    group = f"charts:{fmt}"
+    digests = {}
+    if manifest is not None:
+        version = (RENDER_VERSION, matplotlib.__version__, _FIGSIZE)
+        digests = {path: value_digest(version, spec, dpi, ext)
+                   for spec, path, dpi, ext in jobs}
+        skipped = {path for _, path, _, _ in jobs
+                   if manifest.fresh(group, path, digests[path])}
+        manifest.report_skipped(sorted(skipped))
+        jobs = [job for job in jobs if job[1] not in skipped]
+
+    if workers > 1 and len(jobs) > 1:
+        with process_pool(min(workers, len(jobs))) as pool:
+            paths = list(pool.map(_render_job, jobs))
+    else:
+        paths = [_render_job(job) for job in jobs]
+
+    if manifest is not None:
+        manifest.commit(group, digests, evict=evict)
+    return paths
 
 
 def generate_graphs_and_visual_summaries(
     df: pd.DataFrame,
     output_dir: Path,
-    limits: dict
+    limits: dict,
+    fmt: str = "png",
+    dpi: Optional[int] = None,
+    workers: int = 1,
+    pollutants: Optional[Iterable[str]] = None,
+    manifest: Optional[OutputManifest] = None,
+    api: Optional[pd.DataFrame] = None
 ) -> None:
     """
     Public function (ίδιο όνομα με το αρχικό script).
+
+    Parameters
+    ----------
+    fmt : str
+        "png", "svg" ή "preview" (PNG χαμηλής ανάλυσης, *_preview.png).
+    dpi : int, optional
+        Ανάλυση· αν δεν δοθεί, η default του format (300 / 72 για preview).
+    workers : int
+        Πλήθος διεργασιών για παράλληλη σχεδίαση.
+    pollutants : iterable[str], optional
+        Αν δοθεί, ξανασχεδιάζονται μόνο τα γραφήματα αυτών των ρύπων
+        (+ το API_pc).
+    manifest : OutputManifest, optional
+        Παράλειψη αμετάβλητων γραφημάτων και διαγραφή όσων δεν παράγονται
+        πια (μόνο όταν σχεδιάζονται όλοι οι ρύποι).
+    api : DataFrame, optional
+        Πίνακας "api" του compute_exposure (Δημοτική Κοινότητα, Περίοδος,
+        API_pc)· χωρίς αυτόν δεν σχεδιάζεται το γράφημα API_pc.
     """
-    _plot_pollutant_by_district(df, output_dir, limits)
-    _plot_total_pollution_per_capita(df, output_dir)
+    if fmt not in RENDER_FORMATS:
+        raise ValueError(f"Άγνωστο format γραφημάτων: {fmt!r}")
+
+    pollutant_specs = _pollutant_specs(df, limits)
+    if pollutants is not None:
+        wanted = {f"{p}_by_district" for p in pollutants}
+        pollutant_specs = [(n, sp) for n, sp in pollutant_specs if n in wanted]
+    if api is not None:
+        pollutant_specs.append(_api_per_capita_spec(api))
+    paths = _render_all(pollutant_specs, output_dir, fmt, dpi, workers,
+                        manifest=manifest, evict=pollutants is None)
+
+    for path in paths:
+        kind = "γράφημα API_pc" if path.stem.startswith(API_CHART) else "γράφημα"
+        print(f"📊 Αποθηκεύτηκε {kind}: {path}")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Incremental επανυπολογισμός όταν προστίθενται νέοι μήνες μετρήσεων
+
+Η κατάσταση συσσώρευσης (πλήθη, αθροίσματα, min/max, KLL sketches ανά
+σταθμό/ρύπο και τελευταία ημερομηνία ανά σταθμό) αποθηκεύεται σε JSON.
+Με update_with_new_rows ενημερώνεται μόνο με τις νέες γραμμές, οπότε το
+κόστος κλιμακώνεται με το μέγεθος των νέων δεδομένων και όχι του
+ιστορικού. Τα downstream βήματα (per-capita, συμμόρφωση, Excel, γραφήματα)
+ξανατρέχουν μόνο όταν κάτι άλλαξε, και τα γραφήματα μόνο για τους
+ρύπους που επηρεάστηκαν.
+
+Η εξαγωγή περνά από το export_results με τα ίδια sinks/manifest με το
+πλήρες run· το API_pc ξαναϋπολογίζεται από τους μέσους της κατάστασης,
+ενώ πίνακες που χρειάζονται όλο το ιστορικό μετρήσεων (π.χ. υπερβάσεις,
+κάλυψη) δίνονται από τον καλούντα (extra_tables) ως έχουν.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+import pandas as pd
+
+from aggregate_and_compute_mean_pollutant_levels import _pollutant_names
+from assess_compliance_with_eu_limits import assess_compliance_with_eu_limits
+from export_excel import export_results
+from exposure import compute_exposure
+from generate_graphs_and_visual_summaries import generate_graphs_and_visual_summaries
+from merge_and_compute_per_capita import merge_and_compute_per_capita
+from percentile_store import SketchStore
+from schema_registry import resolve_columns
+from spatial_assignment import weights_from_mapping, weights_to_mapping_frame
+from streaming_ingestion import (
+    DEFAULT_QUANTILES,
+    RunningStats,
+    StreamingAggregator,
+    iter_excel_chunks,
+)
+
+STATE_VERSION = 1
+
+
+class AggregationState:
+    """
+    Persisted κατάσταση συσσώρευσης ανά (σταθμό, στήλη ρύπου).
+
+    Τα στατιστικά (άθροισμα, min/max, KLL) δεν αφαιρούν τιμές, οπότε κάθε
+    (σταθμός, χρονική στιγμή) μετράει το πολύ μία φορά: ανά σταθμό
+    κρατιέται η τελευταία ημερομηνία που έχει μετρηθεί (watermark) και
+    ό,τι είναι στο ή πριν από αυτήν απορρίπτεται με προειδοποίηση.
+    Διορθώσεις ή καθυστερημένες μετρήσεις παλαιότερων ημερών χρειάζονται
+    νέο build_state από το πλήρες ιστορικό.
+    """
+
+    def __init__(self):
+        self.aggregator = StreamingAggregator()
+        self.last_dates: Dict[str, pd.Timestamp] = {}
+        self.rejected: Dict[Tuple[str, str], int] = {}
+        # Γραμμές που δέχτηκε η τελευταία παρτίδα (π.χ. για τα sketches)
+        self.accepted: List[Tuple[str, pd.DataFrame]] = []
+
+    def update(self, station: str, chunk: pd.DataFrame) -> Set[Tuple[str, str]]:
+        """Ένα chunk ως ξεχωριστή παρτίδα (βλ. update_batch)."""
+        return self.update_batch([(station, chunk)])
+
+    def update_batch(self, chunks: Iterable[Tuple[str, pd.DataFrame]]
+                     ) -> Set[Tuple[str, str]]:
+        """
+        Προσθέτει τα chunks ως μία παρτίδα· επιστρέφει τα κλειδιά που άλλαξαν.
+
+        Απορρίπτονται (και καταγράφονται στο self.rejected) γραμμές:
+        - chunks χωρίς στήλη ημερομηνίας και γραμμές χωρίς έγκυρη ημερομηνία
+        - στο ή πριν από το watermark του σταθμού (ήδη μετρημένες)
+        - με χρονική στιγμή που εμφανίστηκε ήδη στην παρτίδα (μένει η πρώτη)
+
+        Το watermark προχωρά μόνο στο τέλος της παρτίδας, οπότε μέσα σε
+        αυτήν η σειρά των γραμμών δεν παίζει ρόλο.
+        """
+        self.rejected = {}
+        self.accepted = []
+        seen: Dict[str, Set[int]] = {}
+        newest: Dict[str, pd.Timestamp] = {}
+        changed: Set[Tuple[str, str]] = set()
+
+        for station, chunk in chunks:
+            date_col = resolve_columns(chunk.columns).date_column
+            if date_col is None:
+                self._reject(station, "χωρίς στήλη ημερομηνίας", len(chunk))
+                continue
+            dates = pd.to_datetime(chunk[date_col], errors="coerce")
+            keep = dates.notna().to_numpy()
+            # Κενές γραμμές (π.χ. στο τέλος του φύλλου) δεν αναφέρονται
+            values = chunk.drop(columns=date_col).apply(pd.to_numeric, errors="coerce")
+            self._reject(station, "χωρίς ημερομηνία",
+                         int((~keep & values.notna().any(axis=1).to_numpy()).sum()))
+
+            last = self.last_dates.get(station)
+            if last is not None:
+                late = keep & (dates <= last).to_numpy()
+                self._reject(station, f"στο ή πριν το ήδη μετρημένο {last} – διορθώσεις μόνο με νέο build_state", int(late.sum()))
+                keep = keep & ~late
+
+            stamps = dates.to_numpy(dtype="datetime64[ns]").view("int64")
+            station_seen = seen.setdefault(station, set())
+            kept = pd.Index(stamps[keep])
+            duplicate = np.zeros(len(keep), dtype=bool)
+            duplicate[np.flatnonzero(keep)[kept.isin(station_seen) | kept.duplicated()]] = True
+            self._reject(station, "διπλή χρονική στιγμή", int(duplicate.sum()))
+            keep = keep & ~duplicate
+
+            if not keep.any():
+                continue
+            station_seen.update(stamps[keep].tolist())
+            top = dates[keep].max()
+            newest[station] = max(top, newest[station]) if station in newest else top
+            self.accepted.append((station, chunk[keep]))
+            changed |= set(self.aggregator.update(station, chunk[keep]))
+
+        for station, top in newest.items():
+            last = self.last_dates.get(station)
+            self.last_dates[station] = top if last is None else max(top, last)
+        for (station, reason), rows in self.rejected.items():
+            print(f"⚠ {station}: απορρίφθηκαν {rows} γραμμές ({reason})")
+        return changed
+
+    def _reject(self, station: str, reason: str, rows: int) -> None:
+        if rows:
+            key = (station, reason)
+            self.rejected[key] = self.rejected.get(key, 0) + rows
+
+    def means(self) -> pd.DataFrame:
+        return self.aggregator.means()
+
+    # ---------------- persistence ---------------- #
+
+    def to_dict(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "stats": [
+                {"station": station, "column": col, **s.to_dict()}
+                for (station, col), s in self.aggregator.stats.items()
+            ],
+            "last_dates": {k: v.isoformat() for k, v in self.last_dates.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AggregationState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Μη συμβατή έκδοση κατάστασης: {data.get('version')}")
+        state = cls()
+        for entry in data["stats"]:
+            key = (entry["station"], entry["column"])
+            state.aggregator.stats[key] = RunningStats.from_dict(entry)
+        state.last_dates = {k: pd.Timestamp(v) for k, v in data["last_dates"].items()}
+        return state
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "AggregationState":
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
+
+
+def build_state(pollution_path: Path, station_sheets: Iterable[str]) -> AggregationState:
+    """Αρχική κατάσταση από ολόκληρο το ιστορικό (μία φορά)."""
+    state = AggregationState()
+    state.update_batch(iter_excel_chunks(pollution_path, list(station_sheets)))
+    return state
+
+
+def update_with_new_rows(
+    state_path: Path,
+    new_chunks: Iterable[Tuple[str, pd.DataFrame]],
+    demo_df: pd.DataFrame,
+    station_to_area_admin: dict,
+    limits: dict,
+    output_dir: Path,
+    output_excel: Path,
+    mapping_df: Optional[pd.DataFrame] = None,
+    chart_kwargs: Optional[dict] = None,
+    weights: Optional[pd.DataFrame] = None,
+    export_kwargs: Optional[dict] = None,
+    extra_tables: Optional[Dict[str, pd.DataFrame]] = None,
+    sketch_path: Optional[Path] = None,
+    percentiles: Sequence[float] = DEFAULT_QUANTILES
+) -> Optional[pd.DataFrame]:
+    """
+    Ενημερώνει την persisted κατάσταση με νέες γραμμές και ξανατρέχει μόνο
+    τα επηρεαζόμενα βήματα.
+
+    Parameters
+    ----------
+    state_path : Path
+        JSON αρχείο κατάστασης (βλ. build_state / AggregationState.save).
+    new_chunks : iterable[(σταθμός, DataFrame)]
+        Νέες γραμμές ανά σταθμό (ίδιες στήλες με τα φύλλα Excel).
+    weights : DataFrame, optional
+        Πίνακας βαρών περιοχές × σταθμοί (αντί για station_to_area_admin).
+    export_kwargs : dict, optional
+        sinks / streaming / split_by / manifest του export_results.
+    extra_tables : dict, optional
+        Επιπλέον πίνακες της εξαγωγής (με τη σειρά τους)· όσοι
+        ξαναϋπολογίζονται εδώ (API_pc, Εκατοστημόρια) αντικαθίστανται.
+    sketch_path : Path, optional
+        Persisted SketchStore (βλ. percentile_store)· οι νέες γραμμές
+        συγχωνεύονται σε αυτό και το φύλλο "Εκατοστημόρια" ξαναϋπολογίζεται.
+    percentiles : sequence of float
+        Εκατοστημόρια του φύλλου "Εκατοστημόρια".
+
+    Returns
+    -------
+    DataFrame | None
+        Ο ενημερωμένος πίνακας συμμόρφωσης, ή None αν δεν άλλαξε τίποτα.
+    """
+    state = AggregationState.load(state_path)
+
+    changed = state.update_batch(new_chunks)
+
+    if not changed:
+        print("⏭ Καμία νέα μέτρηση – παράλειψη επανυπολογισμού")
+        return None
+
+    affected = set(_pollutant_names(pd.Series([c for _, c in changed], dtype="str")))
+    print(f"🔁 Νέες μετρήσεις για {len(changed)} σταθμούς/ρύπους: "
+          f"{', '.join(sorted(affected))}")
+
+    if weights is None:
+        weights = weights_from_mapping(station_to_area_admin)
+    merged = merge_and_compute_per_capita(state.means(), demo_df, weights=weights)
+    assessed = assess_compliance_with_eu_limits(merged, limits)
+    exposure = compute_exposure(state.means(), weights, demo_df, limits)
+
+    if mapping_df is None:
+        mapping_df = weights_to_mapping_frame(weights)
+    tables = dict(extra_tables or {})
+    tables["API_pc"] = exposure["api"]
+    store = None
+    if sketch_path is not None and Path(sketch_path).exists():
+        store = SketchStore.load(sketch_path)
+        store.merge(SketchStore.from_chunks(state.accepted, k=store.k))
+        tables["Εκατοστημόρια"] = store.percentiles("annual", percentiles)
+    elif sketch_path is not None:
+        print(f"⚠ Δεν υπάρχει {sketch_path}: τα εκατοστημόρια μένουν ως είχαν")
+    export_results(mapping_df, assessed, output_excel, extra_tables=tables,
+                   **(export_kwargs or {}))
+    generate_graphs_and_visual_summaries(
+        assessed, output_dir, limits, pollutants=affected, api=exposure["api"],
+        **(chart_kwargs or {})
+    )
+
+    if store is not None:
+        store.save(sketch_path)
+    state.save(state_path)
+    return assessed
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache εισόδων – columnar αρχεία για τα parsed φύλλα ρύπανσης & απογραφής
+
+- Κλειδί: hash περιεχομένου αρχείου + όνομα φύλλου + NORMALIZATION_VERSION
+- Μορφή: Feather (Arrow IPC, χωρίς συμπίεση)· μόνο δεδομένα, όχι
+  εκτελέσιμα αντικείμενα όπως το pickle, οπότε ένας κοινόχρηστος φάκελος
+  cache δεν επιτρέπει εκτέλεση κώδικα. Στήλες object με μικτούς τύπους
+  που δεν γράφει το Arrow αποθηκεύονται ως κείμενο· χωρίς pyarrow δεν
+  γίνεται caching
+- Ανάγνωση: το αρχείο γίνεται memory-map, αλλά το to_pandas αντιγράφει
+  τα δεδομένα (το όφελος είναι ότι παραλείπεται το parsing του Excel)
+- Εκκαθάριση: LRU με όριο συνολικού μεγέθους (max_bytes)
+
+Χρησιμοποιείται από _read_pollution_sheets / _read_population όταν ο
+controller περνά cache=InputCache(...).
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - προαιρετική εξάρτηση
+    pa = None
+    feather = None
+
+# Αυξάνεται όταν αλλάζει η κανονικοποίηση (schema_registry κ.λπ.),
+# ώστε να ακυρώνονται αυτόματα όλες οι παλιές εγγραφές.
+NORMALIZATION_VERSION = 2
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_INDEX_PREFIX = "__index_level_"
+
+# (path, size, mtime_ns) -> sha256, για να μη ξαναδιαβάζεται το αρχείο
+# στην ίδια εκτέλεση.
+_FILE_HASHES: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 του περιεχομένου του αρχείου (memoized ανά size/mtime)."""
+    st = os.stat(path)
+    memo_key = (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+    digest = _FILE_HASHES.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        _FILE_HASHES[memo_key] = digest
+    return digest
+
+
+class InputCache:
+    """
+    Content-addressed cache για DataFrames εισόδου.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        Φάκελος αποθήκευσης.
+    max_bytes : int
+        Μέγιστο συνολικό μέγεθος· τα λιγότερο πρόσφατα χρησιμοποιημένα
+        αρχεία διαγράφονται μετά από κάθε εγγραφή.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Τα stages του controller μπορεί να τρέχουν παράλληλα (threads)
+        self._lock = threading.RLock()
+
+    # ---------------- κλειδιά / αρχεία ---------------- #
+
+    def key(self, source: Path, sheet: str, variant: str = "") -> str:
+        parts = [file_digest(source), sheet, variant, str(NORMALIZATION_VERSION)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _entries(self) -> List[Path]:
+        if not self.cache_dir.exists():
+            return []
+        # Τα .pkl παλαιότερων εκδόσεων δεν διαβάζονται, μόνο εκκαθαρίζονται
+        return [p for p in self.cache_dir.iterdir()
+                if p.suffix in (".feather", ".pkl")]
+
+    def _find(self, key: str) -> Optional[Path]:
+        path = self.cache_dir / f"{key}.feather"
+        return path if path.exists() else None
+
+    # ---------------- get / put ---------------- #
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._find(key)
+        if path is None:
+            self.misses += 1
+            return None
+        table = feather.read_table(path, memory_map=True)
+        df = _from_frame(table.to_pandas())
+        os.utime(path)  # LRU: σημείωση πρόσφατης χρήσης
+        self.hits += 1
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> Optional[Path]:
+        with self._lock:
+            return self._put(key, df)
+
+    def _put(self, key: str, df: pd.DataFrame) -> Optional[Path]:
+        if feather is None:
+            return None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.feather"
+        tmp = path.with_suffix(".feather.tmp")
+        frame = _to_frame(df)
+        try:
+            feather.write_feather(frame, tmp, compression="uncompressed")
+        except (pa.ArrowException, ValueError, TypeError):
+            try:
+                feather.write_feather(_stringify_objects(frame), tmp,
+                                      compression="uncompressed")
+            except (pa.ArrowException, ValueError, TypeError):
+                tmp.unlink(missing_ok=True)
+                return None
+        os.replace(tmp, path)
+        self._evict()
+        return path
+
+    # ---------------- εκκαθάριση ---------------- #
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self._entries())
+
+    def evict(self) -> List[Path]:
+        """Διαγράφει τα παλαιότερα (LRU) αρχεία μέχρι size <= max_bytes."""
+        with self._lock:
+            return self._evict()
+
+    def _evict(self) -> List[Path]:
+        entries = sorted(self._entries(), key=lambda p: p.stat().st_mtime_ns)
+        total = sum(p.stat().st_size for p in entries)
+        removed = []
+        while entries and total > self.max_bytes:
+            victim = entries.pop(0)
+            total -= victim.stat().st_size
+            victim.unlink()
+            removed.append(victim)
+        return removed
+
+    def clear(self) -> None:
+        for p in self._entries():
+            p.unlink()
+
+
+def _to_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Feather δέχεται μόνο default index: το index γίνεται στήλη."""
+    out = df.copy()
+    out.index.names = [f"{_INDEX_PREFIX}{i}" for i in range(out.index.nlevels)]
+    return out.reset_index()
+
+
+def _stringify_objects(df: pd.DataFrame) -> pd.DataFrame:
+    """Στήλες object (μικτοί τύποι) -> κείμενο· τα κενά μένουν κενά."""
+    out = df.copy()
+    for col in out.columns[out.dtypes == object]:
+        values = out[col]
+        out[col] = values.where(values.isna(), values.astype(str))
+    return out
+
+
+def _from_frame(df: pd.DataFrame) -> pd.DataFrame:
+    index_cols = [c for c in df.columns if str(c).startswith(_INDEX_PREFIX)]
+    df = df.set_index(index_cols)
+    df.index.names = [None] * df.index.nlevels
+    return df
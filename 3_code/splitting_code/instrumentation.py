@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instrumentation ανά stage του controller
+
+Για κάθε κλήση process καταγράφει:
+- wall time
+- CPU time του thread του stage (cpu_s) και των worker διεργασιών που
+  τερμάτισαν κατά τη διάρκειά του (children_cpu_s, RUSAGE_CHILDREN) – εκεί
+  γίνεται η ανάγνωση φύλλων (#1) και η σχεδίαση γραφημάτων (#5)
+- RSS πριν/μετά, peak RSS της διεργασίας και (προαιρετικά) tracemalloc
+- γραμμές/στήλες εισόδων & εξόδου
+- bytes που διαβάστηκαν/γράφτηκαν από το thread (bytes_read/written,
+  /proc/self/task/<tid>/io) και από όλη τη διεργασία μαζί με τα workers
+  που τερμάτισαν (process_bytes_read/written, /proc/self/io) – Linux
+
+Έξοδοι: JSON log (stages.json), Chrome trace (trace.json – ανοίγει και στο
+speedscope / chrome://tracing / Perfetto) και προαιρετικά cProfile dump
+ανά stage (<stage>.prof).
+
+Με παράλληλα stages (STAGE_WORKERS > 1) τα tracemalloc/RSS, children_cpu_s
+και process_bytes_* είναι μεγέθη όλης της διεργασίας (μπορεί να περιέχουν
+και stages που έτρεξαν ταυτόχρονα)· για ακριβή απόδοση ανά stage τρέξε
+σειριακά. Τα πεδία και το εύρος τους περιγράφονται στο FIELD_SCOPES.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Εύρος κάθε μέτρησης (γράφεται και στο stages.json / trace.json)
+FIELD_SCOPES = {
+    "cpu_s": "μόνο το thread του stage",
+    "children_cpu_s": "worker διεργασίες που τερμάτισαν κατά το stage (όλης της διεργασίας)",
+    "bytes_read": "μόνο το thread του stage",
+    "bytes_written": "μόνο το thread του stage",
+    "process_bytes_read": "όλη η διεργασία + workers που τερμάτισαν κατά το stage",
+    "process_bytes_written": "όλη η διεργασία + workers που τερμάτισαν κατά το stage",
+    "rss_before": "όλη η διεργασία",
+    "rss_after": "όλη η διεργασία",
+    "peak_rss": "όλη η διεργασία",
+}
+
+
+# ---------------- μετρήσεις διεργασίας ---------------- #
+
+def _current_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _children_cpu() -> Optional[float]:
+    """CPU (user + system) των worker διεργασιών που έχουν τερματίσει."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _read_io(path: str) -> Optional[Dict[str, int]]:
+    try:
+        with open(path) as fh:
+            fields = dict(line.split(":") for line in fh if ":" in line)
+        return {"read": int(fields["rchar"]), "written": int(fields["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _io_counters() -> Dict[str, Optional[Dict[str, int]]]:
+    """
+    rchar/wchar του τρέχοντος thread και της διεργασίας· το δεύτερο
+    περιλαμβάνει και τα παιδιά που έχουν τερματίσει (και αναμένει ο γονέας).
+    """
+    return {"thread": _read_io(f"/proc/self/task/{threading.get_native_id()}/io"),
+            "process": _read_io("/proc/self/io")}
+
+
+def _shape(obj: Any) -> Optional[Dict[str, int]]:
+    """Γραμμές/στήλες για DataFrame, ndarray ή dict από DataFrames."""
+    shape = getattr(obj, "shape", None)
+    if isinstance(shape, tuple) and shape:
+        return {"rows": int(shape[0]), "cols": int(shape[1]) if len(shape) > 1 else 1}
+    facts = getattr(obj, "facts", None)
+    if facts is not None:
+        return _shape(facts)
+    if isinstance(obj, dict):
+        shapes = [s for s in map(_shape, obj.values()) if s is not None]
+        if shapes:
+            return {"rows": sum(s["rows"] for s in shapes),
+                    "cols": max(s["cols"] for s in shapes)}
+    return None
+
+
+# ---------------- instrumentation ---------------- #
+
+class Instrumentation:
+    """
+    Parameters
+    ----------
+    trace_malloc : bool
+        Καταγραφή tracemalloc (ακριβέστερη μνήμη Python, αλλά αισθητό
+        overhead στις allocations).
+    profile_dir : Path, optional
+        Αν δοθεί, cProfile ανά stage -> <profile_dir>/<stage>.prof.
+    """
+
+    def __init__(self, trace_malloc: bool = False, profile_dir: Optional[Path] = None):
+        self.trace_malloc = trace_malloc
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
+        self.records: List[dict] = []
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> "Instrumentation":
+        self._t0 = time.perf_counter()
+        if self.trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def wrap(self, stage, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Τυλίγει το func του stage (για run_dag(..., wrap=...))."""
+
+        def instrumented(*args, **kwargs):
+            record = {
+                "stage": stage.name,
+                "label": stage.label,
+                "thread": threading.get_native_id(),
+                "inputs": [_shape(a) for a in args],
+            }
+            io_before = _io_counters()
+            rss_before = _current_rss()
+            mem_before = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+            profiler = None
+            if self.profile_dir is not None:
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                except ValueError:  # άλλος profiler ενεργός σε αυτό το thread
+                    profiler = None
+
+            cpu0 = time.thread_time()
+            children0 = _children_cpu()
+            t0 = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                record["status"] = "ok"
+                return result
+            except BaseException as exc:
+                record["status"] = f"error: {type(exc).__name__}"
+                result = None
+                raise
+            finally:
+                t1 = time.perf_counter()
+                record["cpu_s"] = time.thread_time() - cpu0
+                children1 = _children_cpu()
+                if children0 is not None and children1 is not None:
+                    record["children_cpu_s"] = children1 - children0
+                if profiler is not None:
+                    profiler.disable()
+                    self.profile_dir.mkdir(parents=True, exist_ok=True)
+                    profile_path = self.profile_dir / f"{stage.name}.prof"
+                    profiler.dump_stats(profile_path)
+                    record["profile"] = str(profile_path)
+                record["start_s"] = t0 - self._t0
+                record["wall_s"] = t1 - t0
+                record["output"] = _shape(result)
+                record["rss_before"] = rss_before
+                record["rss_after"] = _current_rss()
+                record["peak_rss"] = _peak_rss()
+                if mem_before is not None and tracemalloc.is_tracing():
+                    current, peak = tracemalloc.get_traced_memory()
+                    record["tracemalloc_delta"] = current - mem_before[0]
+                    record["tracemalloc_peak"] = peak
+                io_after = _io_counters()
+                for scope, prefix in (("thread", "bytes"), ("process", "process_bytes")):
+                    before, after = io_before[scope], io_after[scope]
+                    if before is not None and after is not None:
+                        record[f"{prefix}_read"] = after["read"] - before["read"]
+                        record[f"{prefix}_written"] = after["written"] - before["written"]
+                with self._lock:
+                    self.records.append(record)
+                workers_cpu = record.get("children_cpu_s")
+                print(f"  ✔ {stage.label}: {record['wall_s']:.2f}s wall, "
+                      f"{record['cpu_s']:.2f}s CPU (thread)"
+                      + (f" + {workers_cpu:.2f}s CPU (workers)" if workers_cpu else ""))
+
+        return instrumented
+
+    # ---------------- έξοδοι ---------------- #
+
+    def chrome_trace(self) -> dict:
+        """Chrome trace event format (complete events, μs)."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid,
+                   "args": {"name": "controller_scenario2"}}]
+        events.append({"name": "field_scopes", "ph": "M", "pid": pid,
+                       "args": FIELD_SCOPES})
+        for r in sorted(self.records, key=lambda r: r["start_s"]):
+            args = {k: v for k, v in r.items()
+                    if k not in ("stage", "label", "thread", "start_s", "wall_s")}
+            events.append({
+                "name": r["stage"],
+                "cat": "stage",
+                "ph": "X",
+                "ts": r["start_s"] * 1e6,
+                "dur": r["wall_s"] * 1e6,
+                "pid": pid,
+                "tid": r["thread"],
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, outdir: Path) -> Dict[str, Path]:
+        """Γράφει stages.json και trace.json στον outdir."""
+        outdir = Path(outdir)
+        outdir.mkdir(parents=True, exist_ok=True)
+        log = {
+            "total_wall_s": time.perf_counter() - self._t0,
+            "field_scopes": FIELD_SCOPES,
+            "stages": sorted(self.records, key=lambda r: r["start_s"]),
+        }
+        paths = {"log": outdir / "stages.json", "trace": outdir / "trace.json"}
+        paths["log"].write_text(json.dumps(log, indent=2, ensure_ascii=False),
+                                encoding="utf-8")
+        paths["trace"].write_text(json.dumps(self.chrome_trace(), ensure_ascii=False),
+                                  encoding="utf-8")
+        print(f"📈 Instrumentation: {paths['log']} | {paths['trace']}")
+        return paths
@@ -5,18 +5,24 @@
 Process – merge_and_compute_per_capita
 
 Κάνει:
-- mapping Σταθμός -> Δημοτική Κοινότητα
+- αντιστοίχιση Σταθμός -> Δημοτική Κοινότητα μέσω πίνακα βαρών
+  (περιοχές × σταθμοί, βλ. spatial_assignment)
 - merge env & demo δεδομένων
 - υπολογισμό "Ρύποι ανά κάτοικο"
 """
 
+from typing import Optional
 import pandas as pd
 
+from schema_registry import mean_column
+from spatial_assignment import weights_from_mapping, weights_to_mapping_frame
+
 
 def merge_and_compute_per_capita(
     env_df: pd.DataFrame,
     demo_df: pd.DataFrame,
-    station_to_area_admin: dict
+    station_to_area_admin: Optional[dict] = None,
+    weights: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """
     Public function (ίδιο όνομα με το αρχικό script).
@@ -27,19 +33,42 @@ def merge_and_compute_per_capita(
         Μέσοι ρύποι ανά σταθμό.
     demo_df : DataFrame
         Πληθυσμός ανά Δημοτική Κοινότητα.
-    station_to_area_admin : dict
-        Mapping Σταθμός -> Δημοτική Κοινότητα.
+    station_to_area_admin : dict, optional
+        Στατικό mapping Σταθμός -> Δημοτική Κοινότητα (βάρος 1).
+    weights : DataFrame, optional
+        Πίνακας βαρών (index: Δημοτική Κοινότητα, columns: Σταθμός)·
+        προηγείται του station_to_area_admin.
 
     Returns
     -------
     DataFrame
-        Συγχωνευμένος πίνακας με "Ρύποι ανά κάτοικο".
+        Συγχωνευμένος πίνακας με "Βάρος" και "Ρύποι ανά κάτοικο"
+        (Βάρος × μέσος / πληθυσμός), μία γραμμή ανά ζεύγος
+        σταθμού-περιοχής με μη μηδενικό βάρος.
     """
+    if weights is None:
+        if station_to_area_admin is None:
+            raise ValueError("Χρειάζεται station_to_area_admin ή weights")
+        weights = weights_from_mapping(station_to_area_admin)
+
     env_df = env_df.copy()
-    env_df["Δημοτική Κοινότητα"] = env_df["Σταθμός"].map(station_to_area_admin)
+    stations = env_df["Σταθμός"].astype("category")
+    env_df["Σταθμός"] = stations
+    pairs = weights_to_mapping_frame(weights)
+    pairs["Σταθμός"] = pairs["Σταθμός"].astype("object").astype(stations.dtype)
+    env_df = env_df.merge(pairs.dropna(subset=["Σταθμός"]), on="Σταθμός", how="left")
+
+    # Κοινές κατηγορίες και στις δύο πλευρές -> join στους ακέραιους κωδικούς
+    districts = pd.CategoricalDtype(sorted(
+        set(weights.index) | set(demo_df["Δημοτική Κοινότητα"].dropna())
+    ))
+    env_df["Δημοτική Κοινότητα"] = env_df["Δημοτική Κοινότητα"].astype("object").astype(districts)
+    demo_df = demo_df.assign(**{
+        "Δημοτική Κοινότητα": demo_df["Δημοτική Κοινότητα"].astype("object").astype(districts)
+    })
 
     merged = env_df.merge(demo_df, on="Δημοτική Κοινότητα", how="left")
     merged["Ρύποι ανά κάτοικο"] = (
-        merged["Μέσος Όρος 2010–2013"] / merged["Πληθυσμός"]
+        merged["Βάρος"] * merged[mean_column(merged.columns)] / merged["Πληθυσμός"]
     )
     return merged
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Memoization των εξόδων (γραφήματα, Excel / Parquet / CSV) με hash περιεχομένου
+
+- Κάθε artifact έχει digest = hash του ακριβούς κομματιού δεδομένων που
+  το παράγει + των παραμέτρων απόδοσης (όρια, dpi, ετικέτες, format)
+- Το manifest (JSON στον φάκελο εξόδων) κρατά ανά ομάδα artifacts
+  (π.χ. "charts:png", "export:xlsx") το digest, το μέγεθος και το mtime
+  κάθε αρχείου· αν ταιριάζουν όλα, η εγγραφή παραλείπεται
+- Artifacts που δεν παράγονται πια από την ομάδα τους (π.χ. ρύπος ή
+  πίνακας που χάθηκε) διαγράφονται από τον δίσκο
+
+Κάθε stage ενημερώνει μόνο τη δική του ομάδα (ξαναδιαβάζοντας το
+manifest υπό lock), οπότε export & γραφήματα τρέχουν παράλληλα χωρίς
+να χάνει το ένα τις εγγραφές του άλλου.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+import pandas as pd
+
+MANIFEST_VERSION = 1
+
+# Ένα lock ανά αρχείο manifest (κοινό για όλα τα instances της διεργασίας)
+_LOCKS: Dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(str(Path(path).resolve()), threading.Lock())
+
+
+def value_digest(*parts) -> str:
+    """SHA-256 απλών δομών (dict / list / αριθμοί / strings) σε κανονική μορφή JSON."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """SHA-256 ενός DataFrame: στήλες, dtypes και τιμές (χωρίς το index)."""
+    h = hashlib.sha256()
+    h.update(value_digest([str(c) for c in df.columns],
+                          [str(t) for t in df.dtypes]).encode("ascii"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class OutputManifest:
+    """
+    Manifest των artifacts ενός φακέλου εξόδων.
+
+    Parameters
+    ----------
+    path : Path
+        Αρχείο JSON του manifest· τα artifacts καταγράφονται με path
+        σχετικό προς τον φάκελό του.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.root = self.path.parent
+        self.groups: Dict[str, Dict[str, dict]] = self._read()
+        self.skipped = 0
+
+    def _read(self) -> Dict[str, Dict[str, dict]]:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("groups", {})
+
+    def _name(self, artifact: Path) -> str:
+        return os.path.relpath(Path(artifact), self.root)
+
+    # ---------------- έλεγχος / καταγραφή ---------------- #
+
+    def fresh(self, group: str, artifact: Path, digest: str) -> bool:
+        """True αν το αρχείο υπάρχει αμετάβλητο με το ίδιο digest."""
+        entry = self.groups.get(group, {}).get(self._name(artifact))
+        if entry is None or entry["digest"] != digest:
+            return False
+        try:
+            st = os.stat(artifact)
+        except OSError:
+            return False
+        return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+
+    def commit(self,
+               group: str,
+               artifacts: Dict[Path, str],
+               evict: bool = True) -> List[Path]:
+        """
+        Καταγράφει τα artifacts {path: digest} της ομάδας (μετά την εγγραφή
+        τους). Με evict=True η ομάδα αντικαθίσταται και ό,τι δεν περιέχεται
+        πια διαγράφεται από τον δίσκο· αλλιώς οι εγγραφές προστίθενται.
+
+        Returns
+        -------
+        list[Path]
+            Τα artifacts που διαγράφηκαν.
+        """
+        entries = {}
+        for artifact, digest in artifacts.items():
+            st = os.stat(artifact)
+            entries[self._name(artifact)] = {
+                "digest": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            }
+
+        evicted = []
+        with _lock_for(self.path):
+            groups = self._read()
+            old = groups.get(group, {})
+            if evict:
+                for name in old.keys() - entries.keys():
+                    stale = self.root / name
+                    if stale.exists():
+                        stale.unlink()
+                        evicted.append(stale)
+                groups[group] = entries
+            else:
+                groups[group] = {**old, **entries}
+            self._write(groups)
+            self.groups = groups
+
+        for stale in evicted:
+            print(f"🗑 Διαγραφή παλιού artifact: {stale}")
+        return evicted
+
+    def _write(self, groups: Dict[str, Dict[str, dict]]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": MANIFEST_VERSION, "groups": groups}, fh,
+                      ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def report_skipped(self, artifacts: Iterable[Path]) -> None:
+        for artifact in artifacts:
+            self.skipped += 1
+            print(f"⏭ Αμετάβλητο (παράλειψη): {artifact}")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Partitioned αρχείο μετρήσεων (Hive layout) με predicate pushdown
+
+Layout (Parquet, ένα αρχείο ανά partition):
+    <root>/city=<πόλη>/station=<σταθμός>/year=<έτος>/data.parquet
+με τιμές partition URL-encoded (ελληνικά, κενά, τελείες). Κάθε αρχείο
+έχει Ρύπος, Ρύπος_raw, Ημερομηνία, Τιμή, ταξινομημένα κατά ρύπο και
+ημερομηνία, σε μικρά row groups.
+
+Ερωτήματα (scan):
+- πόλη / σταθμός / έτος -> pruning καταλόγων (διαβάζονται μόνο τα
+  αρχεία των partitions που ταιριάζουν)
+- ρύπος / ημερομηνίες -> φίλτρο pyarrow.dataset· τα row groups
+  παραλείπονται με βάση τα min/max statistics τους
+
+Το ingest ξαναγράφει ατομικά (tmp + os.replace) μόνο τα partitions
+(πόλη, σταθμός, έτος) που περιέχονται στις νέες μετρήσεις, οπότε το
+αρχείο μεγαλώνει σταδιακά με νέες πόλεις και έτη.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import quote, unquote
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - προαιρετική εξάρτηση
+    pa = ds = pq = None
+
+from aggregate_and_compute_mean_pollutant_levels import _read_pollution_sheets, _to_long_format
+from data_model import MeasurementModel
+from schema_registry import mean_label
+
+PARTITION_FILE = "data.parquet"
+ROW_GROUP_ROWS = 8_760  # ένα έτος ωριαίων τιμών ενός ρύπου
+PARTITION_KEYS = ("city", "station", "year")
+
+
+class Partition(NamedTuple):
+    city: str
+    station: str
+    year: int
+    path: Path
+
+
+def _segment(key: str, value) -> str:
+    return f"{key}={quote(str(value), safe='')}"
+
+
+def _parse_segment(name: str, key: str) -> Optional[str]:
+    prefix = f"{key}="
+    return unquote(name[len(prefix):]) if name.startswith(prefix) else None
+
+
+def _year(bound: Optional[str]) -> Optional[int]:
+    return None if bound is None else pd.Timestamp(str(bound)).year
+
+
+class PartitionedStore:
+    """
+    Hive-partitioned (πόλη/σταθμός/έτος) Parquet αρχείο μετρήσεων.
+
+    Parameters
+    ----------
+    root : Path
+        Ριζικός φάκελος του αρχείου.
+    """
+
+    def __init__(self, root: Path):
+        if pq is None:
+            raise ImportError("Το partitioned store χρειάζεται pyarrow")
+        self.root = Path(root)
+
+    # ---------------- ingest ---------------- #
+
+    def write_long(self, city: str, long: pd.DataFrame) -> List[Partition]:
+        """
+        Γράφει long frame (Σταθμός, Ρύπος, Ρύπος_raw, Ημερομηνία, Τιμή)
+        της πόλης· κάθε (σταθμός, έτος) αντικαθιστά ολόκληρο το partition του.
+        """
+        long = long.assign(_year=long["Ημερομηνία"].dt.year)
+        written = []
+        for (station, year), part in long.groupby(["Σταθμός", "_year"], sort=True,
+                                                  observed=True):
+            path = (self.root / _segment("city", city) / _segment("station", station)
+                    / _segment("year", int(year)) / PARTITION_FILE)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            part = part.sort_values(["Ρύπος", "Ημερομηνία"], kind="stable")
+            table = pa.table({
+                "Ρύπος": part["Ρύπος"].astype(str).to_numpy(),
+                "Ρύπος_raw": part["Ρύπος_raw"].astype(str).to_numpy(),
+                "Ημερομηνία": part["Ημερομηνία"].to_numpy(dtype="datetime64[ns]"),
+                "Τιμή": part["Τιμή"].to_numpy(dtype="float32"),
+            })
+            tmp = path.with_suffix(".parquet.tmp")
+            pq.write_table(table, tmp, row_group_size=ROW_GROUP_ROWS,
+                           use_dictionary=["Ρύπος", "Ρύπος_raw"], write_statistics=True)
+            os.replace(tmp, path)
+            written.append(Partition(city, str(station), int(year), path))
+        return written
+
+    def ingest(self,
+               city: str,
+               pollution_path: Path,
+               station_sheets: List[str],
+               cache=None,
+               workers: int = 1) -> List[Partition]:
+        """Φύλλα σταθμών ενός workbook -> partitions της πόλης."""
+        pollution_dfs = _read_pollution_sheets(pollution_path, station_sheets,
+                                               measurements_only=True,
+                                               cache=cache, workers=workers)
+        written = self.write_long(city, _to_long_format(pollution_dfs, keep_raw=True))
+        size = sum(p.path.stat().st_size for p in written)
+        print(f"📥 Ingest {city}: {len(written)} partitions ({size / 1024:.0f} KB) "
+              f"στο {self.root}")
+        return written
+
+    # ---------------- pruning / scan ---------------- #
+
+    def partitions(self,
+                   cities: Optional[Iterable[str]] = None,
+                   stations: Optional[Iterable[str]] = None,
+                   start: Optional[str] = None,
+                   end: Optional[str] = None) -> List[Partition]:
+        """
+        Partitions που ταιριάζουν· οι κατάλογοι πόλεων/σταθμών που δεν
+        ζητούνται δεν διασχίζονται καν.
+        """
+        cities = None if cities is None else set(cities)
+        stations = None if stations is None else set(stations)
+        lo, hi = _year(start), _year(end)
+        if not self.root.exists():
+            return []
+
+        out = []
+        for city_dir in sorted(self.root.iterdir()):
+            city = _parse_segment(city_dir.name, "city")
+            if city is None or (cities is not None and city not in cities):
+                continue
+            for station_dir in sorted(city_dir.iterdir()):
+                station = _parse_segment(station_dir.name, "station")
+                if station is None or (stations is not None and station not in stations):
+                    continue
+                for year_dir in sorted(station_dir.iterdir()):
+                    year = _parse_segment(year_dir.name, "year")
+                    if year is None:
+                        continue
+                    year = int(year)
+                    if (lo is not None and year < lo) or (hi is not None and year > hi):
+                        continue
+                    path = year_dir / PARTITION_FILE
+                    if path.exists():
+                        out.append(Partition(city, station, year, path))
+        return out
+
+    def scan(self,
+             cities: Optional[Iterable[str]] = None,
+             stations: Optional[Iterable[str]] = None,
+             pollutants: Optional[Iterable[str]] = None,
+             start: Optional[str] = None,
+             end: Optional[str] = None) -> pd.DataFrame:
+        """
+        Long frame (Πόλη, Σταθμός, Ρύπος, Ρύπος_raw, Ημερομηνία, Τιμή) για
+        το ερώτημα. start/end: ημερομηνίες ("2012", "2012-06", "2012-06-15"),
+        inclusive· το end "2012" σημαίνει έως το τέλος του 2012.
+        """
+        selected = self.partitions(cities, stations, start, end)
+        total = len(self.partitions())
+        print(f"🔎 Partitions: {len(selected)}/{total} αρχεία")
+
+        columns = ["Πόλη", "Σταθμός", "Ρύπος", "Ρύπος_raw", "Ημερομηνία", "Τιμή"]
+        if not selected:
+            return pd.DataFrame({c: pd.Series(dtype="float32" if c == "Τιμή" else "object")
+                                 for c in columns})
+
+        expr = None
+        if pollutants is not None:
+            expr = ds.field("Ρύπος").isin(list(pollutants))
+        if start is not None:
+            lo = ds.field("Ημερομηνία") >= pa.scalar(pd.Timestamp(str(start)), pa.timestamp("ns"))
+            expr = lo if expr is None else expr & lo
+        if end is not None:
+            stop = pd.Period(str(end)).end_time
+            hi = ds.field("Ημερομηνία") <= pa.scalar(stop, pa.timestamp("ns"))
+            expr = hi if expr is None else expr & hi
+
+        frames = []
+        for part in selected:
+            table = ds.dataset(str(part.path), format="parquet").to_table(filter=expr)
+            if table.num_rows == 0:
+                continue
+            df = table.to_pandas()
+            df.insert(0, "Σταθμός", part.station)
+            df.insert(0, "Πόλη", part.city)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame({c: pd.Series(dtype="float32" if c == "Τιμή" else "object")
+                                 for c in columns})
+
+        out = pd.concat(frames, ignore_index=True)[columns]
+        for col in ("Πόλη", "Σταθμός", "Ρύπος", "Ρύπος_raw"):
+            out[col] = out[col].astype("category")
+        out["Τιμή"] = out["Τιμή"].astype("float32")
+        return out
+
+    def summary(self) -> pd.DataFrame:
+        """Partitions του αρχείου: πόλη, σταθμός, έτος, μέγεθος, γραμμές."""
+        rows = [(p.city, p.station, p.year, p.path.stat().st_size,
+                 pq.ParquetFile(p.path).metadata.num_rows)
+                for p in self.partitions()]
+        return pd.DataFrame(rows, columns=["Πόλη", "Σταθμός", "Έτος", "Bytes", "Γραμμές"])
+
+
+# ---------------- είσοδοι των processes ---------------- #
+
+def scan_store(root: Path, **query) -> pd.DataFrame:
+    return PartitionedStore(root).scan(**query)
+
+
+def means_frame(long: pd.DataFrame,
+                value_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Μέσοι ανά πόλη/σταθμό/ρύπο από το scan, στο σχήμα του Process #1
+    (Ρύπος_raw, Μέσος Όρος <περίοδος>, Ρύπος, Σταθμός, Πόλη). Η περίοδος
+    της στήλης είναι τα έτη που κάλυψε το ερώτημα (βλ. mean_label).
+    """
+    if value_col is None:
+        value_col = mean_label(long["Ημερομηνία"].min(), long["Ημερομηνία"].max())
+    grouped = (
+        long.assign(Τιμή=long["Τιμή"].astype("float64"))
+        .groupby(["Πόλη", "Σταθμός", "Ρύπος_raw"], sort=False, observed=True)
+        .agg(**{value_col: ("Τιμή", "mean"), "Ρύπος": ("Ρύπος", "first")})
+        .reset_index()
+    )
+    out = grouped[["Ρύπος_raw", value_col, "Ρύπος", "Σταθμός", "Πόλη"]]
+    for col in ("Ρύπος_raw", "Ρύπος", "Σταθμός", "Πόλη"):
+        out[col] = out[col].astype(str).astype("category")
+    return out
+
+
+def model_from_scan(long: pd.DataFrame) -> MeasurementModel:
+    return MeasurementModel.from_long(long)
+
+
+def ingest_cities(root: Path,
+                  cities: Dict[str, dict],
+                  names: Optional[Iterable[str]] = None,
+                  cache=None,
+                  workers: int = 1) -> Dict[str, List[Partition]]:
+    """Ingest των workbooks όλων (ή των επιλεγμένων) πόλεων."""
+    store = PartitionedStore(root)
+    names = list(cities) if names is None else list(names)
+    unknown = [n for n in names if n not in cities]
+    if unknown:
+        raise ValueError(f"Άγνωστες πόλεις: {unknown} (επιλογές: {list(cities)})")
+    return {name: store.ingest(name, cities[name]["pollution"], cities[name]["sheets"],
+                               cache=cache, workers=workers)
+            for name in names}
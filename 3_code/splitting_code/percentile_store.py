@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persisted mergeable στατιστικά (KLL sketches) για εκατοστημόρια
+
+Από τις μετρήσεις χτίζεται ένα RunningStats (πλήθος, άθροισμα, min, max,
+KLL sketch – βλ. streaming_ingestion / quantile_sketch) ανά
+σταθμό × ρύπο × μήνα: από το MeasurementModel (from_model) ή από τα
+chunks της ανάγνωσης / νέων γραμμών (from_chunks). Ο μήνας είναι ο βασικός "κόκκος": έτη, αυθαίρετα
+χρονικά διαστήματα, ομάδες σταθμών και Δημοτικές Κοινότητες προκύπτουν
+με merge των sketches, χωρίς πρόσβαση στις αρχικές μετρήσεις.
+
+Το store αποθηκεύεται σε JSON δίπλα στην κατάσταση συσσώρευσης των
+μέσων (.cache), οπότε ερωτήματα εκατοστημορίων (διάμεσος, P90.4, P99.8)
+απαντώνται χωρίς parsing ή ταξινόμηση των δεδομένων. Τα incremental
+updates συγχωνεύουν (merge) στο ίδιο store τα sketches των νέων γραμμών·
+το source (hash του μοντέλου από το οποίο χτίστηκε) δείχνει πότε το
+store πρέπει να ξαναχτιστεί επειδή άλλαξαν οι ίδιες οι μετρήσεις.
+
+Σημ.: τα sketches δεν σταθμίζονται· για Δημοτική Κοινότητα συγχωνεύονται
+οι σταθμοί με μη μηδενικό βάρος στον πίνακα βαρών.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from aggregate_and_compute_mean_pollutant_levels import _to_long_format
+from data_model import MeasurementModel
+from output_manifest import frame_digest, value_digest
+from quantile_sketch import DEFAULT_K
+from streaming_ingestion import DEFAULT_QUANTILES, RunningStats
+
+STORE_VERSION = 1
+STORE_PERIODS = ("monthly", "annual", "overall")
+
+Key = Tuple[str, str, str]  # (σταθμός, ρύπος, μήνας "YYYY-MM")
+
+
+def _last_month(end: str) -> pd.Period:
+    """"2012" -> 2012-12, "2012-06" -> 2012-06."""
+    return pd.Period(f"{end}-12" if len(end) == 4 else end, freq="M")
+
+
+def model_digest(model: MeasurementModel) -> str:
+    """Hash των μετρήσεων & διαστάσεων ενός μοντέλου (πηγή του store)."""
+    return value_digest(frame_digest(model.facts), frame_digest(model.stations),
+                        frame_digest(model.pollutants))
+
+
+def _quantile_columns(quantiles: Sequence[float]) -> List[str]:
+    return [f"P{q * 100:g}" for q in quantiles]
+
+
+class SketchStore:
+    """
+    RunningStats ανά (σταθμό, ρύπο, μήνα), mergeable και persisted.
+
+    Parameters
+    ----------
+    k : int
+        Παράμετρος ακρίβειας των KLL sketches.
+    """
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.stats: Dict[Key, RunningStats] = {}
+        self.source: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    # ---------------- κατασκευή ---------------- #
+
+    @classmethod
+    def from_model(cls, model: MeasurementModel, k: int = DEFAULT_K) -> "SketchStore":
+        """
+        Ένα πέρασμα πάνω στις μετρήσεις: ταξινόμηση με βάση ενιαίο ακέραιο
+        κλειδί (σταθμός, ρύπος, μήνας) και batch update ανά ομάδα.
+        """
+        store = cls(k=k)
+        store.source = model_digest(model)
+        facts = model.facts.dropna(subset=["Τιμή"])
+        if facts.empty:
+            return store
+
+        s = facts["station_id"].to_numpy(dtype="int64")
+        p = facts["pollutant_id"].to_numpy(dtype="int64")
+        t, months = pd.factorize(facts["Ημερομηνία"].dt.to_period("M"), sort=True)
+        values = facts["Τιμή"].to_numpy(dtype="float64")
+        valid = (s >= 0) & (p >= 0) & (t >= 0)
+        s, p, t, values = s[valid], p[valid], t[valid], values[valid]
+
+        n_p, n_t = len(model.pollutants), len(months)
+        flat = (s * n_p + p) * n_t + t
+        order = np.argsort(flat, kind="stable")
+        flat, values = flat[order], values[order]
+        starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+
+        station_names = model.stations["Σταθμός"].astype(str).to_numpy()
+        pollutant_names = model.pollutants["Ρύπος"].astype(str).to_numpy()
+        month_names = months.astype(str)
+        for key, chunk in zip(flat[starts], np.split(values, starts[1:])):
+            sp, month = divmod(int(key), n_t)
+            station, pollutant = divmod(sp, n_p)
+            stats = RunningStats(k=k)
+            stats.update(chunk)
+            store.stats[(station_names[station], pollutant_names[pollutant],
+                         month_names[month])] = stats
+        return store
+
+    @classmethod
+    def from_chunks(cls,
+                    chunks: Iterable[Tuple[str, pd.DataFrame]],
+                    k: int = DEFAULT_K) -> "SketchStore":
+        """Από chunks (σταθμός, γραμμές φύλλου), π.χ. τις νέες γραμμές ενός update."""
+        frames = [chunk.assign(_sheet=station) for station, chunk in chunks if len(chunk)]
+        if not frames:
+            return cls(k=k)
+        store = cls.from_model(MeasurementModel.from_long(_to_long_format(frames)), k=k)
+        store.source = None
+        return store
+
+    def merge(self, other: "SketchStore") -> "SketchStore":
+        """Συγχωνεύει το other (π.χ. νέες μετρήσεις) σε αυτό το store."""
+        for key, stats in other.stats.items():
+            if key in self.stats:
+                self.stats[key].merge(stats)
+            else:
+                self.stats[key] = RunningStats(k=self.k).merge(stats)
+        return self
+
+    # ---------------- ερωτήματα ---------------- #
+
+    def select(self,
+               stations: Optional[Iterable[str]] = None,
+               pollutants: Optional[Iterable[str]] = None,
+               start: Optional[str] = None,
+               end: Optional[str] = None) -> List[Key]:
+        """Κλειδιά που ταιριάζουν· start/end ως "YYYY" ή "YYYY-MM" (inclusive)."""
+        stations = None if stations is None else set(stations)
+        pollutants = None if pollutants is None else set(pollutants)
+        lo = None if start is None else str(pd.Period(str(start), freq="M"))
+        hi = None if end is None else str(_last_month(str(end)))
+        return [
+            key for key in self.stats
+            if (stations is None or key[0] in stations)
+            and (pollutants is None or key[1] in pollutants)
+            and (lo is None or key[2] >= lo)
+            and (hi is None or key[2] <= hi)
+        ]
+
+    def combine(self, keys: Iterable[Key]) -> RunningStats:
+        """Νέο RunningStats από τη συγχώνευση των κλειδιών (το store δεν αλλάζει)."""
+        out = RunningStats(k=self.k)
+        for key in keys:
+            out.merge(self.stats[key])
+        return out
+
+    def percentiles(self,
+                    period: str = "annual",
+                    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                    groups: Optional[Dict[str, Sequence[str]]] = None,
+                    group_name: str = "Σταθμός",
+                    stations: Optional[Iterable[str]] = None,
+                    pollutants: Optional[Iterable[str]] = None,
+                    start: Optional[str] = None,
+                    end: Optional[str] = None) -> pd.DataFrame:
+        """
+        Πλήθος, μέσος, min/max και εκατοστημόρια ανά ομάδα × ρύπο × περίοδο.
+
+        Parameters
+        ----------
+        period : {"monthly", "annual", "overall"}
+            Χρονική ανάλυση (overall: ένα σύνολο για όλο το διάστημα).
+        groups : dict, optional
+            {όνομα ομάδας: σταθμοί} (π.χ. Δημοτική Κοινότητα -> σταθμοί)·
+            None -> κάθε σταθμός χωριστά.
+        group_name : str
+            Όνομα στήλης της ομάδας.
+        """
+        if period not in STORE_PERIODS:
+            raise ValueError(f"Άγνωστη περίοδος: {period!r} (επιλογές: {list(STORE_PERIODS)})")
+        keys = self.select(stations, pollutants, start, end)
+        if groups is None:
+            membership = {st: [st] for st in dict.fromkeys(k[0] for k in keys)}
+        else:
+            membership: Dict[str, List[str]] = {}
+            for group, members in groups.items():
+                for st in members:
+                    membership.setdefault(st, []).append(group)
+
+        months = sorted({k[2] for k in keys})
+        first, last = (months[0][:4], months[-1][:4]) if months else ("", "")
+        overall = first if first == last else f"{first}–{last}"
+        buckets: Dict[Tuple[str, str, str], List[Key]] = {}
+        for key in keys:
+            station, pollutant, month = key
+            label = {"monthly": month, "annual": month[:4], "overall": overall}[period]
+            for group in membership.get(station, ()):
+                buckets.setdefault((group, pollutant, label), []).append(key)
+
+        columns = [group_name, "Ρύπος", "Περίοδος", "Πλήθος", "Μέσος Όρος",
+                   "Ελάχιστο", "Μέγιστο", *_quantile_columns(quantiles)]
+        rows = []
+        for (group, pollutant, label), bucket in sorted(buckets.items()):
+            stats = self.combine(bucket)
+            rows.append([group, pollutant, label, stats.count, stats.mean,
+                         stats.minimum if stats.count else np.nan,
+                         stats.maximum if stats.count else np.nan,
+                         *stats.sketch.quantiles(quantiles)])
+        out = pd.DataFrame(rows, columns=columns)
+        for col in (group_name, "Ρύπος", "Περίοδος"):
+            out[col] = out[col].astype("category")
+        return out
+
+    def district_percentiles(self,
+                             weights: pd.DataFrame,
+                             period: str = "annual",
+                             quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                             **kwargs) -> pd.DataFrame:
+        """Ανά Δημοτική Κοινότητα: σταθμοί με μη μηδενικό βάρος (βλ. spatial_assignment)."""
+        groups = {
+            area: list(row.index[row.to_numpy() > 0])
+            for area, row in weights.iterrows()
+        }
+        return self.percentiles(period, quantiles, groups=groups,
+                                group_name="Δημοτική Κοινότητα", **kwargs)
+
+    # ---------------- persistence ---------------- #
+
+    def to_dict(self) -> dict:
+        return {
+            "version": STORE_VERSION,
+            "k": self.k,
+            "source": self.source,
+            "stats": [
+                {"station": station, "pollutant": pollutant, "month": month, **s.to_dict()}
+                for (station, pollutant, month), s in self.stats.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SketchStore":
+        if data.get("version") != STORE_VERSION:
+            raise ValueError(f"Μη συμβατή έκδοση store: {data.get('version')}")
+        store = cls(k=data["k"])
+        store.source = data.get("source")
+        for entry in data["stats"]:
+            key = (entry["station"], entry["pollutant"], entry["month"])
+            store.stats[key] = RunningStats.from_dict(entry)
+        return store
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, ensure_ascii=False)
+        os.replace(tmp, path)
+        print(f"🧮 Sketches εκατοστημορίων: {path} ({len(self)} σταθμοί × ρύποι × μήνες)")
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "SketchStore":
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
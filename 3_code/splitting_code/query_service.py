@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Τοπική υπηρεσία ερωτημάτων (asyncio HTTP) πάνω στα υπολογισμένα aggregates
+
+- Οι πίνακες (έλεγχος ορίων, έκθεση ανά Δημοτική Κοινότητα/έτος,
+  υπερβάσεις, …) φορτώνονται μία φορά από έναν loader και μένουν στη
+  μνήμη ως snapshot με αριθμό έκδοσης
+- GET /query/<πίνακας>?district=…&pollutant=PM10&period=2012 -> JSON·
+  φίλτρα ισότητας (τιμές χωρισμένες με κόμμα), fields=…, limit=…
+- Bounded LRU cache των έτοιμων (encoded) απαντήσεων ανά έκδοση
+- Watcher στο παρασκήνιο: όταν αλλάξει το περιεχόμενο των αρχείων
+  εισόδου (hash, βλ. input_cache.file_digest), ο loader ξανατρέχει σε
+  thread και το νέο snapshot αντικαθιστά ατομικά το παλιό· μέχρι τότε
+  τα ερωτήματα απαντώνται από το παλιό
+
+Μόνο standard library (asyncio streams, HTTP/1.1 με Connection: close).
+Το QueryService.handle δεν χρειάζεται socket, οπότε η υπηρεσία
+δοκιμάζεται με έναν loader-stand-in που επιστρέφει μικρά DataFrames.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+import pandas as pd
+
+from input_cache import file_digest
+
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_POLL_SECONDS = 2.0
+
+# Λατινικά ονόματα παραμέτρων -> στήλες (δεκτά και τα ελληνικά ονόματα)
+COLUMN_ALIASES = {
+    "city": "Πόλη",
+    "district": "Δημοτική Κοινότητα",
+    "station": "Σταθμός",
+    "pollutant": "Ρύπος",
+    "period": "Περίοδος",
+    "year": "Έτος",
+    "status": "Κατάσταση",
+}
+_RESERVED = ("fields", "limit")
+
+Response = Tuple[int, bytes]
+
+
+class QueryError(ValueError):
+    """Λάθος ερώτημα (HTTP 400 / 404)."""
+
+    def __init__(self, message: str, status: int = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+class ResultCache:
+    """LRU cache με όριο πλήθους εγγραφών."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: bytes) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses}
+
+
+def query_table(df: pd.DataFrame, params: Dict[str, List[str]]) -> pd.DataFrame:
+    """Φίλτρα ισότητας (OR μέσα σε μία παράμετρο, AND μεταξύ τους), fields, limit."""
+    mask = pd.Series(True, index=df.index)
+    for key, values in params.items():
+        if key in _RESERVED:
+            continue
+        column = COLUMN_ALIASES.get(key, key)
+        if column not in df.columns:
+            raise QueryError(f"Άγνωστη στήλη: {key!r}")
+        wanted = [v for value in values for v in value.split(",")]
+        mask &= df[column].astype(str).isin(wanted)
+    out = df[mask]
+
+    if "fields" in params:
+        # Διπλά ονόματα (fields=Τιμή,Τιμή) μία φορά, με τη σειρά της πρώτης εμφάνισης
+        fields = list(dict.fromkeys(
+            COLUMN_ALIASES.get(f, f) for v in params["fields"] for f in v.split(",")))
+        unknown = [f for f in fields if f not in out.columns]
+        if unknown:
+            raise QueryError(f"Άγνωστες στήλες: {unknown}")
+        out = out[fields]
+    if "limit" in params:
+        try:
+            out = out.head(int(params["limit"][-1]))
+        except ValueError:
+            raise QueryError("Το limit πρέπει να είναι ακέραιος") from None
+    return out
+
+
+def _json(payload: dict) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+
+class QueryService:
+    """
+    Parameters
+    ----------
+    loader : callable
+        () -> {όνομα πίνακα: DataFrame}· τρέχει στην αρχή και σε κάθε
+        αλλαγή εισόδων (σε thread, εκτός event loop).
+    inputs : callable, optional
+        () -> αρχεία εισόδου που παρακολουθούνται (ξανακαλείται σε κάθε
+        έλεγχο, οπότε νέα αρχεία εντοπίζονται).
+    cache_entries : int
+        Μέγεθος του LRU cache απαντήσεων.
+    poll_seconds : float
+        Διάστημα ελέγχου των αρχείων εισόδου.
+    """
+
+    def __init__(self,
+                 loader: Callable[[], Dict[str, pd.DataFrame]],
+                 inputs: Optional[Callable[[], Iterable[Path]]] = None,
+                 cache_entries: int = DEFAULT_CACHE_ENTRIES,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS):
+        self.loader = loader
+        self.inputs = inputs or (lambda: ())
+        self.cache = ResultCache(cache_entries)
+        self.poll_seconds = poll_seconds
+        self.tables: Dict[str, pd.DataFrame] = {}
+        self.version = 0
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.computing = False
+        self._pending = False
+        self.last_error: Optional[str] = None
+        self._stats: Dict[str, tuple] = {}
+        self._digests: Dict[str, str] = {}
+
+    # ---------------- snapshot ---------------- #
+
+    def _swap(self, tables: Dict[str, pd.DataFrame], seconds: float) -> None:
+        self.tables = tables
+        self.version += 1
+        self.loaded_at = time.time()
+        self.load_seconds = seconds
+        self.cache.clear()
+        print(f"🗂 Snapshot v{self.version}: {len(tables)} πίνακες ({seconds:.2f}s)")
+
+    def load(self) -> None:
+        """Σύγχρονη (αρχική) φόρτωση."""
+        self._changed_inputs()
+        t0 = time.perf_counter()
+        self._swap(self.loader(), time.perf_counter() - t0)
+
+    async def refresh(self) -> None:
+        """
+        Επαναϋπολογισμός στο παρασκήνιο· σφάλμα -> κρατιέται το παλιό
+        snapshot. Αίτημα κατά τη διάρκεια υπολογισμού -> ένας ακόμη γύρος.
+        """
+        if self.computing:
+            self._pending = True
+            return
+        self.computing = True
+        try:
+            while True:
+                self._pending = False
+                t0 = time.perf_counter()
+                try:
+                    tables = await asyncio.get_running_loop().run_in_executor(None, self.loader)
+                except Exception as exc:  # ο server συνεχίζει με τα παλιά δεδομένα
+                    self.last_error = f"{type(exc).__name__}: {exc}"
+                    print(f"⚠ Αποτυχία επαναϋπολογισμού: {self.last_error}")
+                else:
+                    self.last_error = None
+                    self._swap(tables, time.perf_counter() - t0)
+                if not self._pending:
+                    break
+        finally:
+            self.computing = False
+
+    # ---------------- αλλαγές εισόδων ---------------- #
+
+    def _changed_inputs(self) -> bool:
+        """
+        True αν άλλαξε το περιεχόμενο των εισόδων. Πρώτα stat (φτηνό)· hash
+        μόνο για αρχεία με νέο μέγεθος/mtime, ώστε ένα touch να μη
+        προκαλεί επαναϋπολογισμό.
+        """
+        stats, digests = {}, {}
+        for path in self.inputs():
+            key = str(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[key] = (st.st_size, st.st_mtime_ns)
+            if self._stats.get(key) == stats[key] and key in self._digests:
+                digests[key] = self._digests[key]
+            else:
+                digests[key] = file_digest(Path(path))
+        changed = digests != self._digests
+        self._stats, self._digests = stats, digests
+        return changed
+
+    async def watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            changed = await asyncio.get_running_loop().run_in_executor(
+                None, self._changed_inputs)
+            if changed:
+                print("🔄 Αλλαγή εισόδων – επαναϋπολογισμός στο παρασκήνιο")
+                asyncio.get_running_loop().create_task(self.refresh())
+
+    # ---------------- routing ---------------- #
+
+    def handle(self, method: str, target: str) -> Response:
+        """
+        (μέθοδος, path?query) -> (HTTP status, JSON body)· απρόβλεπτο σφάλμα
+        -> 500 με JSON σώμα (ο server και η σύνδεση δεν πέφτουν).
+        """
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip("/") or "/"
+        try:
+            if path in ("/", "/health") and method == "GET":
+                return HTTPStatus.OK, _json(self.health())
+            if path == "/tables" and method == "GET":
+                return HTTPStatus.OK, _json({
+                    name: {"rows": len(df), "columns": [str(c) for c in df.columns]}
+                    for name, df in self.tables.items()
+                })
+            if path.startswith("/query/") and method == "GET":
+                return HTTPStatus.OK, self._query(path[len("/query/"):], url.query)
+            if path == "/refresh" and method == "POST":
+                asyncio.get_running_loop().create_task(self.refresh())
+                return HTTPStatus.ACCEPTED, _json({"status": "refreshing",
+                                                   "version": self.version})
+            raise QueryError(f"Άγνωστο endpoint: {method} {path}", HTTPStatus.NOT_FOUND)
+        except QueryError as exc:
+            return exc.status, _json({"error": str(exc)})
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            print(f"⚠ Σφάλμα στο {method} {target}: {error}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, _json({"error": error})
+
+    def _query(self, table: str, query: str) -> bytes:
+        params = parse_qs(query, keep_blank_values=True)
+        key = (self.version, table, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if table not in self.tables:
+            raise QueryError(f"Άγνωστος πίνακας: {table!r} (επιλογές: {list(self.tables)})",
+                             HTTPStatus.NOT_FOUND)
+        result = query_table(self.tables[table], params)
+        rows = result.to_json(orient="records", force_ascii=False, date_format="iso")
+        head = _json({"table": table, "version": self.version, "rows": len(result)})
+        body = head[:-1] + b', "data": ' + rows.encode("utf-8") + b"}"
+        self.cache.put(key, body)
+        return body
+
+    def health(self) -> dict:
+        return {
+            "status": "ok" if self.tables else "loading",
+            "version": self.version,
+            "tables": list(self.tables),
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+            "computing": self.computing,
+            "last_error": self.last_error,
+            "cache": self.cache.stats(),
+        }
+
+    # ---------------- HTTP ---------------- #
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers: δεν χρειάζονται (GET/POST χωρίς σώμα)
+            parts = request.decode("latin-1").split()
+            if len(parts) < 2:
+                status, body = HTTPStatus.BAD_REQUEST, _json({"error": "Άκυρο αίτημα"})
+            else:
+                status, body = self.handle(parts[0].upper(), parts[1])
+            status = HTTPStatus(status)
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        """Φόρτωση (αν χρειάζεται), server & watcher μέχρι να διακοπεί."""
+        if not self.tables:
+            await asyncio.get_running_loop().run_in_executor(None, self.load)
+        server = await asyncio.start_server(self._client, host, port)
+        print(f"🌐 Υπηρεσία ερωτημάτων: http://{host}:{port}/  (π.χ. /tables, "
+              f"/query/<πίνακας>?pollutant=PM10)")
+        watcher = asyncio.get_running_loop().create_task(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def serve(loader: Callable[[], Dict[str, pd.DataFrame]],
+          inputs: Optional[Callable[[], Iterable[Path]]] = None,
+          host: str = "127.0.0.1",
+          port: int = 8765,
+          cache_entries: int = DEFAULT_CACHE_ENTRIES,
+          poll_seconds: float = DEFAULT_POLL_SECONDS) -> None:
+    service = QueryService(loader, inputs, cache_entries, poll_seconds)
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        print("\n⏹ Τερματισμός υπηρεσίας")
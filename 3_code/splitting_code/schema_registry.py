@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Schema registry για τις κεφαλίδες των φύλλων μετρήσεων
+
+- Μία κανονικοποίηση κεφαλίδων (αντί για αντίγραφα του _normalize_columns)
+- Compiled patterns κεφαλίδα -> ColumnSpec(ρύπος, μονάδα, περίοδος μέσου)
+  με ακριβές ταίριασμα ρύπου (το "NO" δεν ταιριάζει μέσα στο "NO2")
+- Memoization ανά υπογραφή κεφαλίδας: φύλλο με ήδη γνωστή κεφαλίδα
+  λύνεται με ένα dict lookup
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+import pandas as pd
+
+DATE_PREFIX = "Ημερο-"
+# Στήλη μέσων του Process #1: "Μέσος Όρος <περίοδος>" (π.χ. 2010–2013)
+MEAN_PREFIX = "Μέσος Όρος"
+
+# Κανονικό όνομα ρύπου -> εναλλακτικές γραφές στις κεφαλίδες
+POLLUTANT_ALIASES = {
+    "SO2": ["SO2"],
+    "PM10": ["PM10"],
+    "PM2.5": ["PM2.5", "PM2,5"],
+    "CO": ["CO"],
+    "NO": ["NO"],
+    "NO2": ["NO2"],
+    "O3": ["O3"],
+}
+POLLUTANTS = list(POLLUTANT_ALIASES)
+
+# Οι τιμές του δημοτικού αρχείου είναι ημερήσιοι μέσοι
+DEFAULT_AVERAGING = "daily"
+
+_ALIAS_TO_POLLUTANT = {
+    alias: pollutant
+    for pollutant, aliases in POLLUTANT_ALIASES.items()
+    for alias in aliases
+}
+# Μεγαλύτερα aliases πρώτα, και όριο λέξης ώστε "NO" != "NO2"/"NOx"
+_POLLUTANT_RE = re.compile(
+    r"^(?P<pollutant>"
+    + "|".join(re.escape(a) for a in sorted(_ALIAS_TO_POLLUTANT, key=len, reverse=True))
+    + r")(?![\w.,])\s*(?P<unit>[μµm]g/m3|[μµm]g/m³)?\s*$"
+)
+
+
+class ColumnSpec(NamedTuple):
+    pollutant: str
+    unit: Optional[str]
+    averaging: str
+
+
+class SheetSchema(NamedTuple):
+    date_column: Optional[str]
+    pollutant_columns: Dict[str, ColumnSpec]
+
+
+def normalize_header(c) -> str:
+    """Καθαρισμός κεφαλίδας (newlines, "Ημερο -", "PM2,5")."""
+    c_clean = str(c).replace("\n", " ").strip()
+    return c_clean.replace("Ημερο -", "Ημερο-").replace("PM2,5", "PM2.5")
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    return df.rename(columns={c: normalize_header(c) for c in df.columns})
+
+
+@lru_cache(maxsize=4096)
+def resolve_header(header: str) -> Optional[ColumnSpec]:
+    """Κεφαλίδα (καθαρή ή όχι) -> ColumnSpec, ή None αν δεν είναι ρύπος."""
+    m = _POLLUTANT_RE.match(normalize_header(header))
+    if m is None:
+        return None
+    unit = m.group("unit")
+    if unit is not None:
+        unit = unit.replace("µ", "μ").replace("m3", "m³")
+    return ColumnSpec(_ALIAS_TO_POLLUTANT[m.group("pollutant")], unit, DEFAULT_AVERAGING)
+
+
+@lru_cache(maxsize=1024)
+def _resolve_signature(signature: Tuple[str, ...]) -> SheetSchema:
+    date_column = next((c for c in signature if c.startswith(DATE_PREFIX)), None)
+    pollutant_columns = {}
+    for c in signature:
+        spec = resolve_header(c)
+        if spec is not None:
+            pollutant_columns[c] = spec
+    return SheetSchema(date_column, pollutant_columns)
+
+
+def resolve_columns(columns) -> SheetSchema:
+    """
+    Σχήμα φύλλου από τις (κανονικοποιημένες) στήλες του· memoized ανά
+    υπογραφή κεφαλίδας.
+    """
+    return _resolve_signature(tuple(str(c) for c in columns))
+
+
+def is_measurement_column(c) -> bool:
+    """Στήλη ημερομηνίας ή ρύπου (για ανάγνωση μόνο των απαραίτητων στηλών)."""
+    return normalize_header(c).startswith(DATE_PREFIX) or resolve_header(c) is not None
+
+
+def is_pollutant_column(c) -> bool:
+    return resolve_header(c) is not None
+
+
+# ---------------- στήλη μέσων του Process #1 ---------------- #
+
+def mean_label(first: pd.Timestamp, last: pd.Timestamp) -> str:
+    """Όνομα στήλης μέσων για την περίοδο first..last (σε έτη)."""
+    if pd.isna(first) or pd.isna(last):
+        return MEAN_PREFIX
+    years = (str(first.year) if first.year == last.year
+             else f"{first.year}–{last.year}")
+    return f"{MEAN_PREFIX} {years}"
+
+
+def mean_column(columns) -> str:
+    """Η στήλη "Μέσος Όρος <περίοδος>" ενός πίνακα μέσων (Process #1 και μετά)."""
+    column = next((c for c in columns if str(c).startswith(MEAN_PREFIX)), None)
+    if column is None:
+        raise KeyError(f"Δεν βρέθηκε στήλη {MEAN_PREFIX!r} στις {list(columns)}")
+    return column
+
+
+def mean_period(column: str) -> str:
+    """Η περίοδος από το όνομα της στήλης μέσων ("Μέσος Όρος 2012" -> "2012")."""
+    return str(column)[len(MEAN_PREFIX):].strip()
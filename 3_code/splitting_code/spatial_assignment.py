@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Χωρική αντιστοίχιση σταθμών -> περιοχών (Δημοτικές Κοινότητες)
+
+Αντί για χειρόγραφο dict Σταθμός -> Διαμέρισμα:
+- συντεταγμένες σταθμών από το φύλλο "Χαρακτηριστικά Σταθμών" (DMS)
+- κεντροειδή περιοχών από τοπικό CSV, που παράγεται από αρχείο ορίων
+  (GeoJSON) με boundary_centroids / write_area_centroids και καταγράφει
+  την πηγή του (γραμμή "# Πηγή:")
+- πίνακας βαρών περιοχές × σταθμοί: πλησιέστερος σταθμός ή IDW
+
+Οι αποστάσεις είναι μεγάλου κύκλου (km). Ο πλησιέστερος / k πλησιέστεροι
+βρίσκονται με KD-tree (scipy, αν υπάρχει) πάνω σε μοναδιαία διανύσματα,
+αλλιώς με dense numpy σε μπλοκ περιοχών.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from census_loader import normalize_names
+from input_cache import file_digest
+from schema_registry import normalize_header
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - προαιρετική εξάρτηση
+    cKDTree = None
+
+STATIONS_SHEET = "Χαρακτηριστικά Σταθμών"
+EARTH_RADIUS_KM = 6371.0088
+ASSIGNMENT_METHODS = ("nearest", "idw")
+
+# Μπλοκ περιοχών για τον dense υπολογισμό (όριο μνήμης)
+_BLOCK_AREAS = 4096
+
+_DMS_RE = re.compile(
+    r"(?P<deg>\d+(?:[.,]\d+)?)\s*[°οo]\s*"
+    r"(?:(?P<min>\d+(?:[.,]\d+)?)\s*['΄′]\s*)?"
+    r"(?:(?P<sec>\d+(?:[.,]\d+)?)\s*(?:''|\"|″|΄΄)\s*)?"
+    r"(?P<hem>[NSEWΝΕΒΑΔ])"
+)
+# Ν/Β: Βόρειο, Ε/Α: Ανατολικό, Δ: Δυτικό (όπως γράφονται στο αρχείο του Δήμου)
+_HEMISPHERES = {
+    "N": ("lat", 1), "Ν": ("lat", 1), "Β": ("lat", 1), "S": ("lat", -1),
+    "E": ("lon", 1), "Ε": ("lon", 1), "Α": ("lon", 1), "W": ("lon", -1), "Δ": ("lon", -1),
+}
+
+
+# ---------------- συντεταγμένες ---------------- #
+
+def parse_dms(values: pd.Series) -> pd.DataFrame:
+    """
+    "40ο 38' 15.62''Ν" -> (άξονας "lat"/"lon", δεκαδικές μοίρες), vectorized.
+    Μη αναγνωρίσιμες τιμές -> NaN.
+    """
+    parts = values.astype("string").str.extract(_DMS_RE)
+    number = {
+        k: pd.to_numeric(parts[k].str.replace(",", ".", regex=False), errors="coerce")
+        for k in ("deg", "min", "sec")
+    }
+    degrees = number["deg"] + number["min"].fillna(0) / 60 + number["sec"].fillna(0) / 3600
+    axis = parts["hem"].map({h: a for h, (a, _) in _HEMISPHERES.items()})
+    sign = parts["hem"].map({h: s for h, (_, s) in _HEMISPHERES.items()})
+    return pd.DataFrame({"axis": axis, "degrees": degrees * sign}, index=values.index)
+
+
+def _match_stations(descriptions: pd.Series, station_sheets: Sequence[str]) -> pd.Series:
+    """Φύλλο σταθμού ("Στ. ΕΓΝΑΤΙΑΣ") -> γραμμή του πίνακα χαρακτηριστικών."""
+    keys = normalize_names(descriptions.str.replace("\n", " ", regex=False))
+    matched = {}
+    for sheet in station_sheets:
+        token = normalize_names(pd.Series([re.sub(r"^Στ\.\s*", "", sheet)])).iloc[0]
+        hits = keys.index[keys.str.contains(token, regex=False).fillna(False)]
+        if len(hits):
+            matched[sheet] = hits[0]
+    return pd.Series(matched, dtype="object")
+
+
+def read_station_coordinates(pollution_path: Path,
+                             station_sheets: Sequence[str]) -> pd.DataFrame:
+    """
+    Συντεταγμένες σταθμών από το φύλλο "Χαρακτηριστικά Σταθμών".
+
+    Returns
+    -------
+    DataFrame
+        Σταθμός, Πλάτος, Μήκος (δεκαδικές μοίρες) – μόνο για όσα φύλλα
+        αντιστοιχίστηκαν.
+    """
+    raw = pd.read_excel(pollution_path, sheet_name=STATIONS_SHEET, header=None)
+    header_row = raw.index[raw.iloc[:, 0].astype("string").str.strip().eq("Α/Α").fillna(False)][0]
+    table = raw.iloc[header_row + 1:].copy()
+    table.columns = [normalize_header(c) for c in raw.iloc[header_row]]
+    table = table[pd.to_numeric(table["Α/Α"], errors="coerce").notna()]
+
+    # Ο άξονας προκύπτει από το ημισφαίριο (N/E), όχι από την κεφαλίδα
+    coords = pd.concat([parse_dms(table[c]) for c in table.columns
+                        if str(c).startswith("Γεωγραφικό")])
+    coords = coords.dropna()
+    lat = coords.loc[coords["axis"] == "lat", "degrees"]
+    lon = coords.loc[coords["axis"] == "lon", "degrees"]
+
+    name_col = next(c for c in table.columns if str(c).startswith("Όνομα"))
+    rows = _match_stations(table[name_col].astype("string"), station_sheets)
+    return pd.DataFrame({
+        "Σταθμός": rows.index,
+        "Πλάτος": lat.reindex(rows.to_numpy()).to_numpy(),
+        "Μήκος": lon.reindex(rows.to_numpy()).to_numpy(),
+    })
+
+
+def read_area_centroids(path: Path) -> pd.DataFrame:
+    """
+    CSV με στήλες Δημοτική Κοινότητα, Πλάτος, Μήκος (γραμμές '#' αγνοούνται).
+    Αρχείο χωρίς γραμμή "# Πηγή:" (μη τεκμηριωμένα κεντροειδή) -> προειδοποίηση.
+    """
+    with open(path, encoding="utf-8") as fh:
+        header = [line for line in fh if line.startswith("#")]
+    if not any(line.startswith(SOURCE_PREFIX) for line in header):
+        print(f"⚠ Κεντροειδή χωρίς τεκμηριωμένη πηγή: {path} "
+              "(βλ. boundary_centroids / write_area_centroids)")
+    areas = pd.read_csv(path, comment="#", encoding="utf-8")
+    return areas[["Δημοτική Κοινότητα", "Πλάτος", "Μήκος"]].dropna()
+
+
+SOURCE_PREFIX = "# Πηγή:"
+
+
+def _ring_moments(ring: np.ndarray, lat0: float) -> Tuple[float, np.ndarray]:
+    """
+    Εμβαδόν και ροπές (εμβαδόν × κεντροειδές) δακτυλίου με shoelace, σε
+    τοπική ισοορθογώνια προβολή· ανεξάρτητα από τη φορά του δακτυλίου.
+    """
+    x = ring[:, 0] * np.cos(np.radians(lat0))
+    y = ring[:, 1]
+    cross = x * np.roll(y, -1) - np.roll(x, -1) * y
+    area = cross.sum() / 2
+    moments = np.array([((x + np.roll(x, -1)) * cross).sum() / 6,
+                        ((y + np.roll(y, -1)) * cross).sum() / 6])
+    return abs(area), np.sign(area) * moments
+
+
+def _polygon_centroid(polygons: List[list]) -> Tuple[float, float]:
+    """Κεντροειδές (πλάτος, μήκος) MultiPolygon· οι εσωτερικοί δακτύλιοι αφαιρούνται."""
+    rings = [[np.asarray(ring, dtype=float)[:, :2] for ring in polygon]
+             for polygon in polygons]
+    lat0 = float(np.concatenate([r for polygon in rings for r in polygon])[:, 1].mean())
+    total, moments = 0.0, np.zeros(2)
+    for polygon in rings:
+        for i, ring in enumerate(polygon):
+            area, m = _ring_moments(ring, lat0)
+            sign = 1.0 if i == 0 else -1.0
+            total += sign * area
+            moments += sign * m
+    x, y = moments / total
+    return y, x / np.cos(np.radians(lat0))
+
+
+def boundary_centroids(geojson_path: Path,
+                       name_property: str,
+                       names: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Κεντροειδή περιοχών από αρχείο ορίων GeoJSON (WGS84, Polygon /
+    MultiPolygon), π.χ. τα όρια Δημοτικών Κοινοτήτων της ΕΛΣΤΑΤ.
+
+    Parameters
+    ----------
+    name_property : str
+        Ιδιότητα (properties) με το όνομα της περιοχής.
+    names : dict, optional
+        Μετονομασία ονομάτων του αρχείου στα ονόματα της απογραφής.
+    """
+    with open(geojson_path, encoding="utf-8") as fh:
+        features = json.load(fh)["features"]
+    rows = []
+    for feature in features:
+        geometry = feature["geometry"]
+        if geometry["type"] == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry["type"] == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            continue
+        name = feature["properties"][name_property]
+        rows.append(((names or {}).get(name, name), *_polygon_centroid(polygons)))
+    return pd.DataFrame(rows, columns=["Δημοτική Κοινότητα", "Πλάτος", "Μήκος"])
+
+
+def write_area_centroids(centroids: pd.DataFrame, path: Path, source: str,
+                         boundaries: Optional[Path] = None) -> Path:
+    """
+    Γράφει το CSV κεντροειδών με την πηγή τους (και το SHA-256 του
+    αρχείου ορίων) στην κεφαλίδα.
+    """
+    path = Path(path)
+    lines = ["# Κεντροειδή (WGS84) Δημοτικών Κοινοτήτων – για χωρική αντιστοίχιση σταθμών",
+             f"{SOURCE_PREFIX} {source}"]
+    if boundaries is not None:
+        lines.append(f"# Αρχείο ορίων: {Path(boundaries).name} "
+                     f"(sha256 {file_digest(boundaries)})")
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        fh.write("\n".join(lines) + "\n")
+        centroids[["Δημοτική Κοινότητα", "Πλάτος", "Μήκος"]].round(5).to_csv(fh, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+# ---------------- αποστάσεις ---------------- #
+
+def _unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon),
+                            np.cos(lat) * np.sin(lon),
+                            np.sin(lat)])
+
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def distance_matrix(areas: pd.DataFrame, stations: pd.DataFrame) -> np.ndarray:
+    """Αποστάσεις μεγάλου κύκλου (km), σχήμα (περιοχές, σταθμοί)."""
+    a = _unit_vectors(areas["Πλάτος"].to_numpy(float), areas["Μήκος"].to_numpy(float))
+    s = _unit_vectors(stations["Πλάτος"].to_numpy(float), stations["Μήκος"].to_numpy(float))
+    out = np.empty((len(a), len(s)))
+    for start in range(0, len(a), _BLOCK_AREAS):
+        block = a[start:start + _BLOCK_AREAS]
+        chord = np.linalg.norm(block[:, None, :] - s[None, :, :], axis=2)
+        out[start:start + _BLOCK_AREAS] = _chord_to_km(chord)
+    return out
+
+
+def nearest_stations(areas: pd.DataFrame, stations: pd.DataFrame, k: int = 1):
+    """
+    k πλησιέστεροι σταθμοί ανά περιοχή.
+
+    Returns
+    -------
+    (indices, distances_km) με σχήμα (περιοχές, k)
+    """
+    k = min(k, len(stations))
+    a = _unit_vectors(areas["Πλάτος"].to_numpy(float), areas["Μήκος"].to_numpy(float))
+    s = _unit_vectors(stations["Πλάτος"].to_numpy(float), stations["Μήκος"].to_numpy(float))
+    if cKDTree is not None:
+        chord, idx = cKDTree(s).query(a, k=k)
+        idx, chord = idx.reshape(len(a), k), chord.reshape(len(a), k)
+        return idx, _chord_to_km(chord)
+
+    dist = distance_matrix(areas, stations)
+    idx = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    near = np.take_along_axis(dist, idx, axis=1)
+    order = np.argsort(near, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(near, order, axis=1)
+
+
+# ---------------- βάρη ---------------- #
+
+def _weights_frame(values: np.ndarray, areas: Iterable[str], stations: Iterable[str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        values,
+        index=pd.Index(list(areas), name="Δημοτική Κοινότητα"),
+        columns=pd.Index(list(stations), name="Σταθμός"),
+    )
+
+
+def assignment_weights(stations: pd.DataFrame,
+                       areas: pd.DataFrame,
+                       method: str = "nearest",
+                       k: Optional[int] = None,
+                       power: float = 2.0,
+                       max_distance_km: Optional[float] = None) -> pd.DataFrame:
+    """
+    Πίνακας βαρών περιοχές × σταθμοί (κάθε γραμμή αθροίζει σε 1, ή 0 αν
+    δεν υπάρχει σταθμός εντός max_distance_km).
+
+    Parameters
+    ----------
+    method : {"nearest", "idw"}
+        "nearest": όλο το βάρος στον πλησιέστερο σταθμό.
+        "idw": w ∝ 1 / d^power στους k πλησιέστερους (default όλους)·
+        σταθμός πάνω στο κεντροειδές παίρνει όλο το βάρος.
+    """
+    if method not in ASSIGNMENT_METHODS:
+        raise ValueError(f"Άγνωστη μέθοδος: {method!r} (επιλογές: {list(ASSIGNMENT_METHODS)})")
+    n_areas, n_stations = len(areas), len(stations)
+    k = 1 if method == "nearest" else min(k or n_stations, n_stations)
+    idx, dist = nearest_stations(areas, stations, k=k)
+
+    if method == "nearest":
+        w = np.ones_like(dist)
+    else:
+        with np.errstate(divide="ignore"):
+            w = 1.0 / np.power(dist, power)
+        exact = np.isinf(w)
+        w = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), w)
+    if max_distance_km is not None:
+        w = np.where(dist <= max_distance_km, w, 0.0)
+
+    totals = w.sum(axis=1, keepdims=True)
+    w = np.divide(w, totals, out=np.zeros_like(w), where=totals > 0)
+
+    weights = np.zeros((n_areas, n_stations))
+    np.put_along_axis(weights, idx, w, axis=1)
+    return _weights_frame(weights, areas["Δημοτική Κοινότητα"], stations["Σταθμός"])
+
+
+def weights_from_mapping(station_to_area_admin: Dict[str, str],
+                         normalize: bool = False) -> pd.DataFrame:
+    """
+    Πίνακας βαρών από στατικό mapping Σταθμός -> Δημοτική Κοινότητα
+    (βάρος 1 ανά σταθμό της περιοχής· με normalize=True 1/πλήθος σταθμών).
+    """
+    stations = pd.Index(list(station_to_area_admin))
+    areas = pd.Index(pd.unique(pd.Series(list(station_to_area_admin.values()))))
+    weights = np.zeros((len(areas), len(stations)))
+    weights[areas.get_indexer(list(station_to_area_admin.values())),
+            np.arange(len(stations))] = 1.0
+    if normalize:
+        weights /= weights.sum(axis=1, keepdims=True)
+    return _weights_frame(weights, areas, stations)
+
+
+def weights_to_mapping_frame(weights: pd.DataFrame) -> pd.DataFrame:
+    """Μη μηδενικά ζεύγη (Σταθμός, Δημοτική Κοινότητα, Βάρος), ανά σταθμό."""
+    area_idx, station_idx = np.nonzero(weights.to_numpy())
+    pairs = pd.DataFrame({
+        "Σταθμός": weights.columns[station_idx],
+        "Δημοτική Κοινότητα": weights.index[area_idx],
+        "Βάρος": weights.to_numpy()[area_idx, station_idx],
+    })
+    order = np.lexsort((area_idx, station_idx))
+    return pairs.iloc[order].reset_index(drop=True)
+
+
+def spatial_weights(pollution_path: Path,
+                    station_sheets: Sequence[str],
+                    centroids_path: Path,
+                    method: str = "nearest",
+                    **kwargs) -> pd.DataFrame:
+    """Συντεταγμένες από τα αρχεία + assignment_weights."""
+    stations = read_station_coordinates(pollution_path, station_sheets).dropna()
+    areas = read_area_centroids(centroids_path)
+    return assignment_weights(stations, areas, method=method, **kwargs)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Streaming ανάγνωση μετρήσεων ρύπανσης (Excel / CSV) σε chunks
+
+Για αρχεία μεγαλύτερα από τη μνήμη: κάθε σταθμός διαβάζεται σε chunks
+γραμμών και τα στατιστικά (πλήθος, άθροισμα, min, max, KLL sketch για
+εκατοστημόρια) ενημερώνονται σταδιακά. Η μέγιστη μνήμη εξαρτάται από το
+chunk_rows και όχι από το μέγεθος της εισόδου.
+
+Οι μέσοι όροι ταυτίζονται (εντός floating-point ανοχής) με αυτούς του
+aggregate_and_compute_mean_pollutant_levels.
+
+stream_measurements: από το ίδιο πέρασμα χτίζεται και το συμπαγές μοντέλο
+μετρήσεων (data_model, ~13 bytes/μέτρηση) για τα stages σε επίπεδο
+μέτρησης (υπερβάσεις, ποιότητα, sketches, έκθεση, dashboard), ώστε το
+workbook να διαβάζεται μία φορά και τα φύλλα να μη φορτώνονται ποτέ
+ολόκληρα. Το μοντέλο μεγαλώνει με το πλήθος των μετρήσεων· σταθερή μνήμη
+έχουν μόνο οι μέσοι.
+"""
+
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from pandas.api.types import union_categoricals
+
+from aggregate_and_compute_mean_pollutant_levels import _pollutant_names, _to_long_format
+from data_model import MeasurementModel
+from schema_registry import (is_measurement_column, is_pollutant_column,
+                             normalize_header, resolve_columns)
+from quantile_sketch import DEFAULT_K, KLLSketch
+
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_QUANTILES = (0.5, 0.904, 0.998)
+
+
+# ---------------- πηγές chunks ---------------- #
+
+def iter_excel_chunks(pollution_path: Path,
+                      station_sheets: Sequence[str],
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS
+                      ) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Ανοίγει το workbook μία φορά (read-only) και δίνει (φύλλο, chunk) με
+    μόνο τις στήλες ημερομηνίας/ρύπων, χωρίς να φορτώνει ολόκληρο φύλλο.
+    """
+    wb = load_workbook(pollution_path, read_only=True, data_only=True)
+    try:
+        for sheet in station_sheets:
+            ws = wb[sheet]
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            keep = [i for i, c in enumerate(header)
+                    if c is not None and is_measurement_column(c)]
+            columns = [normalize_header(header[i]) for i in keep]
+
+            buf = []
+            for row in rows:
+                buf.append([row[i] if i < len(row) else None for i in keep])
+                if len(buf) >= chunk_rows:
+                    yield sheet, pd.DataFrame(buf, columns=columns)
+                    buf = []
+            if buf:
+                yield sheet, pd.DataFrame(buf, columns=columns)
+    finally:
+        wb.close()
+
+
+def iter_csv_chunks(csv_path: Path,
+                    station: Optional[str] = None,
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    **read_csv_kwargs) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Chunks από CSV dump σταθμού (ίδιες στήλες με τα φύλλα Excel).
+    Ο σταθμός είναι το station ή, αν λείπει, το όνομα του αρχείου.
+    """
+    station = station or Path(csv_path).stem
+    reader = pd.read_csv(csv_path, chunksize=chunk_rows,
+                         usecols=is_measurement_column, **read_csv_kwargs)
+    for chunk in reader:
+        chunk.columns = [normalize_header(c) for c in chunk.columns]
+        yield station, chunk
+
+
+# ---------------- incremental στατιστικά ---------------- #
+
+class RunningStats:
+    """Πλήθος / άθροισμα / min / max + KLL sketch, ενημερώσιμα & mergeable."""
+
+    __slots__ = ("count", "total", "minimum", "maximum", "sketch")
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.sketch = KLLSketch(k=k)
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self.sketch.update(values)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "minimum": self.minimum if self.count else None,
+            "maximum": self.maximum if self.count else None,
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningStats":
+        stats = cls()
+        stats.count = data["count"]
+        stats.total = data["total"]
+        stats.minimum = np.inf if data["minimum"] is None else data["minimum"]
+        stats.maximum = -np.inf if data["maximum"] is None else data["maximum"]
+        stats.sketch = KLLSketch.from_dict(data["sketch"])
+        return stats
+
+
+class StreamingAggregator:
+    """
+    Συσσωρεύει RunningStats ανά (σταθμό, στήλη ρύπου) από chunks.
+    """
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.stats: Dict[Tuple[str, str], RunningStats] = {}
+
+    def update(self, station: str, chunk: pd.DataFrame) -> List[Tuple[str, str]]:
+        """Ενημερώνει από ένα chunk· επιστρέφει τα (σταθμός, στήλη) που άλλαξαν."""
+        changed = []
+        for col in chunk.columns:
+            if not is_pollutant_column(col):
+                continue
+            values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(
+                dtype="float64", na_value=np.nan
+            )
+            key = (station, col)
+            if key not in self.stats:
+                self.stats[key] = RunningStats(k=self.k)
+            before = self.stats[key].count
+            self.stats[key].update(values)
+            if self.stats[key].count != before:
+                changed.append(key)
+        return changed
+
+    def consume(self, chunks: Iterator[Tuple[str, pd.DataFrame]]) -> "StreamingAggregator":
+        for station, chunk in chunks:
+            self.update(station, chunk)
+        return self
+
+    def means(self) -> pd.DataFrame:
+        """Ίδιο σχήμα με _compute_overall_means."""
+        raw = pd.Series([col for _, col in self.stats], dtype="str")
+        means = pd.DataFrame({
+            "Ρύπος_raw": raw,
+            "Μέσος Όρος 2010–2013": [s.mean for s in self.stats.values()],
+        })
+        means["Ρύπος"] = _pollutant_names(means["Ρύπος_raw"])
+        means["Σταθμός"] = [station for station, _ in self.stats]
+        return means
+
+    def summary(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> pd.DataFrame:
+        """Πλήθος, μέσος, min, max και εκτιμώμενα εκατοστημόρια."""
+        rows = []
+        for (station, col), s in self.stats.items():
+            row = {
+                "Σταθμός": station,
+                "Ρύπος_raw": col,
+                "Πλήθος": s.count,
+                "Μέσος Όρος": s.mean,
+                "Ελάχιστο": s.minimum if s.count else np.nan,
+                "Μέγιστο": s.maximum if s.count else np.nan,
+            }
+            for q, v in zip(quantiles, s.sketch.quantiles(quantiles)):
+                row[f"P{q * 100:g}"] = v
+            rows.append(row)
+        out = pd.DataFrame(rows)
+        out.insert(2, "Ρύπος", _pollutant_names(out["Ρύπος_raw"].astype("str")))
+        return out
+
+
+def aggregate_and_compute_mean_pollutant_levels_streaming(
+    pollution_path: Path,
+    station_sheets: List[str],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    csv_paths: Optional[Sequence[Path]] = None
+) -> pd.DataFrame:
+    """
+    Streaming εκδοχή του aggregate_and_compute_mean_pollutant_levels.
+
+    Parameters
+    ----------
+    pollution_path : Path
+        Excel μετρήσεων (μπορεί να είναι None αν δίνονται μόνο CSV).
+    station_sheets : list[str]
+        Φύλλα σταθμών του Excel.
+    chunk_rows : int
+        Γραμμές ανά chunk (καθορίζει τη μέγιστη μνήμη).
+    csv_paths : list[Path], optional
+        Επιπλέον CSV dumps (ένα ανά σταθμό).
+
+    Returns
+    -------
+    pd.DataFrame
+        Μέσοι όροι ρύπων ανά σταθμό (ίδιο σχήμα με το in-memory path).
+    """
+    agg = StreamingAggregator()
+    if pollution_path is not None:
+        agg.consume(iter_excel_chunks(pollution_path, station_sheets, chunk_rows))
+    for csv_path in csv_paths or ():
+        agg.consume(iter_csv_chunks(csv_path, chunk_rows=chunk_rows))
+    return agg.means()
+
+
+def _concat_long(pieces: List[pd.DataFrame]) -> pd.DataFrame:
+    """Συνένωση long κομματιών κρατώντας Σταθμός/Ρύπος categorical."""
+    if not pieces:
+        return pd.DataFrame({"Σταθμός": pd.Categorical([]), "Ρύπος": pd.Categorical([]),
+                             "Ημερομηνία": pd.Series([], dtype="datetime64[ns]"),
+                             "Τιμή": pd.Series([], dtype="float32")})
+    long = pd.concat([p.drop(columns=["Σταθμός", "Ρύπος"]) for p in pieces],
+                     ignore_index=True)
+    for col in ("Σταθμός", "Ρύπος"):
+        long[col] = union_categoricals([p[col] for p in pieces])
+    return long
+
+
+def stream_measurements(pollution_path: Path,
+                        station_sheets: List[str],
+                        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                        csv_paths: Optional[Sequence[Path]] = None) -> dict:
+    """
+    Ένα πέρασμα πάνω στα chunks: μέσοι (StreamingAggregator) και μοντέλο
+    μετρήσεων από τα ίδια chunks.
+
+    Returns
+    -------
+    dict
+        {"means": ίδιο σχήμα με το in-memory path, "model": MeasurementModel}
+    """
+    chunks = iter_excel_chunks(pollution_path, station_sheets, chunk_rows) \
+        if pollution_path is not None else iter(())
+    for csv_path in csv_paths or ():
+        chunks = chain(chunks, iter_csv_chunks(csv_path, chunk_rows=chunk_rows))
+
+    agg, pieces = StreamingAggregator(), []
+    for station, chunk in chunks:
+        agg.update(station, chunk)
+        schema = resolve_columns(chunk.columns)
+        if len(chunk) and schema.date_column is not None and schema.pollutant_columns:
+            pieces.append(_to_long_format([chunk.assign(_sheet=station)]))
+    model = MeasurementModel.from_long(_concat_long(pieces))
+    return {"means": agg.means(), "model": model}
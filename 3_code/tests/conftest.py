@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+"""Τα modules του splitting_code εισάγονται με το όνομά τους (όπως στα benchmarks)."""
+
+import sys
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "splitting_code"
+sys.path.insert(0, str(CODE_DIR))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""assess_quality: αφαιρούνται μόνο αρνητικές τιμές, οι υπόλοιπες σημαίες αναφέρονται."""
+
+import numpy as np
+import pandas as pd
+
+from data_model import MeasurementModel
+from data_quality import assess_quality
+
+STATION = "Στ. ΕΓΝΑΤΙΑΣ"
+
+
+def _model(pollutant, values):
+    dates = pd.date_range("2010-01-01", periods=len(values), freq="D")
+    return MeasurementModel.from_long(pd.DataFrame({
+        "Σταθμός": STATION, "Ρύπος": pollutant,
+        "Ημερομηνία": dates, "Τιμή": np.asarray(values, dtype="float64"),
+    }))
+
+
+def _flags(quality):
+    return quality["flags"].set_index("Ημερομηνία")["Σημαία"].astype(str)
+
+
+def _kept(quality):
+    facts = quality["model"].facts
+    return pd.Series(facts["Τιμή"].to_numpy(dtype="float64"),
+                     index=facts["Ημερομηνία"])
+
+
+def test_only_negative_readings_are_removed():
+    rng = np.random.default_rng(0)
+    values = 30.0 + rng.normal(0.0, 3.0, 60)
+    values[20] = 400.0      # ακραία τιμή (π.χ. πραγματικό επεισόδιο)
+    values[40] = -5.0       # άκυρη
+    quality = assess_quality(_model("PM10", values), max_gap=0)
+
+    flags = _flags(quality)
+    day = pd.date_range("2010-01-01", periods=60, freq="D")
+    assert flags[day[20]] == "Ακραία τιμή"
+    assert flags[day[40]] == "Αρνητική τιμή"
+
+    kept = _kept(quality)
+    assert kept[day[20]] == 400.0
+    assert day[40] not in kept.index
+    assert len(kept) == 59
+
+    coverage = quality["coverage"].iloc[0]
+    assert coverage["Απορρίφθηκαν"] == 1
+    assert coverage["Επισημάνθηκαν"] == 1
+
+
+def test_stuck_runs_at_the_detection_floor_are_not_flagged():
+    low = [1.0] * 10 + [3.0, 4.0, 2.0] * 10
+    quality = assess_quality(_model("SO2", low))
+    assert "Κολλημένος αισθητήρας" not in set(_flags(quality))
+
+    high = [3.0, 4.0, 2.0] * 5 + [7.0] * 10 + [3.0, 4.0, 2.0] * 5
+    quality = assess_quality(_model("SO2", high))
+    flags = _flags(quality)
+    assert (flags == "Κολλημένος αισθητήρας").sum() == 10
+    assert len(_kept(quality)) == len(high)
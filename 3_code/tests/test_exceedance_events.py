@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""run_length_events / yearly_counts / statistic_values: όρια επεισοδίων και 8ωρος μέσος."""
+
+import numpy as np
+import pandas as pd
+
+from data_model import MeasurementModel
+from exceedance_events import (
+    MAX_DAILY_8H_MEAN,
+    run_length_events,
+    statistic_values,
+    yearly_counts,
+)
+
+DAY = np.timedelta64(1, "D")
+
+
+def _values(rows):
+    """rows: (station_id, pollutant_id, ημερομηνία, τιμή), ήδη ταξινομημένα."""
+    out = pd.DataFrame(rows, columns=["station_id", "pollutant_id", "Ημερομηνία", "Τιμή"])
+    out["Ημερομηνία"] = pd.to_datetime(out["Ημερομηνία"])
+    return out
+
+
+def test_missing_day_breaks_the_run():
+    values = _values([(0, 0, "2012-01-01", 60.0), (0, 0, "2012-01-02", 70.0),
+                      (0, 0, "2012-01-04", 80.0), (0, 0, "2012-01-05", 10.0)])
+    events = run_length_events(values, 50, DAY)
+    assert list(events["Διάρκεια"]) == [2, 1]
+    assert list(events["Μέγιστο"]) == [70.0, 80.0]
+    assert events["Έναρξη"].iloc[1] == pd.Timestamp("2012-01-04")
+
+
+def test_station_and_pollutant_boundaries_break_the_run():
+    values = _values([(0, 0, "2012-01-01", 60.0), (0, 0, "2012-01-02", 60.0),
+                      (0, 1, "2012-01-03", 60.0),
+                      (1, 1, "2012-01-04", 60.0)])
+    events = run_length_events(values, 50, DAY)
+    assert list(zip(events["station_id"], events["pollutant_id"], events["Διάρκεια"])) == [
+        (0, 0, 2), (0, 1, 1), (1, 1, 1)]
+
+
+def test_event_across_new_year_counts_in_its_start_year():
+    values = _values([(0, 0, d, 60.0) for d in
+                      ("2012-12-30", "2012-12-31", "2013-01-01", "2013-01-02")])
+    events = run_length_events(values, 50, DAY)
+    assert list(events["Διάρκεια"]) == [4]
+
+    counts = yearly_counts(values, events, 50).set_index("Έτος")
+    assert list(counts["Υπερβάσεις"]) == [2, 2]
+    assert counts.loc[2012, "Μέγιστο επεισόδιο"] == 4
+    assert counts.loc[2013, "Μέγιστο επεισόδιο"] == 0
+
+
+def test_8h_rolling_max_needs_six_hours():
+    short_day = pd.date_range("2012-01-01", periods=5, freq="h")  # 5 ώρες: άκυρο
+    full_day = pd.date_range("2012-01-03", periods=8, freq="h")
+    model = MeasurementModel.from_long(pd.DataFrame({
+        "Σταθμός": "Α", "Ρύπος": "O3",
+        "Ημερομηνία": short_day.append(full_day),
+        "Τιμή": [100.0] * 5 + [10.0] * 6 + [100.0] * 2,
+    }))
+    out = statistic_values(model, MAX_DAILY_8H_MEAN)
+    assert list(out["Ημερομηνία"]) == [pd.Timestamp("2012-01-03")]
+    # μέγιστος κινητός μέσος: όλες οι 8 ώρες (6 × 10 + 2 × 100) / 8
+    assert np.isclose(out["Τιμή"].iloc[0], 32.5)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+"""read_exported_tables: οι πίνακες μιας εξαγωγής διαβάζονται ξανά ανά sink."""
+
+import pandas as pd
+
+from export_excel import export_results, read_exported_tables
+
+
+def _export(tmp_path, sinks):
+    outxlsx = tmp_path / "out.xlsx"
+    mapping = pd.DataFrame({"Σταθμός": ["Α"], "Δημοτική Κοινότητα": ["1ο"], "Βάρος": [1.0]})
+    results = pd.DataFrame({"Σταθμός": ["Α"], "Ρύπος": ["PM10"], "Τιμή": [10.0]})
+    extra = {"API_pc": pd.DataFrame({"Δημοτική Κοινότητα": ["1ο"], "API_pc": [0.5]}),
+             "Κάλυψη δεδομένων": pd.DataFrame({"Σταθμός": ["Α"], "Κάλυψη %": [95.0]})}
+    export_results(mapping, results, outxlsx, sinks=sinks, extra_tables=extra)
+    return outxlsx, extra
+
+
+def test_tables_are_read_back_from_the_workbook(tmp_path):
+    outxlsx, extra = _export(tmp_path, ("xlsx",))
+    tables = read_exported_tables(outxlsx, ["Κάλυψη δεδομένων", "API_pc", "Λείπει"])
+    assert list(tables) == ["Κάλυψη δεδομένων", "API_pc"]
+    pd.testing.assert_frame_equal(tables["API_pc"], extra["API_pc"])
+
+
+def test_parquet_is_used_without_an_xlsx_sink(tmp_path):
+    outxlsx, extra = _export(tmp_path, ("parquet",))
+    tables = read_exported_tables(outxlsx, ["Κάλυψη δεδομένων"], sinks=("parquet",))
+    pd.testing.assert_frame_equal(tables["Κάλυψη δεδομένων"], extra["Κάλυψη δεδομένων"])
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+"""compute_exposure: το API είναι μέσος των διαθέσιμων υποδεικτών (με πλήθος ρύπων)."""
+
+import numpy as np
+import pandas as pd
+
+from exposure import compute_exposure
+
+
+def test_api_averages_only_the_available_sub_indices():
+    # Ο σταθμός Β δεν μετρά NO2· η περιοχή του δεν πρέπει να φαίνεται καθαρότερη
+    means = pd.DataFrame({
+        "Σταθμός": ["Α", "Α", "Β"],
+        "Ρύπος": ["PM10", "NO2", "PM10"],
+        "Μέσος Όρος 2010–2013": [40.0, 20.0, 40.0],
+    })
+    weights = pd.DataFrame([[1.0, 0.0], [0.0, 1.0]],
+                           index=pd.Index(["1ο", "2ο"], name="Δημοτική Κοινότητα"),
+                           columns=["Α", "Β"])
+    demo = pd.DataFrame({"Δημοτική Κοινότητα": ["1ο", "2ο"], "Πληθυσμός": [100, 200]})
+
+    api = compute_exposure(means, weights, demo, {"PM10": 40, "NO2": 40})["api"]
+    api = api.set_index(api["Δημοτική Κοινότητα"].astype(str))
+
+    assert api.loc["1ο", "Ρύποι"] == 2
+    assert api.loc["2ο", "Ρύποι"] == 1
+    assert np.isclose(api.loc["1ο", "API"], (1.0 + 0.5) / 2)
+    assert np.isclose(api.loc["2ο", "API"], 1.0)
+    assert np.isclose(api.loc["2ο", "API_pc"], 1.0 / 200)
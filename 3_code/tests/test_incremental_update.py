@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""AggregationState: κάθε (σταθμός, χρονική στιγμή) μετράει μία φορά."""
+
+import pandas as pd
+import pytest
+
+from incremental_update import AggregationState
+
+STATION = "Στ. ΕΓΝΑΤΙΑΣ"
+PM10 = "PM10 μg/m3"
+
+
+def _chunk(dates, values):
+    return pd.DataFrame({"Ημερο- μηνία": pd.to_datetime(dates), PM10: values})
+
+
+def _stats(state):
+    return state.aggregator.stats[(STATION, PM10)]
+
+
+def test_rows_at_or_before_watermark_are_rejected_with_a_report():
+    state = AggregationState()
+    state.update(STATION, _chunk(["2010-01-03", "2010-01-04"], [10.0, 20.0]))
+
+    changed = state.update(STATION, _chunk(["2010-01-01", "2010-01-04"], [30.0, 200.0]))
+
+    assert changed == set()
+    assert _stats(state).count == 2
+    assert _stats(state).mean == pytest.approx(15.0)
+    assert sum(state.rejected.values()) == 2
+
+
+def test_out_of_order_rows_within_a_batch_are_all_counted():
+    state = AggregationState()
+    changed = state.update_batch([
+        (STATION, _chunk(["2010-01-03", "2010-01-04"], [10.0, 20.0])),
+        (STATION, _chunk(["2010-01-01", "2010-01-02"], [30.0, 40.0])),
+    ])
+
+    assert changed == {(STATION, PM10)}
+    assert _stats(state).count == 4
+    assert state.last_dates[STATION] == pd.Timestamp("2010-01-04")
+    assert state.rejected == {}
+
+
+def test_duplicate_timestamps_keep_the_first_row():
+    state = AggregationState()
+    state.update_batch([
+        (STATION, _chunk(["2010-01-01", "2010-01-02", "2010-01-02"], [10.0, 20.0, 99.0])),
+        (STATION, _chunk(["2010-01-01", "2010-01-03"], [50.0, 30.0])),
+    ])
+
+    assert _stats(state).count == 3
+    assert _stats(state).mean == pytest.approx(20.0)
+    assert sum(state.rejected.values()) == 2
+
+
+def test_replayed_chunk_is_not_counted_twice():
+    state = AggregationState()
+    chunk = _chunk(["2010-01-01", "2010-01-02"], [10.0, 20.0])
+    state.update(STATION, chunk)
+
+    assert state.update(STATION, chunk) == set()
+    assert _stats(state).count == 2
+
+
+def test_chunk_without_date_column_is_rejected():
+    state = AggregationState()
+    chunk = pd.DataFrame({PM10: [10.0, 20.0]})
+
+    assert state.update(STATION, chunk) == set()
+    assert state.update(STATION, chunk) == set()
+    assert (STATION, PM10) not in state.aggregator.stats
+
+
+def test_watermark_survives_persistence(tmp_path):
+    state = AggregationState()
+    state.update(STATION, _chunk(["2010-01-01", "2010-01-02"], [10.0, 20.0]))
+    state.save(tmp_path / "state.json")
+
+    loaded = AggregationState.load(tmp_path / "state.json")
+    changed = loaded.update(STATION, _chunk(["2010-01-02", "2010-01-03"], [99.0, 30.0]))
+
+    assert changed == {(STATION, PM10)}
+    assert loaded.aggregator.stats[(STATION, PM10)].count == 3
+    assert loaded.aggregator.stats[(STATION, PM10)].mean == pytest.approx(20.0)
+
+
+def test_accepted_rows_merge_into_the_sketch_store(tmp_path):
+    from percentile_store import SketchStore
+
+    state = AggregationState()
+    state.update(STATION, _chunk(["2010-01-01", "2010-01-02"], [10.0, 20.0]))
+    store = SketchStore.from_chunks(state.accepted)
+    store.save(tmp_path / "sketches.json")
+
+    # Η 2010-01-02 έχει ήδη μετρηθεί: μόνο η 2010-02-01 φτάνει στα sketches
+    state.update(STATION, _chunk(["2010-01-02", "2010-02-01"], [99.0, 30.0]))
+    store = SketchStore.load(tmp_path / "sketches.json")
+    store.merge(SketchStore.from_chunks(state.accepted, k=store.k))
+
+    monthly = store.percentiles("monthly").set_index("Περίοδος")
+    assert monthly.loc["2010-01", "Πλήθος"] == 2
+    assert monthly.loc["2010-02", "Πλήθος"] == 1
+    assert monthly.loc["2010-02", "Μέσος Όρος"] == pytest.approx(30.0)
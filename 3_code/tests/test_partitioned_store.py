@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""means_frame: στήλη μέσων με την περίοδο του ερωτήματος, ομαδοποίηση και ανά πόλη."""
+
+import pandas as pd
+
+from partitioned_store import means_frame
+from schema_registry import mean_column
+
+
+def _scan(rows):
+    return pd.DataFrame(rows, columns=["Πόλη", "Σταθμός", "Ρύπος", "Ρύπος_raw",
+                                       "Ημερομηνία", "Τιμή"]).assign(
+        Ημερομηνία=lambda d: pd.to_datetime(d["Ημερομηνία"]))
+
+
+def test_value_column_is_labelled_with_the_scanned_years():
+    one_year = _scan([("thessaloniki", "Α", "PM10", "PM10 μg/m3", "2012-03-01", 10.0),
+                      ("thessaloniki", "Α", "PM10", "PM10 μg/m3", "2012-06-01", 20.0)])
+    assert mean_column(means_frame(one_year).columns) == "Μέσος Όρος 2012"
+
+    two_years = _scan([("thessaloniki", "Α", "PM10", "PM10 μg/m3", "2011-12-31", 10.0),
+                       ("thessaloniki", "Α", "PM10", "PM10 μg/m3", "2013-01-01", 20.0)])
+    assert mean_column(means_frame(two_years).columns) == "Μέσος Όρος 2011–2013"
+
+
+def test_same_station_name_in_two_cities_is_not_mixed():
+    scan = _scan([("thessaloniki", "Κέντρο", "PM10", "PM10 μg/m3", "2012-01-01", 10.0),
+                  ("athens", "Κέντρο", "PM10", "PM10 μg/m3", "2012-01-01", 30.0)])
+    out = means_frame(scan)
+    means = out.set_index(out["Πόλη"].astype(str))["Μέσος Όρος 2012"]
+    assert means.to_dict() == {"thessaloniki": 10.0, "athens": 30.0}
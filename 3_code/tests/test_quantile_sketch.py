@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""KLLSketch: εκατοστημόρια σε σύγκριση με το np.quantile, και μετά από merge."""
+
+import numpy as np
+import pytest
+
+from quantile_sketch import KLLSketch
+
+QUANTILES = [0.5, 0.904, 0.998]
+
+
+@pytest.fixture(scope="module")
+def values():
+    return np.random.default_rng(1).lognormal(3.0, 0.7, 2_000_000)
+
+
+def _assert_close(sketch, values):
+    estimate = sketch.quantiles(QUANTILES)
+    exact = np.quantile(values, QUANTILES)
+    # Διάμεσος/P90.4: εντός του σφάλματος rank του KLL
+    ranks = np.searchsorted(np.sort(values), estimate[:2]) / values.size
+    assert np.abs(ranks - QUANTILES[:2]).max() < 0.005
+    assert estimate[:2] == pytest.approx(exact[:2], rel=0.03)
+    # P99.8: ακριβώς, από τις κρατημένες μεγαλύτερες τιμές
+    assert estimate[2] == pytest.approx(exact[2], rel=1e-12)
+
+
+def test_quantiles_match_numpy_including_the_p998_tail(values):
+    sketch = KLLSketch()
+    for part in np.array_split(values, 100):
+        sketch.update(part)
+    _assert_close(sketch, values)
+
+
+def test_merged_sketches_keep_the_tail_exact(values):
+    parts = np.array_split(values, 8)
+    merged = KLLSketch()
+    for part in parts:
+        merged.merge(KLLSketch().update(part))
+    _assert_close(merged, values)
+
+
+def test_round_trip_keeps_the_exact_tail(values):
+    sketch = KLLSketch().update(values[:10_000])
+    restored = KLLSketch.from_dict(sketch.to_dict())
+    assert restored.quantile(0.998) == pytest.approx(np.quantile(values[:10_000], 0.998))
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""QueryService.handle με loader-stand-in (χωρίς socket)."""
+
+import asyncio
+import json
+
+import pandas as pd
+
+from query_service import QueryService
+
+
+class StubLoader:
+    """Επιστρέφει μικρό πίνακα· κάθε κλήση αλλάζει τις τιμές (νέο snapshot)."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"compliance": pd.DataFrame({
+            "Σταθμός": ["Α", "Α", "Β"],
+            "Ρύπος": ["PM10", "NO2", "PM10"],
+            "Έτος": [2012, 2012, 2013],
+            "Τιμή": [10.0 * self.calls, 20.0, 30.0],
+        })}
+
+
+def _service():
+    loader = StubLoader()
+    service = QueryService(loader)
+    service.load()
+    return service, loader
+
+
+def _get(service, target):
+    status, body = service.handle("GET", target)
+    return int(status), json.loads(body)
+
+
+def test_equality_filters_fields_and_limit():
+    service, _ = _service()
+
+    status, body = _get(service, "/query/compliance?pollutant=PM10")
+    assert status == 200
+    assert [r["Σταθμός"] for r in body["data"]] == ["Α", "Β"]
+
+    status, body = _get(service, "/query/compliance?station=Α&year=2012,2013&pollutant=NO2")
+    assert [r["Τιμή"] for r in body["data"]] == [20.0]
+
+    status, body = _get(service, "/query/compliance?fields=Σταθμός,Τιμή&limit=1")
+    assert body["rows"] == 1
+    assert list(body["data"][0]) == ["Σταθμός", "Τιμή"]
+
+
+def test_duplicate_fields_are_returned_once():
+    service, _ = _service()
+    status, body = _get(service, "/query/compliance?fields=Τιμή,Τιμή,station")
+    assert status == 200
+    assert list(body["data"][0]) == ["Τιμή", "Σταθμός"]
+
+
+def test_repeated_query_is_served_from_the_cache():
+    service, _ = _service()
+    first = service.handle("GET", "/query/compliance?pollutant=PM10")
+    second = service.handle("GET", "/query/compliance?pollutant=PM10")
+    assert first == second
+    assert (service.cache.hits, service.cache.misses) == (1, 1)
+
+    service.handle("GET", "/query/compliance?pollutant=NO2")
+    assert (service.cache.hits, service.cache.misses) == (1, 2)
+
+
+def test_bad_requests_return_400_and_unknown_tables_404():
+    service, _ = _service()
+    status, body = _get(service, "/query/compliance?colour=red")
+    assert status == 400 and "colour" in body["error"]
+    assert _get(service, "/query/compliance?fields=Χρώμα")[0] == 400
+    assert _get(service, "/query/compliance?limit=ten")[0] == 400
+    assert _get(service, "/query/missing")[0] == 404
+    assert _get(service, "/nowhere")[0] == 404
+
+
+def test_unexpected_errors_return_500_json():
+    service, _ = _service()
+    service.tables["compliance"] = None  # όχι DataFrame -> σφάλμα εκτός QueryError
+    status, body = _get(service, "/query/compliance?pollutant=PM10")
+    assert status == 500
+    assert "error" in body
+
+
+def test_refresh_swaps_the_snapshot_and_invalidates_the_cache():
+    service, loader = _service()
+    _, before = _get(service, "/query/compliance?station=Α&pollutant=PM10")
+    assert before["version"] == 1 and before["data"][0]["Τιμή"] == 10.0
+
+    asyncio.run(service.refresh())
+
+    _, after = _get(service, "/query/compliance?station=Α&pollutant=PM10")
+    assert loader.calls == 2
+    assert after["version"] == 2 and after["data"][0]["Τιμή"] == 20.0
+    assert service.cache.hits == 0
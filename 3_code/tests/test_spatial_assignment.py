@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""parse_dms, assignment_weights, κεντροειδές με τρύπα και numpy fallback πλησιέστερων."""
+
+import numpy as np
+import pandas as pd
+
+import spatial_assignment
+from spatial_assignment import (
+    EARTH_RADIUS_KM,
+    _polygon_centroid,
+    assignment_weights,
+    nearest_stations,
+    parse_dms,
+)
+
+STATIONS = pd.DataFrame({"Σταθμός": ["Α", "Β"],
+                         "Πλάτος": [40.60, 40.65], "Μήκος": [22.95, 22.90]})
+
+
+def _areas(rows):
+    return pd.DataFrame(rows, columns=["Δημοτική Κοινότητα", "Πλάτος", "Μήκος"])
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    h = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+
+
+def test_parse_dms_handles_greek_hemispheres_and_bad_values():
+    out = parse_dms(pd.Series(["40ο 38' 15.62''Ν", "22° 56΄ 30\"E", "23ο 30,0' Δ", "χωρίς"]))
+    assert list(out["axis"].iloc[:3]) == ["lat", "lon", "lon"]
+    assert np.isclose(out["degrees"].iloc[0], 40 + 38 / 60 + 15.62 / 3600)
+    assert np.isclose(out["degrees"].iloc[1], 22 + 56 / 60 + 30 / 3600)
+    assert np.isclose(out["degrees"].iloc[2], -23.5)
+    assert pd.isna(out["degrees"].iloc[3])
+
+
+def test_nearest_puts_all_weight_on_the_closest_station():
+    areas = _areas([("x", 40.61, 22.94), ("y", 40.64, 22.91)])
+    w = assignment_weights(STATIONS, areas, method="nearest")
+    assert w.loc["x"].tolist() == [1.0, 0.0]
+    assert w.loc["y"].tolist() == [0.0, 1.0]
+
+
+def test_idw_weights_follow_inverse_squared_distance():
+    areas = _areas([("x", 40.61, 22.94)])
+    w = assignment_weights(STATIONS, areas, method="idw").loc["x"]
+    d = _haversine_km(40.61, 22.94, STATIONS["Πλάτος"].to_numpy(), STATIONS["Μήκος"].to_numpy())
+    expected = (1 / d ** 2) / (1 / d ** 2).sum()
+    assert np.allclose(w.to_numpy(), expected)
+
+
+def test_idw_exact_hit_and_max_distance():
+    areas = _areas([("πάνω στο Α", 40.60, 22.95), ("μακριά", 41.50, 24.00)])
+    w = assignment_weights(STATIONS, areas, method="idw", max_distance_km=20)
+    assert w.loc["πάνω στο Α"].tolist() == [1.0, 0.0]
+    assert w.loc["μακριά"].tolist() == [0.0, 0.0]
+
+
+def test_polygon_centroid_subtracts_the_hole():
+    outer = [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]]
+    hole = [[2, 1], [3, 1], [3, 2], [2, 2], [2, 1]]  # ίδια φορά με τον εξωτερικό
+    lat, lon = _polygon_centroid([[outer, hole]])
+    # (16 · (2, 2) − 1 · (2.5, 1.5)) / 15, σε (μήκος, πλάτος)
+    assert np.isclose(lon, (32 - 2.5) / 15)
+    assert np.isclose(lat, (32 - 1.5) / 15)
+
+
+def test_numpy_fallback_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(spatial_assignment, "cKDTree", None)
+    rng = np.random.default_rng(1)
+    areas = _areas([(f"α{i}", lat, lon) for i, (lat, lon) in
+                    enumerate(zip(rng.uniform(40.5, 40.7, 50), rng.uniform(22.8, 23.1, 50)))])
+    stations = pd.DataFrame({"Σταθμός": [f"σ{i}" for i in range(8)],
+                             "Πλάτος": rng.uniform(40.5, 40.7, 8),
+                             "Μήκος": rng.uniform(22.8, 23.1, 8)})
+
+    idx, dist = nearest_stations(areas, stations, k=3)
+
+    brute = _haversine_km(areas["Πλάτος"].to_numpy()[:, None], areas["Μήκος"].to_numpy()[:, None],
+                          stations["Πλάτος"].to_numpy()[None, :],
+                          stations["Μήκος"].to_numpy()[None, :])
+    order = np.argsort(brute, axis=1)[:, :3]
+    assert (idx == order).all()
+    assert np.allclose(dist, np.take_along_axis(brute, order, axis=1))
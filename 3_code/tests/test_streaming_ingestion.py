@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""stream_measurements: μέσοι και μοντέλο μετρήσεων από το ίδιο πέρασμα σε chunks."""
+
+import numpy as np
+import pandas as pd
+
+from streaming_ingestion import stream_measurements
+
+DATE = "Ημερο- μηνία"
+
+
+def test_means_and_model_come_from_one_pass(tmp_path):
+    dates = pd.date_range("2012-01-01", periods=7, freq="D")
+    pm10 = [10.0, 20.0, np.nan, 40.0, 50.0, 60.0, 70.0]
+    no2 = [5.0, np.nan, 15.0, 25.0, np.nan, 35.0, 45.0]
+    path = tmp_path / "Στ. Α.csv"
+    pd.DataFrame({DATE: dates, "PM10 μg/m3": pm10, "NO2 μg/m3": no2}).to_csv(path, index=False)
+
+    out = stream_measurements(None, [], chunk_rows=3, csv_paths=[path])
+
+    means = out["means"].set_index("Ρύπος")
+    assert means.loc["PM10", "Μέσος Όρος 2010–2013"] == np.nanmean(pm10)
+    assert means.loc["NO2", "Μέσος Όρος 2010–2013"] == np.nanmean(no2)
+
+    model = out["model"]
+    assert list(model.stations["Σταθμός"]) == ["Στ. Α"]
+    assert set(model.pollutants["Ρύπος"]) == {"PM10", "NO2"}
+    facts = model.facts.merge(model.pollutants, on="pollutant_id")
+    assert len(facts) == 11
+    pm = facts[facts["Ρύπος"] == "PM10"].sort_values("Ημερομηνία")
+    assert list(pm["Τιμή"]) == [v for v in pm10 if not np.isnan(v)]